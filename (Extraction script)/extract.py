@@ -1,20 +1,28 @@
 """
-This script fetches A records and nameservers for a list of domains provided in a file. It filters domains based on specified A record criteria and matching nameservers, outputting the filtered list to a new file. Define filenames on the bottom of the document.
+This script fetches A records and nameservers for a list of domains provided in a file. It filters domains based on specified A record criteria and matching nameservers, outputting the filtered list to a new file.
+
+Lookups are sent asynchronously to a single recursive resolver with a bounded number of queries in flight. Nameservers are cached per zone, so sibling domains only trigger one lookup for their shared zone. Matches are written in input order as soon as they are known, and a checkpoint file records how far the input has been processed so an interrupted run can resume where it stopped.
 
 Configuration options are available for specifying nameserver match criteria and A record filter criteria.
 
 Usage:
-- Update the `specified_nameservers` and `a_record_criteria` variables as needed.
-- Run the script with the input file containing domains as the first argument and the output file name as the second argument.
+- Update the `specified_nameservers` and `a_record_criteria` variables as needed, or pass --nameserver / --a-prefix.
+- python3 extract.py input.txt output.txt [--resolver 127.0.0.1:53] [--concurrency 200]
+- Rerun the same command after an interruption to resume from the checkpoint, or pass --restart to start over.
 
 Requirements:
 - Python 3.x
-- Access to the `dig` command-line tool.
 """
 
-import subprocess
+import argparse
+import asyncio
+import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import random
+import socket
+import struct
+import time
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,74 +31,449 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 specified_nameservers = ['ns01.no.brand.one.com', 'ns02.no.brand.one.com', '*.uniweb.no', '*.fastname.no']
 a_record_criteria = "5.249"
 
-def run_subprocess_command(command):
+DEFAULT_CONCURRENCY = 200
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_RETRIES = 2
+CHECKPOINT_EVERY = 1000
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+TYPE_A = 1
+TYPE_NS = 2
+TYPE_CNAME = 5
+TYPE_SOA = 6
+RCODE_NXDOMAIN = 3
+
+
+class DNSError(Exception):
+    pass
+
+
+def encode_query(query_id, name, rtype):
+    """
+    Builds a DNS query message with recursion desired.
+    """
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    # Internationalized labels are sent as their xn-- form, so the length prefix is of the encoded label
+    encoded = [label.encode('idna') for label in name.rstrip('.').split('.') if label]
+    labels = b''.join(bytes([len(label)]) + label for label in encoded)
+    return header + labels + b'\x00' + struct.pack('!HH', rtype, 1)
+
+
+def read_name(message, offset):
+    """
+    Reads a possibly compressed domain name, returning the name and the offset after it.
+    """
+    labels = []
+    end = None
+    for _ in range(128):
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+        elif length == 0:
+            return '.'.join(labels).lower(), end if end is not None else offset + 1
+        else:
+            labels.append(message[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+            offset += 1 + length
+    raise DNSError('Compression loop in DNS response')
+
+
+def decode_response(message):
     """
-    Executes a given command using subprocess and returns the output.
-    If an error occurs, logs the error and returns None.
+    Parses a DNS response into (id, flags, answers, authority), where each record is (name, type, data).
+    """
+    query_id, flags, qdcount, ancount, nscount, _ = struct.unpack('!HHHHHH', message[:12])
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = read_name(message, offset)
+        offset += 4
+
+    sections = []
+    for count in (ancount, nscount):
+        records = []
+        for _ in range(count):
+            name, offset = read_name(message, offset)
+            rtype, _, _, rdlength = struct.unpack('!HHIH', message[offset:offset + 10])
+            offset += 10
+            if rtype == TYPE_A:
+                data = socket.inet_ntoa(message[offset:offset + 4])
+            elif rtype in (TYPE_NS, TYPE_CNAME, TYPE_SOA):
+                data, _ = read_name(message, offset)
+            else:
+                data = message[offset:offset + rdlength]
+            records.append((name, rtype, data))
+            offset += rdlength
+        sections.append(records)
+    return query_id, flags, sections[0], sections[1]
+
+
+class _ResolverProtocol(asyncio.DatagramProtocol):
+    def __init__(self, resolver):
+        self.resolver = resolver
+
+    def datagram_received(self, data, addr):
+        self.resolver.response_received(data)
+
+    def error_received(self, exc):
+        logging.debug(f"Resolver socket error: {exc}")
+
+
+class DNSResolver:
+    """
+    Minimal asynchronous stub resolver. All queries share one UDP socket to the configured
+    recursive server and are matched to their responses by message ID.
+    """
+
+    def __init__(self, server, port=53, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+        self.server = server
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.transport = None
+        self.pending = {}
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ResolverProtocol(self), remote_addr=(self.server, self.port)
+        )
+        # Hundreds of answers can arrive in a burst; the default buffer silently drops them
+        sock = self.transport.get_extra_info('socket')
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        except OSError:
+            pass
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+    def response_received(self, data):
+        if len(data) < 12:
+            return
+        future = self.pending.get(struct.unpack('!H', data[:2])[0])
+        if future and not future.done():
+            future.set_result(data)
+
+    async def query_tcp(self, message):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.server, self.port), self.timeout)
+        try:
+            writer.write(struct.pack('!H', len(message)) + message)
+            length = struct.unpack('!H', await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            return await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+
+    async def query(self, name, rtype):
+        """
+        Resolves one name/type pair, returning (rcode, answers, authority).
+        """
+        query_id = random.randrange(1 << 16)
+        while query_id in self.pending:
+            query_id = random.randrange(1 << 16)
+        try:
+            message = encode_query(query_id, name, rtype)
+        except UnicodeError as e:
+            # Labels longer than 63 characters or otherwise not encodable fail this domain only
+            raise DNSError(f"Invalid domain name {name!r}: {e}")
+
+        loop = asyncio.get_running_loop()
+        try:
+            for _ in range(self.retries + 1):
+                future = loop.create_future()
+                self.pending[query_id] = future
+                self.transport.sendto(message)
+                try:
+                    response = await asyncio.wait_for(future, self.timeout)
+                    break
+                except asyncio.TimeoutError:
+                    continue
+            else:
+                raise DNSError(f"Timed out resolving {name}")
+        finally:
+            self.pending.pop(query_id, None)
+
+        # Truncated answers are retried over TCP
+        if struct.unpack('!H', response[2:4])[0] & 0x0200:
+            try:
+                response = await self.query_tcp(message)
+            except asyncio.IncompleteReadError:
+                raise DNSError(f"Truncated TCP response for {name}")
+        try:
+            _, flags, answers, authority = decode_response(response)
+        except (struct.error, IndexError) as e:
+            raise DNSError(f"Malformed response for {name}: {e}")
+        return flags & 0x000F, answers, authority
+
+
+def system_resolver():
+    """
+    Returns the first nameserver configured in /etc/resolv.conf.
     """
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Command '{' '.join(command)}' failed with return code {e.returncode}: {e.output}")
-    except Exception as e:
-        logging.error(f"Unexpected error running command '{' '.join(command)}': {e}")
-    return None
-
-def get_a_record(domain):
-    """
-    Fetches the A record for the given domain using the dig command.
-    """
-    command = ['dig', '+short', 'A', domain]
-    output = run_subprocess_command(command)
-    if output:
-        a_record = output.split('\n')[0]
-        logging.info(f"A record for {domain}: {a_record}")
-        return a_record
-    else:
-        logging.error(f"Failed to fetch A record for {domain}")
+        with open('/etc/resolv.conf') as file:
+            for line in file:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == 'nameserver':
+                    return fields[1]
+    except OSError:
+        pass
+    return '127.0.0.1'
+
+
+async def get_a_record(resolver, domain):
+    """
+    Fetches the first A record for the given domain, following CNAMEs answered by the resolver.
+    """
+    try:
+        _, answers, _ = await resolver.query(domain, TYPE_A)
+    except (DNSError, OSError) as e:
+        logging.error(f"Failed to fetch A record for {domain}: {e}")
         return ''
+    a_record = next((data for _, rtype, data in answers if rtype == TYPE_A), '')
+    logging.debug(f"A record for {domain}: {a_record}")
+    return a_record
 
-def get_nameservers(domain):
+
+async def cached(cache, key, lookup):
     """
-    Fetches the nameservers for the given domain using the dig command.
+    Returns cache[key], running lookup() once even when several callers ask concurrently.
     """
-    command = ['dig', '+short', 'NS', domain]
-    output = run_subprocess_command(command)
-    if output:
-        nameservers = output.split('\n')
-        logging.info(f"Nameservers for {domain}: {nameservers}")
-        return nameservers
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = asyncio.ensure_future(lookup())
+    if isinstance(value, asyncio.Future):
+        result = await value
+        cache[key] = result
+        return result
+    return value
+
+
+async def query_nameservers(resolver, name):
+    try:
+        return await resolver.query(name, TYPE_NS)
+    except (DNSError, OSError) as e:
+        logging.error(f"Failed to fetch nameservers for {name}: {e}")
+        return None, [], []
+
+
+def in_zone(name, zone):
+    return name == zone or name.endswith('.' + zone)
+
+
+async def get_nameservers(resolver, domain, zone_cache):
+    """
+    Fetches the nameservers for the zone the given domain belongs to. A name without its own
+    NS records takes those of the zone its response points at: the delegation in a referral,
+    or the zone named by the SOA in the authority section.
+
+    Every name is asked about itself, so a delegated subdomain gets its own nameservers. Only
+    the zone lookups behind those answers are shared, which is where sibling names meet.
+    """
+    async def lookup_zone(zone):
+        _, answers, _ = await query_nameservers(resolver, zone)
+        return tuple(data for _, rtype, data in answers if rtype == TYPE_NS)
+
+    name = domain.rstrip('.').lower()
+
+    async def lookup_domain():
+        rcode, answers, authority = await query_nameservers(resolver, name)
+        nameservers = tuple(data for _, rtype, data in answers if rtype == TYPE_NS)
+        if nameservers or rcode is None or rcode == RCODE_NXDOMAIN:
+            return nameservers
+        authority = [(owner.rstrip('.').lower(), rtype, data) for owner, rtype, data in authority]
+        referral = tuple(data for owner, rtype, data in authority if rtype == TYPE_NS and in_zone(name, owner))
+        if referral:
+            return referral
+        zone = next((owner for owner, rtype, _ in authority if rtype == TYPE_SOA), None)
+        if zone and zone != name and in_zone(name, zone):
+            return await cached(zone_cache, zone, lambda: lookup_zone(zone))
+        return ()
+
+    # Registered before it completes, so repeats of the name queued meanwhile wait for it
+    nameservers = await cached(zone_cache, name, lookup_domain)
+    if nameservers:
+        logging.debug(f"Nameservers for {domain}: {list(nameservers)}")
     else:
         logging.error(f"Failed to fetch nameservers for {domain}")
-        return []
+    return nameservers
+
 
 def is_matching_any_nameserver(domain_nameservers, specified_nameservers):
     """
     Checks if any of the domain's nameservers match the specified nameservers.
     """
     for dn in domain_nameservers:
+        dn = dn.rstrip('.').lower()
         if any(sn.startswith('*') and dn.endswith(sn[1:]) or dn == sn for sn in specified_nameservers):
-            logging.info(f"Matching NS found: {dn}")
+            logging.debug(f"Matching NS found: {dn}")
             return True
     return False
 
-def process_domains(file_path, output_file_path):
+
+async def check_domain(resolver, semaphore, zone_cache, index, domain, nameservers, a_prefix):
+    """
+    Applies the A record and nameserver filters to one domain, returning (index, domain, matched).
+    """
+    if not domain:
+        return index, domain, False
+    async with semaphore:
+        a_record = await get_a_record(resolver, domain)
+        if not a_record.startswith(a_prefix):
+            return index, domain, False
+        domain_nameservers = await get_nameservers(resolver, domain, zone_cache)
+        return index, domain, is_matching_any_nameserver(domain_nameservers, nameservers)
+
+
+def input_identity(file_path):
+    """
+    Identifies the input file by path, size and modification time, so a checkpoint is
+    never applied to an input that changed since it was written.
+    """
+    stat = os.stat(file_path)
+    return {'input': os.path.abspath(file_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def load_checkpoint(checkpoint_path, file_path):
+    """
+    Returns (line, output_offset) from a previous run over the same, unchanged input, or (0, 0).
+    """
+    try:
+        with open(checkpoint_path) as file:
+            checkpoint = json.load(file)
+    except (OSError, ValueError):
+        return 0, 0
+    identity = input_identity(file_path)
+    if checkpoint.get('input') != identity['input']:
+        logging.warning(f"Ignoring checkpoint {checkpoint_path}, it belongs to {checkpoint.get('input')}")
+        return 0, 0
+    if (checkpoint.get('size'), checkpoint.get('mtime')) != (identity['size'], identity['mtime']):
+        logging.warning(f"Ignoring checkpoint {checkpoint_path}, {file_path} changed since it was written")
+        return 0, 0
+    return checkpoint['line'], checkpoint['output_offset']
+
+
+def save_checkpoint(checkpoint_path, file_path, line, output_offset):
+    """
+    Atomically records that the first `line` input lines are fully written to the output.
+    """
+    temp_path = checkpoint_path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump({**input_identity(file_path), 'line': line, 'output_offset': output_offset}, file)
+    os.replace(temp_path, checkpoint_path)
+
+
+def remove_checkpoint(checkpoint_path):
+    try:
+        os.remove(checkpoint_path)
+    except FileNotFoundError:
+        pass
+
+
+async def process_domains(
+    file_path,
+    output_file_path,
+    resolver_address=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    timeout=DEFAULT_TIMEOUT,
+    nameservers=None,
+    a_prefix=a_record_criteria,
+    checkpoint_path=None,
+    restart=False,
+):
     """
     Processes domains from the input file, filtering based on A records and nameservers.
     """
-    with open(file_path, 'r') as file:
-        domains = [line.strip() for line in file]
+    nameservers = nameservers or specified_nameservers
+    checkpoint_path = checkpoint_path or output_file_path + '.checkpoint'
+    host, _, port = (resolver_address or system_resolver()).partition(':')
+    resolver = DNSResolver(host, int(port or 53), timeout=timeout)
+    await resolver.open()
+
+    start_line, output_offset = (0, 0) if restart else load_checkpoint(checkpoint_path, file_path)
+    if start_line and not os.path.exists(output_file_path):
+        logging.warning(f"{output_file_path} is missing, ignoring checkpoint {checkpoint_path}")
+        start_line, output_offset = 0, 0
+    if start_line:
+        logging.info(f"Resuming from line {start_line} of {file_path}")
 
-    with open(output_file_path, 'w') as output_file:
-        for index, domain in enumerate(domains, start=1):
-            logging.info(f"Processing {index}/{len(domains)}: {domain}")
+    semaphore = asyncio.Semaphore(concurrency)
+    zone_cache = {}
+    # Completed results wait here until every earlier line is done, so output stays in input order
+    finished = {}
+    next_index = start_line
+    window = concurrency * 4
+    matched = 0
+    started = time.monotonic()
 
-            a_record = get_a_record(domain)
-            if a_record.startswith(a_record_criteria):
-                nameservers = get_nameservers(domain)
-                if is_matching_any_nameserver(nameservers, specified_nameservers):
+    mode = 'r+' if start_line else 'w'
+    with open(file_path, 'r') as file, open(output_file_path, mode) as output_file:
+        output_file.seek(output_offset)
+        output_file.truncate()
+
+        def collect(tasks):
+            nonlocal next_index, matched
+            for task in tasks:
+                index, domain, is_match = task.result()
+                finished[index] = domain if is_match else None
+            while next_index in finished:
+                domain = finished.pop(next_index)
+                if domain:
                     output_file.write(domain + '\n')
+                    matched += 1
+                next_index += 1
+                if next_index % CHECKPOINT_EVERY == 0:
+                    output_file.flush()
+                    save_checkpoint(checkpoint_path, file_path, next_index, output_file.tell())
+                    rate = (next_index - start_line) / (time.monotonic() - started)
+                    logging.info(f"Processed {next_index} domains, {matched} matched ({rate:.0f}/s)")
+
+        pending = set()
+        for index, line in enumerate(file):
+            if index < start_line:
+                continue
+            while pending and (len(pending) >= concurrency or index - next_index >= window):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                collect(done)
+            pending.add(asyncio.ensure_future(
+                check_domain(resolver, semaphore, zone_cache, index, line.strip(), nameservers, a_prefix)
+            ))
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            collect(done)
+
+    # The run is complete, a later run over the same input starts from the beginning
+    remove_checkpoint(checkpoint_path)
+    resolver.close()
+    logging.info(f"Finished {next_index} domains, {matched} new matches written to {output_file_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Filter domains by A record prefix and nameservers.')
+    parser.add_argument('input', nargs='?', default='input.txt', help='File with one domain per line.')
+    parser.add_argument('output', nargs='?', default='output.txt', help='File to write matching domains to.')
+    parser.add_argument('--resolver', help='Recursive resolver as host[:port] (default: first nameserver in /etc/resolv.conf).')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Maximum domains in flight.')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds to wait for each DNS answer.')
+    parser.add_argument('--nameserver', action='append', help='Nameserver to match, "*.zone" for a suffix. Repeatable.')
+    parser.add_argument('--a-prefix', default=a_record_criteria, help='Required prefix of the A record.')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: OUTPUT.checkpoint).')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint.')
+    args = parser.parse_args(argv)
+
+    asyncio.run(process_domains(
+        args.input,
+        args.output,
+        resolver_address=args.resolver,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        nameservers=args.nameserver,
+        a_prefix=args.a_prefix,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+    ))
+
 
-# Define your list of domains in 'input.txt' and specify the output file name
-process_domains('input.txt', 'output.txt')
\ No newline at end of file
+if __name__ == '__main__':
+    main()
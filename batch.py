@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import os
+import socket
+import ssl
+import sys
+import time
+from datetime import datetime, timezone
+
+from colorama import Fore, init
+from cryptography import x509
+
+import cert_cache
+import output
+import timings
+from tls_common import (
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    create_context,
+    parse_target,
+    read_targets,
+)
+from tls_inspect import (
+    connection_details,
+    describe_certificate,
+    format_date,
+    hostname_matches,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+DEFAULT_CONCURRENCY = 100
+DEFAULT_WARN_DAYS = 30
+
+
+class RateLimiter:
+    """Spaces out connections to the same address:port by at least 1/rate seconds."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = {}
+
+    async def wait(self, target):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self.next_slot.get(target, now))
+        self.next_slot[target] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def handshake_async(address, port, server_name, context):
+    # Connect and handshake as two steps so --timings can tell them apart
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(
+        socket.AF_INET6 if ":" in address else socket.AF_INET, socket.SOCK_STREAM
+    )
+    sock.setblocking(False)
+    try:
+        with timings.span("tcp_connect", address=address, port=port):
+            await loop.sock_connect(sock, (address, port))
+        with timings.span("tls_handshake", server_name=server_name):
+            reader, writer = await asyncio.open_connection(
+                sock=sock, ssl=context, server_hostname=server_name
+            )
+    except BaseException:
+        sock.close()
+        raise
+    try:
+        return connection_details(writer.get_extra_info("ssl_object"))
+    finally:
+        writer.close()
+
+
+async def inspect_host_async(host, port, limiter):
+    """
+    Async counterpart of tls_inspect.inspect_host for a resolved target. The caller
+    bounds the whole inspection, name resolution and both handshakes, by one timeout.
+    """
+    loop = asyncio.get_running_loop()
+    with timings.span("dns", host=host):
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    address = infos[0][4][0]
+
+    await limiter.wait((address, port))
+    try:
+        result = await handshake_async(address, port, host, create_context())
+        result.update(verified=True, verify_code=0, verify_message="ok")
+    except ssl.SSLCertVerificationError as e:
+        await limiter.wait((address, port))
+        result = await handshake_async(
+            address, port, host, create_context(verify=False)
+        )
+        result.update(
+            verified=False, verify_code=e.verify_code, verify_message=e.verify_message
+        )
+    result.update(address=address)
+    return result
+
+
+def leaf_facts(result):
+    if not result["chain"]:
+        return None
+    with timings.span("parse", certificates=1):
+        return describe_certificate(x509.load_der_x509_certificate(result["chain"][0]))
+
+
+def summarize(host, port, result, facts, warn_days):
+    record = {
+        "host": host,
+        "port": port,
+        "address": result["address"],
+        "verified": result["verified"],
+        "verify_message": result["verify_message"],
+        "cached": result.get("cached", False),
+    }
+    if facts is None:
+        record.update(status="error", error="no certificate presented")
+        return record
+
+    remaining = (
+        facts["not_after"] - datetime.now(timezone.utc)
+    ).total_seconds() / 86400
+    record.update(
+        not_after=facts["not_after"],
+        days_left=int(remaining),
+        issuer=facts["issuer_org"] or facts["issuer"],
+        san_match=hostname_matches(host, facts["sans"]),
+    )
+    if remaining < 0:
+        record["status"] = "expired"
+    elif not result["verified"]:
+        record["status"] = "invalid"
+    elif remaining < warn_days:
+        record["status"] = "expiring"
+    else:
+        record["status"] = "ok"
+    return record
+
+
+async def check_target(host, port, semaphore, limiter, timeout, warn_days):
+    async with semaphore:
+        started = time.monotonic()
+        try:
+            with timings.span("cache_lookup", host=host):
+                result = cert_cache.get(host, port, host)
+            if result is None:
+                result = await asyncio.wait_for(
+                    inspect_host_async(host, port, limiter), timeout
+                )
+                facts = leaf_facts(result)
+                if facts:
+                    cert_cache.put(host, port, host, result, facts)
+            else:
+                facts = leaf_facts(result)
+            record = summarize(host, port, result, facts, warn_days)
+        except asyncio.TimeoutError:
+            record = {"host": host, "port": port, "status": "error", "error": "timeout"}
+        except (OSError, ssl.SSLError) as e:
+            record = {"host": host, "port": port, "status": "error", "error": str(e)}
+        record["elapsed"] = time.monotonic() - started
+        return record
+
+
+async def scan(
+    targets,
+    concurrency=DEFAULT_CONCURRENCY,
+    timeout=DEFAULT_TIMEOUT,
+    rate=None,
+    warn_days=DEFAULT_WARN_DAYS,
+):
+    """
+    Checks (host, port) targets concurrently and yields one record per target
+    in completion order. At most `concurrency` handshakes are in flight and
+    `rate` caps new connections per second to the same address:port.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    pending = set()
+    for host, port in targets:
+        pending.add(
+            asyncio.ensure_future(
+                check_target(host, port, semaphore, limiter, timeout, warn_days)
+            )
+        )
+        # Keep the task set bounded so huge inputs are consumed as a stream
+        if len(pending) >= concurrency * 2:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    for task in asyncio.as_completed(pending):
+        yield await task
+
+
+def print_record(record):
+    # Lines that do not parse have no port and are shown as given
+    target = record["host"]
+    if record["port"] is not None:
+        target = f"{target}:{record['port']}"
+    target = f"{Fore.CYAN}{target}"
+    status = record["status"]
+    if status == "error":
+        print(f"{Fore.RED}ERROR    {target} {Fore.RED}{record['error']}")
+        return
+    expiry = format_date(record["not_after"])
+    san = f"{Fore.GREEN}SAN match" if record["san_match"] else f"{Fore.RED}SAN mismatch"
+    if status == "ok":
+        label = f"{Fore.GREEN}OK      "
+    elif status == "expiring":
+        label = f"{Fore.YELLOW}EXPIRING"
+    elif status == "expired":
+        label = f"{Fore.RED}EXPIRED "
+    else:
+        label = f"{Fore.RED}INVALID "
+    line = (
+        f"{label} {target} {Fore.YELLOW}{expiry} ({record['days_left']}d) "
+        f"{Fore.MAGENTA}{record['issuer']} {san}"
+    )
+    if not record["verified"]:
+        line += f" {Fore.RED}{record['verify_message']}"
+    print(line, flush=True)
+
+
+async def run(args, stream):
+    counts = {}
+    started = time.monotonic()
+
+    def report(record):
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+        if output.structured():
+            output.emit("batch", record)
+        else:
+            print_record(record)
+
+    def invalid(line, error):
+        report({"host": line, "port": None, "status": "error", "error": str(error)})
+
+    try:
+        async for record in scan(
+            read_targets(stream, args.port, invalid),
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            rate=args.rate,
+            warn_days=args.warn_days,
+        ):
+            report(record)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    output.finish()
+    total = sum(counts.values())
+    elapsed = time.monotonic() - started
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(
+        f"{Fore.CYAN}\nChecked {total} hosts in {elapsed:.1f}s "
+        f"({total / elapsed if elapsed else 0:.1f} hosts/s): {summary}",
+        file=sys.stderr,
+    )
+    return 1 if counts.get("error") or counts.get("expired") else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl batch",
+        description="Check certificates for a list of hostnames concurrently.",
+    )
+    parser.add_argument(
+        "file",
+        nargs="?",
+        default="-",
+        help="File with one host[:port] per line (default stdin).",
+    )
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum handshakes in flight.",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Per-host timeout in seconds.",
+    )
+    parser.add_argument(
+        "-r",
+        "--rate",
+        type=float,
+        help="Maximum new connections per second to the same address:port.",
+    )
+    parser.add_argument(
+        "-w",
+        "--warn-days",
+        type=int,
+        default=DEFAULT_WARN_DAYS,
+        help="Flag certificates expiring within this many days.",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Bypass the certificate cache."
+    )
+    args = parser.parse_args(argv)
+    if args.refresh:
+        os.environ["SSL_UTILS_REFRESH"] = "1"
+    try:
+        stream = sys.stdin if args.file == "-" else open(args.file)
+    except OSError as e:
+        parser.error(f"cannot read {args.file}: {e}")
+    return asyncio.run(run(args, stream))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Hosts/second of `ssl batch` against a local fleet of TLS servers.
+
+Every server port simulates a network round trip with --delay, so the numbers
+show how throughput scales with the concurrency limit rather than raw CPU.
+
+    python3 benchmarks/bench_batch.py --hosts 500 --servers 50 --delay 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import scan  # noqa: E402
+from local_tls import self_signed, start_fleet  # noqa: E402
+
+
+async def measure(targets, concurrency):
+    started = time.monotonic()
+    errors = 0
+    async for record in scan(targets, concurrency=concurrency, timeout=30):
+        errors += record["status"] == "error"
+    return time.monotonic() - started, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=500)
+    parser.add_argument("--servers", type=int, default=50)
+    parser.add_argument("--base-port", type=int, default=20443)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10, 50, 100, 250]
+    )
+    args = parser.parse_args()
+
+    cert_path, key_path = self_signed()
+    # Trust the fleet certificate so every host costs exactly one handshake
+    os.environ["SSL_CERT_FILE"] = cert_path
+    # Measure handshakes, not certificate cache hits
+    os.environ["SSL_UTILS_CACHE_TTL"] = "0"
+    ports = list(range(args.base_port, args.base_port + args.servers))
+    fleet = start_fleet(ports, cert_path, key_path, args.delay)
+    targets = [("localhost", ports[i % len(ports)]) for i in range(args.hosts)]
+
+    print(f"{args.hosts} hosts, {args.servers} servers, {args.delay * 1000:.0f} ms RTT")
+    print(f"{'concurrency':>12} {'seconds':>9} {'hosts/s':>9} {'errors':>7}")
+    try:
+        for concurrency in args.concurrency:
+            elapsed, errors = asyncio.run(measure(targets, concurrency))
+            print(
+                f"{concurrency:>12} {elapsed:>9.2f} {args.hosts / elapsed:>9.1f} {errors:>7}"
+            )
+    finally:
+        fleet.terminate()
+
+
+if __name__ == "__main__":
+    main()
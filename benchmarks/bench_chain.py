@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Chains/second of `ssl verify` with one shared trust store versus reloading it per chain.
+
+The generated root is added to the system CA bundle, so every lookup goes
+through an index of realistic size; half the leaves are served without their
+intermediate and are completed from the intermediate index.
+
+    python3 benchmarks/bench_chain.py --leaves 2000
+"""
+
+import argparse
+import os
+import ssl
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+
+from chain_builder import CertificateIndex, ChainBuilder, trust_store  # noqa: E402
+
+
+def issue(subject, key, issuer=None, issuer_key=None, ca=False):
+    now = datetime.now(timezone.utc)
+    name = x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, subject)])
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(issuer.subject if issuer else name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=90))
+        .add_extension(x509.BasicConstraints(ca=ca, path_length=None), critical=True)
+        .add_extension(
+            x509.SubjectKeyIdentifier.from_public_key(key.public_key()), critical=False
+        )
+    )
+    signer = issuer_key or key
+    builder = builder.add_extension(
+        x509.AuthorityKeyIdentifier.from_issuer_public_key(signer.public_key()),
+        critical=False,
+    )
+    return builder.sign(signer, hashes.SHA256())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leaves", type=int, default=2000)
+    parser.add_argument(
+        "--reload-sample",
+        type=int,
+        default=50,
+        help="Chains checked with a reloaded store (it is slow, so it is sampled).",
+    )
+    args = parser.parse_args()
+
+    root_key = ec.generate_private_key(ec.SECP256R1())
+    root = issue("Bench Root", root_key, ca=True)
+    inter_key = ec.generate_private_key(ec.SECP256R1())
+    inter = issue("Bench Intermediate", inter_key, root, root_key, ca=True)
+    chains = []
+    for n in range(args.leaves):
+        leaf = issue(
+            f"h{n}.test", ec.generate_private_key(ec.SECP256R1()), inter, inter_key
+        )
+        chains.append([leaf, inter] if n % 2 else [leaf])
+
+    with tempfile.NamedTemporaryFile(suffix=".pem") as f:
+        f.write(root.public_bytes(serialization.Encoding.PEM))
+        f.flush()
+        paths = (ssl.get_default_verify_paths().cafile, f.name)
+        paths = tuple(path for path in paths if path)
+        intermediates = CertificateIndex([inter])
+
+        started = time.perf_counter()
+        builder = ChainBuilder(trust_store(paths), intermediates, fetch=False)
+        loaded = time.perf_counter() - started
+        statuses = {}
+        for chain in chains:
+            status = builder.check(chain)["status"]
+            statuses[status] = statuses.get(status, 0) + 1
+        shared = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for chain in chains[: args.reload_sample]:
+            trust_store.cache_clear()
+            ChainBuilder(trust_store(paths), intermediates, fetch=False).check(chain)
+        reloaded = (time.perf_counter() - started) / min(
+            args.reload_sample, len(chains)
+        )
+
+    print(f"trust store: {len(builder.roots)} roots loaded in {loaded * 1000:.1f} ms")
+    print(f"results: {statuses}")
+    print(
+        f"shared store   {len(chains) / shared:>10,.0f} chains/s "
+        f"({shared / len(chains) * 1000:.2f} ms each)"
+    )
+    print(
+        f"reload per chain {1 / reloaded:>8,.0f} chains/s ({reloaded * 1000:.2f} ms each)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compares the single-pass colorizer with the previous one-regex-per-pattern loop
+on a synthetic `openssl s_client -showcerts` dump.
+
+    python3 benchmarks/bench_colorize.py --hosts 500
+"""
+
+import argparse
+import base64
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from check_ssl_chain_color import colorize, patterns  # noqa: E402
+
+HOST_TEMPLATE = """CONNECTED(00000003)
+---
+Certificate chain
+ 0 s:CN = host{n}.example.com
+   i:C = US, O = Let's Encrypt, CN = R3
+   a:PKEY: rsaEncryption, 2048 (bit); sigalg: RSA-SHA256
+   v:NotBefore: Jan  1 00:00:00 2024 GMT; NotAfter: Apr  1 00:00:00 2024 GMT
+-----BEGIN CERTIFICATE-----
+{pem}
+-----END CERTIFICATE-----
+ 1 s:C = US, O = Let's Encrypt, CN = R3
+   i:C = US, O = Internet Security Research Group, CN = ISRG Root X1
+   a:PKEY: rsaEncryption, 2048 (bit); sigalg: RSA-SHA256
+   v:NotBefore: Sep  4 00:00:00 2020 GMT; NotAfter: Sep 15 16:00:00 2025 GMT
+-----BEGIN CERTIFICATE-----
+{pem}
+-----END CERTIFICATE-----
+---
+Server certificate
+subject=CN = host{n}.example.com
+issuer=C = US, O = Let's Encrypt, CN = R3
+---
+No client certificate CA names sent
+Peer signing digest: SHA256
+Peer signature type: RSA-PSS
+Server Temp Key: X25519, 253 bits
+---
+SSL handshake has read 4567 bytes and written 393 bytes
+Verification: OK
+---
+New, TLSv1.3, Cipher is TLS_AES_256_GCM_SHA384
+Server public key is 2048 bit
+Secure Renegotiation IS NOT supported
+Compression: NONE
+Expansion: NONE
+No ALPN negotiated
+Early data was not sent
+Verify return code: 0 (ok)
+---
+"""
+
+
+def legacy_colorize(line, compiled):
+    # The previous implementation: every pattern is a separate substitution
+    for regex, color in compiled:
+        line = regex.sub(color + r"\1", line)
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pem = "\n".join(base64.b64encode(os.urandom(48)).decode() for _ in range(25))
+    dump = "".join(HOST_TEMPLATE.format(n=n, pem=pem) for n in range(args.hosts))
+    lines = dump.splitlines(keepends=True)
+    compiled = [(re.compile(f"({re.escape(text)})"), color) for text, color in patterns]
+
+    runs = {
+        "legacy, per line": lambda: [legacy_colorize(line, compiled) for line in lines],
+        "single pass, per line": lambda: [colorize(line) for line in lines],
+        "single pass, whole dump": lambda: colorize(dump),
+    }
+    print(f"{len(lines)} lines, {len(dump) / 1e6:.1f} MB")
+    for name, run in runs.items():
+        best = min(timed(run) for _ in range(args.repeat))
+        print(
+            f"{name:<24} {best * 1000:>8.1f} ms {len(lines) / best / 1e6:>6.2f} M lines/s"
+        )
+
+
+def timed(run):
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Latency of `ssl ctlog search` queries on the reversed-name index versus a full scan.
+
+A synthetic index of many zones is built directly (no certificates are signed), then
+exact, "*.zone" and "api.*.zone" queries run once through the index range and once
+against a table of forward names, where a suffix match is a full scan.
+
+    python3 benchmarks/bench_ctlog.py --zones 2000 --hosts 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ctlog import (  # noqa: E402
+    connect,
+    forward_name,
+    query_condition,
+    reverse_name,
+    store,
+)
+
+
+def records(zones, hosts):
+    for zone in range(zones):
+        for host in range(hosts):
+            names = [f"h{host}.z{zone}.example", f"api.h{host}.z{zone}.example"]
+            yield {
+                "sha256": random.randbytes(32),
+                "common_name": names[0],
+                "issuer": "CN=Bench CA",
+                "serial": "01",
+                "not_before": 0.0,
+                "not_after": 0.0,
+                "precert": False,
+                "log": None,
+                "entry_index": None,
+                "logged_at": None,
+                "der": b"",
+                "rnames": [reverse_name(name) for name in names],
+            }
+
+
+def run(db, sql, parameters, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = db.execute(sql, parameters).fetchall()
+    return (time.perf_counter() - started) / repeat, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--zones", type=int, default=2000)
+    parser.add_argument("--hosts", type=int, default=50, help="Certificates per zone.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        db = connect(os.path.join(folder, "ctlog.sqlite"))
+        started = time.perf_counter()
+        with db:
+            count = store(db, records(args.zones, args.hosts))
+        print(f"{count:,} certificates indexed in {time.perf_counter() - started:.1f}s")
+        db.create_function("forward_name", 1, forward_name)
+        with db:
+            db.execute(
+                "CREATE TABLE forward AS SELECT forward_name(rname) AS name, cert_id "
+                "FROM names"
+            )
+            db.execute("CREATE INDEX forward_name ON forward (name)")
+
+        zone = f"z{args.zones // 2}.example"
+        for query in (f"h1.{zone}", f"*.{zone}", f"api.*.{zone}"):
+            condition, parameters = query_condition(query)
+            sql = f"SELECT DISTINCT n.cert_id FROM names n WHERE {condition}"
+            indexed, found = run(db, sql, parameters, args.repeat)
+            scan = "SELECT DISTINCT cert_id FROM forward WHERE name GLOB ?"
+            scanned, _ = run(db, scan, [query], args.repeat)
+            print(
+                f"{query:<28} {found:>5} certs  index {indexed * 1000:8.3f} ms  "
+                f"scan {scanned * 1000:8.1f} ms  ({scanned / indexed:,.0f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Requests/second of `ssl headers` with pooled keep-alive connections versus one
+connection per request, against a local HTTPS server.
+
+The server waits --delay seconds before every TLS handshake, like a distant load
+balancer, so the difference is the connection setup the pool saves.
+
+    python3 benchmarks/bench_headers.py --paths 200 --delay 0.02
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_tls import self_signed, start_https  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=200)
+    parser.add_argument("--port", type=int, default=20843)
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=4)
+    args = parser.parse_args()
+
+    cert_path, key_path = self_signed()
+    # The system store is read on first use, so trusting the test certificate works here
+    os.environ["SSL_CERT_FILE"] = cert_path
+    from headers import HTTP1_ONLY, ConnectionPool, headers_record
+    from tls_common import create_context
+
+    server = start_https(args.port, cert_path, key_path, args.delay)
+    paths = [f"/page/{n}" for n in range(args.paths)]
+    try:
+        pool = ConnectionPool(args.per_host)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as executor:
+            records = list(
+                executor.map(
+                    lambda path: headers_record(pool, "localhost", args.port, path),
+                    paths,
+                )
+            )
+        pooled = time.perf_counter() - started
+        pool.close()
+        errors = sum("error" in record for record in records)
+
+        def single(path):
+            connection = http.client.HTTPSConnection(
+                "localhost", args.port, context=create_context(alpn=HTTP1_ONLY)
+            )
+            try:
+                connection.request("HEAD", path)
+                connection.getresponse().read()
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as executor:
+            list(executor.map(single, paths))
+        fresh = time.perf_counter() - started
+    finally:
+        server.terminate()
+
+    print(
+        f"pooled           {len(paths) / pooled:>8,.0f} requests/s on {pool.opened} "
+        f"connections ({pool.resumed} TLS resumptions, {errors} errors)"
+    )
+    print(f"connection each  {len(paths) / fresh:>8,.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Files/second of `ssl inventory` on a generated store of keys, certificates and CSRs.
+
+Every pair is written as separate .key, .crt and .csr files, and a tenth of the
+certificates are repeated in bundles, so the store looks like a real secret store.
+
+    python3 benchmarks/bench_inventory.py --pairs 5000 --workers 1 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography import x509  # noqa: E402
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec  # noqa: E402
+
+from inventory import match, scan  # noqa: E402
+
+
+def write_store(root, pairs):
+    now = datetime.now(timezone.utc)
+    bundle = []
+    for n in range(pairs):
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, f"h{n}.test")])
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(n + 1)
+            .not_valid_before(now)
+            .not_valid_after(now + timedelta(days=90))
+            .sign(key, hashes.SHA256())
+        )
+        csr = (
+            x509.CertificateSigningRequestBuilder()
+            .subject_name(name)
+            .sign(key, hashes.SHA256())
+        )
+        directory = os.path.join(root, f"{n % 100:02d}")
+        os.makedirs(directory, exist_ok=True)
+        pem = cert.public_bytes(serialization.Encoding.PEM)
+        files = {
+            "key": key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ),
+            "crt": pem,
+            "csr": csr.public_bytes(serialization.Encoding.PEM),
+        }
+        for extension, data in files.items():
+            with open(os.path.join(directory, f"h{n}.{extension}"), "wb") as f:
+                f.write(data)
+        if n % 10 == 0:
+            bundle.append(pem)
+    with open(os.path.join(root, "bundle.pem"), "wb") as f:
+        f.write(b"".join(bundle))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_store(root, args.pairs)
+        for workers in args.workers:
+            started = time.perf_counter()
+            files, entries = scan([root], workers)
+            groups, errors = match(entries)
+            elapsed = time.perf_counter() - started
+            print(
+                f"workers {workers:>3}: {files} files, {len(entries)} objects, "
+                f"{len(groups)} keys in {elapsed:.2f}s ({files / elapsed:,.0f} files/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Keys/second of `ssl new` batch generation per key type and number of workers.
+
+Each run goes through the same job function and process pool as `ssl new -f`,
+so the numbers include building, signing and writing the CSRs.
+
+    python3 benchmarks/bench_keygen.py --keys 50 --workers 1 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newcert import KEY_TYPES, generate_job  # noqa: E402
+from pfx_pack import run_batch  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--keys", type=int, default=50, help="Keys per key type.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()])
+    parser.add_argument(
+        "--key-types", nargs="+", choices=list(KEY_TYPES), default=list(KEY_TYPES)
+    )
+    args = parser.parse_args()
+
+    print(f"{args.keys} keys per type, {os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as out:
+        for key_type in args.key_types:
+            for workers in args.workers:
+                jobs = [
+                    {
+                        "common_name": f"h{n}.test",
+                        "sans": [f"www.h{n}.test"],
+                        "name": f"{key_type}-{workers}-{n}",
+                        "key_type": key_type,
+                        "fields": {},
+                        "out": out,
+                        "passphrase": None,
+                    }
+                    for n in range(args.keys)
+                ]
+                started = time.perf_counter()
+                records = list(run_batch(generate_job, jobs, workers))
+                elapsed = time.perf_counter() - started
+                failed = sum(record["status"] != "ok" for record in records)
+                keygen = sum(record.get("keygen_seconds", 0) for record in records)
+                print(
+                    f"{key_type:<8} workers {workers:>3}: {len(jobs) / elapsed:>9,.1f} keys/s "
+                    f"(keygen {keygen / len(jobs) * 1000:.1f} ms/key"
+                    f"{f', {failed} failed' if failed else ''})"
+                )
+
+
+if __name__ == "__main__":
+    main()
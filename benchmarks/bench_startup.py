@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Startup cost of every in-process `ssl` command: cold start, imports and warm dispatch.
+
+Cold is `python3 wrapper.py <command> --help` in a fresh interpreter, imports
+come from `python3 -X importtime`, and warm is a second dispatch in the same
+process, which is what `ssl shell` pays per command.
+
+    python3 benchmarks/bench_startup.py --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import wrapper  # noqa: E402
+
+# pfx_pack is interactive and has no --help
+SKIP = {"pfx_pack"}
+
+
+def commands():
+    """One (name, module, leading args) per distinct in-process command."""
+    seen = set()
+    for name, (kind, module, leading) in wrapper.COMMANDS.items():
+        key = (module, tuple(leading))
+        if kind != "python" or module in SKIP or key in seen:
+            continue
+        seen.add(key)
+        yield name, module
+
+
+def cold(argv, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def import_times(module):
+    """Cumulative import time of `module` and its heaviest top-level imports, in ms."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    total, heaviest = 0.0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.strip() == module:
+            total = int(cumulative) / 1000
+        # Direct children of the root are indented by exactly two spaces
+        elif name.startswith("   ") and not name.startswith("    "):
+            heaviest.append((int(cumulative) / 1000, name.strip()))
+    return total, sorted(heaviest, reverse=True)
+
+
+def warm(name, repeat):
+    samples = []
+    for _ in range(repeat + 1):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            wrapper.run_command(name, ["--help"])
+        samples.append(time.perf_counter() - started)
+    # The first call imports the module, the rest are what a shell session sees
+    return statistics.median(samples[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=3, help="Heaviest imports to list per command."
+    )
+    args = parser.parse_args()
+
+    baseline = cold([sys.executable, "-c", "pass"], args.repeat)
+    script = os.path.join(ROOT, "wrapper.py")
+    print(f"interpreter alone {baseline * 1000:>8.1f} ms")
+    print(f"{'command':<12} {'cold':>8} {'imports':>9} {'warm':>8}  heaviest imports")
+    for name, module in commands():
+        started = cold([sys.executable, script, name, "--help"], args.repeat)
+        total, heaviest = import_times(module)
+        dispatch = warm(name, args.repeat)
+        top = ", ".join(f"{child} {ms:.0f}" for ms, child in heaviest[: args.top])
+        print(
+            f"{name:<12} {started * 1000:>6.1f}ms {total:>7.1f}ms "
+            f"{dispatch * 1000:>6.2f}ms  {top}"
+        )
+
+
+if __name__ == "__main__":
+    main()
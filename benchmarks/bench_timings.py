@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Cost of a timings span, with --timings off and on, next to an empty block.
+
+    python3 benchmarks/bench_timings.py --repeat 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import timings  # noqa: E402
+
+
+def run(repeat, timed):
+    started = time.perf_counter()
+    if timed:
+        for _ in range(repeat):
+            with timings.span("bench", n=1):
+                pass
+    else:
+        for _ in range(repeat):
+            pass
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200000)
+    args = parser.parse_args()
+
+    baseline = run(args.repeat, timed=False)
+    os.environ.pop("SSL_UTILS_TIMINGS", None)
+    off = run(args.repeat, timed=True)
+    os.environ["SSL_UTILS_TIMINGS"] = "1"
+    timings.start()
+    on = run(args.repeat, timed=True)
+    print(f"empty block      {baseline * 1e9:8.0f} ns")
+    print(f"span, timings off {(off - baseline) * 1e9:7.0f} ns")
+    print(f"span, timings on  {(on - baseline) * 1e9:7.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
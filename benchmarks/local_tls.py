@@ -0,0 +1,163 @@
+"""
+Throwaway certificates and TLS servers on 127.0.0.1 for the benchmarks.
+"""
+
+import asyncio
+import datetime
+import http.server
+import os
+import ssl
+import tempfile
+import time
+from multiprocessing import Event, Process
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+
+def self_signed(common_name="localhost", directory=None, days=90):
+    """Writes a self-signed EC certificate and key, returns (cert_path, key_path)."""
+    directory = directory or tempfile.mkdtemp(prefix="ssl-utils-bench-")
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=days))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName(common_name)]), critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+class _DelayedTLS(asyncio.Protocol):
+    """Holds the ClientHello for `delay` seconds to simulate a network round trip."""
+
+    def __init__(self, context, delay):
+        self.context = context
+        self.delay = delay
+
+    def connection_made(self, transport):
+        # Leave the ClientHello in the socket buffer until the TLS upgrade
+        transport.pause_reading()
+        asyncio.get_running_loop().create_task(self.upgrade(transport))
+
+    async def upgrade(self, transport):
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(self.delay)
+        try:
+            tls = await loop.start_tls(transport, self, self.context, server_side=True)
+        except (OSError, ssl.SSLError):
+            transport.close()
+            return
+        if tls is not None:
+            tls.close()
+
+    def data_received(self, data):
+        pass
+
+
+async def _serve(ports, cert_path, key_path, delay, ready):
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+
+    loop = asyncio.get_running_loop()
+    servers = [
+        await loop.create_server(
+            lambda: _DelayedTLS(context, delay), "127.0.0.1", port, backlog=1024
+        )
+        for port in ports
+    ]
+    ready.set()
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+
+def _run(ports, cert_path, key_path, delay, ready):
+    asyncio.run(_serve(ports, cert_path, key_path, delay, ready))
+
+
+def start_fleet(ports, cert_path, key_path, delay=0.0):
+    """Starts a TLS server process listening on every port, returns the Process."""
+    ready = Event()
+    process = Process(
+        target=_run, args=(ports, cert_path, key_path, delay, ready), daemon=True
+    )
+    process.start()
+    ready.wait(10)
+    return process
+
+
+class _HeadersHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive HTTP/1.1 handler answering every path with fixed security headers."""
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def setup(self):
+        # Handshake in the handler thread, after the simulated round trip
+        time.sleep(self.delay)
+        self.request.do_handshake()
+        super().setup()
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Strict-Transport-Security", "max-age=31536000")
+        self.send_header("Content-Security-Policy", "default-src 'self'")
+        self.send_header("X-Content-Type-Options", "nosniff")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve_https(port, cert_path, key_path, delay, ready):
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    handler = type("Handler", (_HeadersHandler,), {"delay": delay})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.socket = context.wrap_socket(
+        server.socket, server_side=True, do_handshake_on_connect=False
+    )
+    ready.set()
+    server.serve_forever()
+
+
+def start_https(port, cert_path, key_path, delay=0.0):
+    """
+    Starts a keep-alive HTTPS server process that waits `delay` seconds before each
+    TLS handshake, so new connections cost a simulated round trip. Returns the Process.
+    """
+    ready = Event()
+    process = Process(
+        target=_serve_https,
+        args=(port, cert_path, key_path, delay, ready),
+        daemon=True,
+    )
+    process.start()
+    ready.wait(10)
+    return process
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of inspected certificate chains, shared by every command.
+
+Entries are keyed by (host, port, SNI) and hold the DER chain, the negotiated
+session and derived facts of the leaf (expiry, fingerprints, SANs). They are
+served for SSL_UTILS_CACHE_TTL seconds (default 300, 0 disables the cache),
+never past the leaf's expiry, and the least recently used entries are evicted
+beyond SSL_UTILS_CACHE_SIZE entries. SSL_UTILS_REFRESH=1, or `ssl --refresh`,
+skips reads but still stores fresh results.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+
+from colorama import Fore, init
+
+# Initialize Colorama
+init(autoreset=True)
+
+DEFAULT_TTL = 300
+DEFAULT_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS certs (
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    server_name TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    not_after REAL NOT NULL,
+    chain BLOB NOT NULL,
+    session TEXT NOT NULL,
+    facts TEXT NOT NULL,
+    PRIMARY KEY (host, port, server_name)
+);
+CREATE INDEX IF NOT EXISTS certs_last_used ON certs (last_used);
+"""
+
+# Result keys stored as-is next to the chain
+SESSION_KEYS = [
+    "protocol",
+    "cipher",
+    "cipher_bits",
+    "alpn",
+    "address",
+    "verified",
+    "verify_code",
+    "verify_message",
+]
+
+_connection = None
+
+
+def cache_path():
+    if os.environ.get("SSL_UTILS_CACHE"):
+        return os.environ["SSL_UTILS_CACHE"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "ssl-utils", "certs.sqlite")
+
+
+def ttl():
+    return float(os.environ.get("SSL_UTILS_CACHE_TTL", DEFAULT_TTL))
+
+
+def max_entries():
+    return int(os.environ.get("SSL_UTILS_CACHE_SIZE", DEFAULT_SIZE))
+
+
+def refresh_requested():
+    return os.environ.get("SSL_UTILS_REFRESH", "") not in ("", "0")
+
+
+def connect():
+    global _connection
+    if _connection is None:
+        path = cache_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute("PRAGMA synchronous=NORMAL")
+        _connection.executescript(SCHEMA)
+    return _connection
+
+
+def pack_chain(chain):
+    return b"".join(struct.pack("!I", len(der)) + der for der in chain)
+
+
+def unpack_chain(blob):
+    chain = []
+    offset = 0
+    while offset < len(blob):
+        (length,) = struct.unpack_from("!I", blob, offset)
+        chain.append(bytes(blob[offset + 4 : offset + 4 + length]))
+        offset += 4 + length
+    return chain
+
+
+def get(host, port, server_name):
+    """
+    Returns the cached result for (host, port, server_name) as a dict with the same
+    keys as tls_inspect.inspect_host, minus the parsed certificates, or None.
+    """
+    if ttl() <= 0 or refresh_requested():
+        return None
+    now = time.time()
+    try:
+        db = connect()
+        row = db.execute(
+            "SELECT chain, session, facts FROM certs WHERE host = ? AND port = ? "
+            "AND server_name = ? AND fetched_at > ? AND not_after > ?",
+            (host, port, server_name, now - ttl(), now),
+        ).fetchone()
+        if row is None:
+            return None
+        with db:
+            db.execute(
+                "UPDATE certs SET last_used = ? WHERE host = ? AND port = ? AND server_name = ?",
+                (now, host, port, server_name),
+            )
+    except sqlite3.Error:
+        return None
+
+    chain, session, facts = row
+    result = json.loads(session)
+    result.update(
+        host=host,
+        port=port,
+        server_name=server_name,
+        chain=unpack_chain(chain),
+        facts=json.loads(facts),
+        cached=True,
+    )
+    return result
+
+
+def put(host, port, server_name, result, facts):
+    """
+    Stores an inspection result and the derived facts of its leaf certificate.
+    """
+    if ttl() <= 0 or not result["chain"]:
+        return
+    now = time.time()
+    session = {key: result.get(key) for key in SESSION_KEYS}
+    try:
+        db = connect()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO certs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    host,
+                    port,
+                    server_name,
+                    now,
+                    now,
+                    facts["not_after"].timestamp(),
+                    pack_chain(result["chain"]),
+                    json.dumps(session),
+                    json.dumps(facts, default=str),
+                ),
+            )
+            # Evict least recently used entries beyond the size cap
+            db.execute(
+                "DELETE FROM certs WHERE rowid IN (SELECT rowid FROM certs "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (max_entries(),),
+            )
+    except sqlite3.Error as e:
+        print(f"{Fore.YELLOW}Could not update certificate cache: {e}", file=sys.stderr)
+
+
+def clear():
+    with connect() as db:
+        db.execute("DELETE FROM certs")
+
+
+def entries():
+    return connect().execute(
+        "SELECT host, port, server_name, fetched_at, not_after FROM certs "
+        "ORDER BY last_used DESC"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl cache", description="Inspect or clear the certificate cache."
+    )
+    parser.add_argument(
+        "action", choices=["list", "clear", "path"], nargs="?", default="list"
+    )
+    args = parser.parse_args(argv)
+
+    if args.action == "path":
+        print(cache_path())
+    elif args.action == "clear":
+        clear()
+        print(f"{Fore.GREEN}Certificate cache cleared.")
+    else:
+        now = time.time()
+        for host, port, server_name, fetched_at, not_after in entries():
+            target = host if host == server_name else f"{server_name} via {host}"
+            age = int(now - fetched_at)
+            expires = time.strftime("%Y-%m-%d", time.gmtime(not_after))
+            print(
+                f"{Fore.CYAN}{target}:{port} {Fore.YELLOW}{age}s old {Fore.GREEN}expires {expires}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Certificate path building against a trust store that is parsed once per process.
+
+The trust anchors are indexed by subject and Subject Key Identifier, so finding
+the issuer of a certificate is a dictionary lookup, and every verification in a
+run shares the same index. Chains the server sent incompletely are completed
+from the local intermediate cache (certificates downloaded from caIssuers AIA
+URLs before, kept next to the certificate cache) and, when allowed, from AIA.
+"""
+
+import argparse
+import functools
+import hashlib
+import os
+import re
+import ssl
+import sys
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from colorama import Fore, init
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
+from cryptography.utils import CryptographyDeprecationWarning
+from cryptography.hazmat.primitives import hashes, serialization
+
+import output
+import timings
+from cert_cache import cache_path
+from crl import write_atomic
+from tls_common import DEFAULT_PORT, parse_target, read_targets
+from tls_inspect import (
+    format_date,
+    hostname_matches,
+    inspect_cached,
+    not_after,
+    not_before,
+    openssl_name,
+    subject_alt_names,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+USER_AGENT = "ssl-utils"
+REQUEST_TIMEOUT = 15
+MAX_DEPTH = 8
+DEFAULT_WORKERS = 16
+
+PEM_CERTIFICATE = re.compile(
+    rb"-----BEGIN CERTIFICATE-----.+?-----END CERTIFICATE-----", re.DOTALL
+)
+
+SOURCE_LABELS = {
+    "leaf": "",
+    "presented": "sent by server",
+    "root": "trust store",
+    "cache": "local intermediate cache",
+    "aia": "downloaded from AIA",
+}
+STATUS_COLORS = {
+    "ok": Fore.GREEN,
+    "misordered": Fore.YELLOW,
+    "incomplete": Fore.YELLOW,
+    "hostname_mismatch": Fore.RED,
+    "expired": Fore.RED,
+    "untrusted": Fore.RED,
+}
+
+
+def aia_dir():
+    return os.path.join(os.path.dirname(cache_path()), "aia")
+
+
+def access_locations(cert, method):
+    try:
+        aia = cert.extensions.get_extension_for_oid(
+            x509.oid.ExtensionOID.AUTHORITY_INFORMATION_ACCESS
+        ).value
+    except x509.ExtensionNotFound:
+        return []
+    return [
+        description.access_location.value
+        for description in aia
+        if description.access_method == method
+        and isinstance(description.access_location, x509.UniformResourceIdentifier)
+    ]
+
+
+def key_identifier(cert, oid):
+    try:
+        value = cert.extensions.get_extension_for_oid(oid).value
+    except (x509.ExtensionNotFound, ValueError):
+        return None
+    if oid == x509.oid.ExtensionOID.SUBJECT_KEY_IDENTIFIER:
+        return value.digest
+    return value.key_identifier
+
+
+def parse_issuers(data):
+    """The certificates of a caIssuers download: PEM, DER or a PKCS#7 bundle."""
+    if b"-----BEGIN" in data:
+        return x509.load_pem_x509_certificates(data)
+    try:
+        return [x509.load_der_x509_certificate(data)]
+    except ValueError:
+        # PKCS#7 "certs-only" bundles are also common here
+        from cryptography.hazmat.primitives.serialization import pkcs7
+
+        return pkcs7.load_der_pkcs7_certificates(data)
+
+
+def fetch_issuer(cert):
+    """
+    The issuer named in the caIssuers AIA entry, for chains that lack it, or None when
+    no location serves a certificate. Downloads are kept in the local intermediate
+    cache, so each URL is fetched only once.
+    """
+    for url in access_locations(
+        cert, x509.oid.AuthorityInformationAccessOID.CA_ISSUERS
+    ):
+        if not url.lower().startswith(("http://", "https://")):
+            continue
+        path = os.path.join(aia_dir(), hashlib.sha256(url.encode()).hexdigest()[:32])
+        try:
+            with open(path + ".der", "rb") as f:
+                return x509.load_der_x509_certificate(f.read())
+        except (OSError, ValueError):
+            pass
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        with timings.span("aia_fetch", url=url):
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                data = response.read()
+        try:
+            certificates = parse_issuers(data)
+        except ValueError:
+            certificates = []
+        if not certificates:
+            # Nothing usable here (an empty PKCS#7 bundle is common), try the next location
+            continue
+        issuer = next(
+            (found for found in certificates if found.subject == cert.issuer),
+            certificates[0],
+        )
+        os.makedirs(aia_dir(), exist_ok=True)
+        write_atomic(path + ".der", issuer.public_bytes(serialization.Encoding.DER))
+        return issuer
+    return None
+
+
+def read_certificates(path):
+    """Every certificate in a PEM bundle or DER file, skipping any that do not parse."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"-----BEGIN" not in data:
+        try:
+            return [x509.load_der_x509_certificate(data)]
+        except ValueError:
+            return []
+    certificates = []
+    for block in PEM_CERTIFICATE.finditer(data):
+        try:
+            certificates.append(x509.load_pem_x509_certificate(block.group()))
+        except ValueError:
+            continue
+    return certificates
+
+
+def certificate_files(path):
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name)
+        for name in os.listdir(path)
+        if os.path.isfile(os.path.join(path, name))
+    )
+
+
+class CertificateIndex:
+    """Certificates indexed by subject and by Subject Key Identifier."""
+
+    def __init__(self, certificates=()):
+        self.by_subject = {}
+        self.by_key_id = {}
+        self.fingerprints = set()
+        for cert in certificates:
+            self.add(cert)
+
+    def add(self, cert):
+        digest = cert.fingerprint(hashes.SHA256())
+        if digest in self.fingerprints:
+            return
+        self.fingerprints.add(digest)
+        self.by_subject.setdefault(cert.subject, []).append(cert)
+        key_id = key_identifier(cert, x509.oid.ExtensionOID.SUBJECT_KEY_IDENTIFIER)
+        if key_id:
+            self.by_key_id.setdefault(key_id, []).append(cert)
+
+    def add_files(self, paths):
+        with warnings.catch_warnings():
+            # Some long-lived roots have non-positive serials, which cryptography warns about
+            warnings.simplefilter("ignore", CryptographyDeprecationWarning)
+            for path in paths:
+                for name in certificate_files(path):
+                    try:
+                        certificates = read_certificates(name)
+                    except OSError:
+                        continue
+                    for cert in certificates:
+                        self.add(cert)
+        return self
+
+    def candidates(self, cert):
+        """Possible issuers of `cert`: by Authority Key Identifier, else by issuer name."""
+        key_id = key_identifier(cert, x509.oid.ExtensionOID.AUTHORITY_KEY_IDENTIFIER)
+        if key_id and key_id in self.by_key_id:
+            return self.by_key_id[key_id]
+        return self.by_subject.get(cert.issuer, [])
+
+    def __contains__(self, cert):
+        return cert.fingerprint(hashes.SHA256()) in self.fingerprints
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+
+@functools.lru_cache(maxsize=None)
+def trust_store(paths=None):
+    """
+    The trust anchors in `paths` (files or directories), parsed once per process.
+    Defaults to the CA bundle the ssl module uses, honouring SSL_CERT_FILE.
+    """
+    if paths is None:
+        defaults = ssl.get_default_verify_paths()
+        # The hashed capath holds the same roots again, only read it without a bundle
+        path = defaults.cafile or defaults.capath
+        paths = (path,) if path else ()
+    return CertificateIndex().add_files(paths)
+
+
+def cached_intermediates(paths=()):
+    """The local intermediate cache, plus any extra intermediate files or directories."""
+    return CertificateIndex().add_files([aia_dir(), *paths])
+
+
+def find_leaf(chain):
+    """The certificate that issued none of the others, normally the first one."""
+    issuers = {cert.issuer for cert in chain if cert.issuer != cert.subject}
+    return next((cert for cert in chain if cert.subject not in issuers), chain[0])
+
+
+def valid_at(cert, now):
+    return not_before(cert) <= now <= not_after(cert)
+
+
+def is_ca(cert):
+    """
+    Whether `cert` may issue certificates: basic constraints CA=TRUE and, when it has a
+    key usage, keyCertSign. Self-signed X.509 v1 roots predate both extensions and
+    count as CAs, as they do for OpenSSL.
+    """
+    try:
+        constraints = cert.extensions.get_extension_for_class(x509.BasicConstraints)
+    except x509.ExtensionNotFound:
+        return cert.version == x509.Version.v1 and cert.issuer == cert.subject
+    if not constraints.value.ca:
+        return False
+    try:
+        usage = cert.extensions.get_extension_for_class(x509.KeyUsage)
+    except x509.ExtensionNotFound:
+        return True
+    return usage.value.key_cert_sign
+
+
+def path_length(cert):
+    """The pathLenConstraint of a CA certificate, None when unlimited."""
+    try:
+        constraints = cert.extensions.get_extension_for_class(x509.BasicConstraints)
+    except x509.ExtensionNotFound:
+        return None
+    return constraints.value.path_length
+
+
+class ChainBuilder:
+    """
+    Builds paths from leaf certificates to a trust anchor. One builder is meant to
+    check a whole fleet: the trust store, the intermediate cache and the results of
+    signature checks are shared by every call.
+    """
+
+    def __init__(self, roots=None, intermediates=None, fetch=True):
+        self.roots = trust_store() if roots is None else roots
+        self.intermediates = (
+            cached_intermediates() if intermediates is None else intermediates
+        )
+        self.fetch = fetch
+        # (certificate, issuer) fingerprints -> whether the signature verifies
+        self.signatures = {}
+
+    def signed_by(self, cert, issuer):
+        key = (cert.fingerprint(hashes.SHA256()), issuer.fingerprint(hashes.SHA256()))
+        result = self.signatures.get(key)
+        if result is None:
+            try:
+                cert.verify_directly_issued_by(issuer)
+                result = True
+            except (ValueError, TypeError, InvalidSignature, UnsupportedAlgorithm):
+                result = False
+            self.signatures[key] = result
+        return result
+
+    def issuers(self, cert, presented, now):
+        """
+        Verified issuers of `cert` as (issuer, source), currently valid ones first.
+        Only CA certificates qualify, whatever they signed.
+        """
+        for source, index in (
+            ("root", self.roots),
+            ("presented", presented),
+            ("cache", self.intermediates),
+        ):
+            found = [
+                c
+                for c in index.candidates(cert)
+                if is_ca(c) and self.signed_by(cert, c)
+            ]
+            found.sort(key=lambda candidate: not valid_at(candidate, now))
+            for issuer in found:
+                yield issuer, source
+        if not self.fetch:
+            return
+        try:
+            issuer = fetch_issuer(cert)
+        except (OSError, ValueError):
+            return
+        if issuer is not None and is_ca(issuer) and self.signed_by(cert, issuer):
+            self.intermediates.add(issuer)
+            yield issuer, "aia"
+
+    def build(self, leaf, presented=(), now=None):
+        """
+        Returns (path, trusted): the path as [(certificate, source)] from the leaf to
+        a trust anchor, or the longest partial path when there is none.
+        """
+        now = now or datetime.now(timezone.utc)
+        index = CertificateIndex(presented)
+        longest = [(leaf, "leaf")]
+
+        def extend(path, seen):
+            nonlocal longest
+            if len(path) > len(longest):
+                longest = path
+            if path[-1][0] in self.roots:
+                return path
+            if len(path) > MAX_DEPTH:
+                return None
+            # Intermediates below the next issuer; self-issued ones do not count
+            below = sum(cert.issuer != cert.subject for cert, _ in path[1:])
+            for issuer, source in self.issuers(path[-1][0], index, now):
+                digest = issuer.fingerprint(hashes.SHA256())
+                if digest in seen:
+                    continue
+                limit = path_length(issuer)
+                if limit is not None and below > limit:
+                    continue
+                found = extend(path + [(issuer, source)], seen | {digest})
+                if found:
+                    return found
+            return None
+
+        path = extend(longest, {leaf.fingerprint(hashes.SHA256())})
+        return (path, True) if path else (longest, False)
+
+    def check(self, chain, hostname=None, now=None):
+        """
+        Builds the path for a chain as it was served and audits it: missing
+        intermediates, wrong order, extra certificates, validity dates and hostname.
+        """
+        now = now or datetime.now(timezone.utc)
+        leaf = find_leaf(chain)
+        presented = [cert for cert in chain if cert != leaf]
+        with timings.span("chain_build", certificates=len(chain)):
+            path, trusted = self.build(leaf, presented, now)
+        issues = []
+        status = "ok"
+
+        positions = {cert: number for number, (cert, _) in enumerate(path)}
+        served = [positions[cert] for cert in chain if cert in positions]
+        extra = [cert for cert in presented if cert not in positions]
+        missing = [cert for cert, source in path[1:-1] if source in ("cache", "aia")]
+        if trusted and path[-1][1] in ("cache", "aia"):
+            missing.append(path[-1][0])
+        for cert in missing:
+            issues.append(f"missing intermediate {openssl_name(cert.subject)}")
+        if served != sorted(served):
+            issues.append("the chain is not in order, leaf first")
+        for cert in extra:
+            issues.append(
+                f"certificate not part of the path {openssl_name(cert.subject)}"
+            )
+        expired = [cert for cert, _ in path if not valid_at(cert, now)]
+        for cert in expired:
+            issues.append(
+                f"outside its validity period (until {format_date(not_after(cert))}) "
+                f"{openssl_name(cert.subject)}"
+            )
+        matches = None
+        if hostname:
+            matches = hostname_matches(hostname, subject_alt_names(leaf))
+            if not matches:
+                issues.append(f"not valid for {hostname}")
+        if not trusted:
+            issues.insert(
+                0,
+                "no path to a trusted root, no trusted issuer for "
+                + openssl_name(path[-1][0].subject),
+            )
+
+        if not trusted:
+            status = "untrusted"
+        elif expired:
+            status = "expired"
+        elif matches is False:
+            status = "hostname_mismatch"
+        elif missing:
+            status = "incomplete"
+        elif served != sorted(served) or extra:
+            status = "misordered"
+        return {
+            "status": status,
+            "trusted": trusted,
+            "hostname_match": matches,
+            "path": [
+                {
+                    "subject": openssl_name(cert.subject),
+                    "source": source,
+                    "not_after": not_after(cert),
+                }
+                for cert, source in path
+            ],
+            "issues": issues,
+        }
+
+
+def check_domain(builder, host, port):
+    try:
+        chain = inspect_cached(host, port)["certificates"]
+    except (OSError, ssl.SSLError) as e:
+        return {"status": "error", "error": f"Failed to retrieve the certificate: {e}"}
+    if not chain:
+        return {"status": "error", "error": "no certificate presented"}
+    return builder.check(chain, hostname=host)
+
+
+def check_file(builder, path):
+    """A bundle is checked like a served chain, which should be leaf first."""
+    try:
+        chain = read_certificates(path)
+    except OSError as e:
+        return {"status": "error", "error": f"Failed to read the certificate: {e}"}
+    if not chain:
+        return {"status": "error", "error": "no certificate found"}
+    return builder.check(chain)
+
+
+def print_record(label, record):
+    if record["status"] == "error":
+        print(f"{Fore.RED}ERROR      {Fore.CYAN}{label} {Fore.RED}{record['error']}")
+        return
+    color = STATUS_COLORS[record["status"]]
+    print(f"{color}{record['status'].upper():<10} {Fore.CYAN}{label}")
+    for depth, entry in enumerate(record["path"]):
+        source = SOURCE_LABELS[entry["source"]]
+        print(
+            f"  {depth} {entry['subject']}{Fore.MAGENTA}"
+            + (f" ({source})" if source else "")
+        )
+    for issue in record["issues"]:
+        print(f"  {Fore.YELLOW}! {issue}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl verify",
+        description="Build and verify certificate chains against the trust store.",
+    )
+    parser.add_argument("domains", nargs="*", help="host or host:port to check.")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "-f", "--file", help="File with one host[:port] per line ('-' for stdin)."
+    )
+    parser.add_argument(
+        "-c",
+        "--cert",
+        action="append",
+        default=[],
+        help="Certificate file or bundle (leaf first) to check. Repeatable.",
+    )
+    parser.add_argument(
+        "--ca",
+        action="append",
+        help="Trust anchors (file or directory) instead of the system store. Repeatable.",
+    )
+    parser.add_argument(
+        "--intermediates",
+        action="append",
+        default=[],
+        help="Extra intermediate certificates (file or directory). Repeatable.",
+    )
+    parser.add_argument(
+        "--no-fetch",
+        action="store_true",
+        help="Do not download missing intermediates from AIA.",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_intermixed_args(argv)
+
+    try:
+        targets = [parse_target(domain, args.port) for domain in args.domains]
+    except ValueError as e:
+        parser.error(str(e))
+    invalid = []
+
+    def collect(line, error):
+        invalid.append((line, str(error)))
+
+    if args.file:
+        try:
+            if args.file == "-":
+                targets.extend(read_targets(sys.stdin, args.port, collect))
+            else:
+                with open(args.file) as stream:
+                    targets.extend(read_targets(stream, args.port, collect))
+        except OSError as e:
+            parser.error(f"cannot read {args.file}: {e}")
+    if not targets and not args.cert and not invalid:
+        print(
+            f"{Fore.RED}Usage: ssl verify <domain> [domain ...] [--cert file.pem ...]"
+        )
+        return 1
+
+    builder = ChainBuilder(
+        roots=trust_store(tuple(args.ca)) if args.ca else None,
+        intermediates=cached_intermediates(args.intermediates),
+        fetch=not args.no_fetch,
+    )
+    jobs = [(f"{host}:{port}", check_domain, (host, port)) for host, port in targets]
+    jobs += [(path, check_file, (path,)) for path in args.cert]
+
+    failed = False
+    for label, error in invalid:
+        failed = True
+        record = {"status": "error", "error": error}
+        if output.structured():
+            output.emit("verify", {"target": label, **record})
+        else:
+            print_record(label, record)
+    with ThreadPoolExecutor(args.workers) as pool:
+        results = pool.map(lambda job: job[1](builder, *job[2]), jobs)
+        for (label, _, _), record in zip(jobs, results):
+            failed = failed or record["status"] != "ok"
+            if output.structured():
+                output.emit("verify", {"target": label, **record})
+            else:
+                print_record(label, record)
+    output.finish()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,57 +1,110 @@
 #!/usr/bin/env python3
 
-import sys
+import argparse
+import codecs
+import os
 import re
+import sys
 from colorama import init, Fore, Style
 
 init(autoreset=True)
 
-# Define regex patterns for colorization
-patterns = {
-    "subject": (re.compile(r"(subject=)"), Fore.GREEN),
-    "issuer": (re.compile(r"(issuer=)"), Fore.MAGENTA),
+# Text to colorize in `openssl s_client -showcerts` style output, with its color
+patterns = [
+    ("subject=", Fore.GREEN),
+    ("issuer=", Fore.MAGENTA),
     # -------------------------------------------------
-    "s:CN =": (re.compile(r"(s:CN =)"), Fore.GREEN),
-    "i:C =": (re.compile(r"(i:C =)"), Fore.LIGHTYELLOW_EX),
-    "a:PKEY:": (re.compile(r"(a:PKEY:)"), Fore.BLUE),
-    "v:NotBefore:": (re.compile(r"(v:NotBefore:)"), Fore.MAGENTA),
-    "s:C": (re.compile(r"(s:C =)"), Fore.LIGHTYELLOW_EX),
-    "i:C =": (re.compile(r"(i:C =)"), Fore.LIGHTYELLOW_EX),
-    "i:OU =": (re.compile(r"(i:OU =)"), Fore.LIGHTYELLOW_EX),
-    "O =": (re.compile(r"(O =)"), Fore.MAGENTA),
-    "s:b": (re.compile(r"(s:b)"), Fore.LIGHTYELLOW_EX),
+    ("s:CN =", Fore.GREEN),
+    ("i:C =", Fore.LIGHTYELLOW_EX),
+    ("a:PKEY:", Fore.BLUE),
+    ("v:NotBefore:", Fore.MAGENTA),
+    ("s:C =", Fore.LIGHTYELLOW_EX),
+    ("i:OU =", Fore.LIGHTYELLOW_EX),
+    ("O =", Fore.MAGENTA),
+    ("s:b", Fore.LIGHTYELLOW_EX),
     # -------------------------------------------------
-    "No client": (re.compile(r"(No client)"), Fore.LIGHTCYAN_EX),
-    "Peer signing digest:": (re.compile(r"(Peer signing digest:)"), Fore.LIGHTCYAN_EX),
-    "Peer signature type:": (re.compile(r"(Peer signature type:)"), Fore.LIGHTCYAN_EX),
-    "Server Temp Key": (re.compile(r"(Server Temp Key:)"), Fore.LIGHTCYAN_EX),
+    ("No client", Fore.LIGHTCYAN_EX),
+    ("Peer signing digest:", Fore.LIGHTCYAN_EX),
+    ("Peer signature type:", Fore.LIGHTCYAN_EX),
+    ("Server Temp Key:", Fore.LIGHTCYAN_EX),
     # -------------------------------------------------
-    "SSL handshake": (re.compile(r"(SSL handshake)"), Fore.YELLOW),
-    "Verification": (re.compile(r"(Verification)"), Fore.YELLOW),
+    ("SSL handshake", Fore.YELLOW),
+    ("Verification", Fore.YELLOW),
     # -------------------------------------------------
-    "TLSv": (re.compile(r"(New,)"), Fore.CYAN),
-    "Server": (re.compile(r"(Server public)"), Fore.CYAN),
-    "Secure": (re.compile(r"(Secure)"), Fore.CYAN),
-    "Compression:": (re.compile(r"(Compression:)"), Fore.CYAN),
-    "Expansion:": (re.compile(r"(Expansion:)"), Fore.CYAN),
-    "No ALPN": (re.compile(r"(No ALPN)"), Fore.CYAN),
-    "Early": (re.compile(r"(Early)"), Fore.CYAN),
-    "SSL-": (re.compile(r"(SSL-)"), Fore.CYAN),
-    "Post-Handshake": (re.compile(r"(Post-Handshake)"), Fore.CYAN),
-    "Verify": (re.compile(r"(Verify)"), Fore.GREEN),
-}
-
-# Read from stdin and apply colorization
-for line in sys.stdin:
-    colored_line = line
-    for key, value in patterns.items():
-        if key == "hex_line":
-            # Special handling for hex lines
-            def repl(m):
-                return f"{value[1]}{m.group(1)}{value[2]}{m.group(2)}{value[3]}{m.group(3)}"
-
-            colored_line = value[0].sub(repl, colored_line)
-        else:
-            # Replace the pattern with itself (referenced by \1) prefixed with the color code
-            colored_line = value[0].sub(value[1] + r"\1", colored_line)
-    sys.stdout.write(colored_line)
+    ("New,", Fore.CYAN),
+    ("Server public", Fore.CYAN),
+    ("Secure", Fore.CYAN),
+    ("Compression:", Fore.CYAN),
+    ("Expansion:", Fore.CYAN),
+    ("No ALPN", Fore.CYAN),
+    ("Early", Fore.CYAN),
+    ("SSL-", Fore.CYAN),
+    ("Post-Handshake", Fore.CYAN),
+    ("Verify", Fore.GREEN),
+]
+
+
+def compile_patterns(patterns):
+    """
+    Compiles every pattern into one alternation so each line is scanned once. The
+    patterns are literals, so the matched text itself selects the color. Longer texts
+    come first so they win over their own prefixes, and a lookahead on the possible
+    first characters lets the scan skip everything else (mostly base64) quickly.
+    """
+    ordered = sorted((text for text, _ in patterns), key=len, reverse=True)
+    first_chars = "".join(sorted({re.escape(text[0]) for text in ordered}))
+    alternation = "|".join(re.escape(text) for text in ordered)
+    replacements = {text: color + text for text, color in patterns}
+    return re.compile(f"(?=[{first_chars}])(?:{alternation})"), replacements
+
+
+regex, replacements = compile_patterns(patterns)
+
+
+def colorize(text):
+    # Line ends reset the color so whole buffers can be colored in one call
+    colored = regex.sub(lambda m: replacements[m.group()], text)
+    return colored.replace("\n", Style.RESET_ALL + "\n")
+
+
+def stream(infile, outfile, chunk_size=65536):
+    """
+    Colors input as it arrives: every read is colored up to its last complete line and
+    written immediately, instead of waiting for the producer to finish.
+    """
+    fd = infile.fileno()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        chunk = os.read(fd, chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        complete, newline, pending = pending.rpartition("\n")
+        if newline:
+            outfile.write(colorize(complete + newline))
+            outfile.flush()
+    if pending:
+        outfile.write(colorize(pending))
+        outfile.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Colorize openssl s_client output read from stdin."
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write colored lines as they arrive instead of after end of input.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.stream:
+        stream(sys.stdin, sys.stdout)
+    else:
+        sys.stdout.write(colorize(sys.stdin.read()))
+
+
+if __name__ == "__main__":
+    main()
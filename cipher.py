@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+
+import argparse
+import socket
+import ssl
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from colorama import Fore, Style, init
+
+import output
+from tls_common import (
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    TLS_VERSIONS,
+    parse_target,
+    probe_context,
+    read_targets,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+# Every cipher the local OpenSSL knows, including the ones it would never offer by default
+ALL_CIPHERS = "ALL:COMPLEMENTOFALL:@SECLEVEL=0"
+WEAK_MARKERS = ["NULL", "EXP", "RC4", "DES", "MD5", "ADH", "AECDH", "anon"]
+
+
+class Unreachable(Exception):
+    """The server could not be reached at all, as opposed to refusing a handshake."""
+
+
+def local_ciphers():
+    """Returns {name: cipher info} for every TLS 1.2 and older suite OpenSSL can offer."""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.set_ciphers(ALL_CIPHERS)
+    return {
+        cipher["name"]: cipher
+        for cipher in context.get_ciphers()
+        if cipher["protocol"] != "TLSv1.3"
+    }
+
+
+def grade(info):
+    """Rates a suite "weak", "ok" (no forward secrecy or no AEAD) or "strong"."""
+    name = info["name"]
+    if (
+        info["strength_bits"] < 128
+        or info["auth"] == "auth-null"
+        or any(marker in name for marker in WEAK_MARKERS)
+    ):
+        return "weak"
+    if info["kea"] in ("kx-ecdhe", "kx-dhe", "kx-any") and info["aead"]:
+        return "strong"
+    return "ok"
+
+
+def negotiate(host, port, server_name, version, ciphers, timeout):
+    """
+    Offers `ciphers` (in order) at one TLS version and returns the suite the server
+    picked, or None if it refused them all. Raises Unreachable on connection errors.
+    """
+    context = probe_context(
+        version, ":".join(ciphers) + ":@SECLEVEL=0" if ciphers else None
+    )
+    if context is None:
+        return None
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except OSError as e:
+        raise Unreachable(str(e))
+    try:
+        with context.wrap_socket(sock, server_hostname=server_name) as tls:
+            return tls.cipher()[0]
+    except (ssl.SSLError, ConnectionResetError, BrokenPipeError):
+        # Alerts, and servers that simply hang up on a ClientHello they don't like
+        return None
+    except OSError as e:
+        raise Unreachable(str(e))
+    finally:
+        sock.close()
+
+
+def enumerate_protocol(host, port, server_name, label, version, offered, timeout):
+    """
+    Finds the suites a server accepts at one TLS version by elimination: offer
+    everything, drop the suite the server picks, repeat until it refuses. That takes
+    one handshake per accepted suite plus one, instead of one per known suite.
+
+    If the server enforces its own order, the picks come out in that order, which one
+    more handshake offering the accepted suites reversed confirms.
+    """
+    result = {
+        "protocol": label,
+        "status": "rejected",
+        "ciphers": [],
+        "preference": None,
+        "handshakes": 0,
+    }
+    if version == ssl.TLSVersion.TLSv1_3:
+        # TLS 1.3 suites cannot be chosen through the ssl module (there is no
+        # set_ciphersuites), so only the suite the server negotiates is reported
+        if probe_context(version) is None:
+            result["status"] = "unavailable"
+            return result
+        result["handshakes"] = 1
+        picked = negotiate(host, port, server_name, version, None, timeout)
+        if picked:
+            result.update(
+                status="supported", ciphers=[picked], note="negotiated suite only"
+            )
+        return result
+
+    offered = list(offered)
+    if probe_context(version, ":".join(offered) + ":@SECLEVEL=0") is None:
+        result["status"] = "unavailable"
+        return result
+    accepted = []
+    while offered:
+        result["handshakes"] += 1
+        picked = negotiate(host, port, server_name, version, offered, timeout)
+        if picked is None or picked not in offered:
+            break
+        accepted.append(picked)
+        offered.remove(picked)
+    if not accepted:
+        return result
+
+    result.update(status="supported", ciphers=accepted)
+    if len(accepted) > 1:
+        result["handshakes"] += 1
+        picked = negotiate(host, port, server_name, version, accepted[::-1], timeout)
+        result["preference"] = "server" if picked == accepted[0] else "client"
+    return result
+
+
+def scan(targets, connections, timeout):
+    """
+    Enumerates every (host, protocol) pair in parallel on a pool of `connections`
+    threads, each holding at most one connection at a time. Yields one record per
+    host, in input order, as soon as all of its protocols are done.
+    """
+    known = local_ciphers()
+    offered = list(known)
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        jobs = [
+            (
+                host,
+                port,
+                time.perf_counter(),
+                [
+                    executor.submit(
+                        enumerate_protocol,
+                        host,
+                        port,
+                        host,
+                        label,
+                        version,
+                        offered,
+                        timeout,
+                    )
+                    for label, version in TLS_VERSIONS
+                ],
+            )
+            for host, port in targets
+        ]
+        for host, port, started, futures in jobs:
+            record = {"host": host, "port": port, "protocols": []}
+            try:
+                record["protocols"] = [future.result() for future in futures]
+            except Unreachable as e:
+                record["error"] = str(e)
+            for protocol in record["protocols"]:
+                protocol["ciphers"] = [
+                    describe(name, known) for name in protocol["ciphers"]
+                ]
+            record["handshakes"] = sum(p["handshakes"] for p in record["protocols"])
+            record["elapsed"] = round(time.perf_counter() - started, 3)
+            yield record
+
+
+def describe(name, known):
+    info = known.get(name)
+    if info is None:
+        # TLS 1.3 suites are all AEAD with forward secrecy
+        return {"name": name, "bits": None, "grade": "strong"}
+    return {"name": name, "bits": info["strength_bits"], "grade": grade(info)}
+
+
+def print_record(record, cipher_filter=None):
+    colors = {"strong": Fore.GREEN, "ok": Fore.YELLOW, "weak": Fore.RED}
+    print(
+        f"{Fore.GREEN}Supported TLS/SSL ciphers for {record['host']} on port {record['port']}"
+    )
+    if "error" in record:
+        print(f"{Fore.RED}  {record['error']}")
+        return
+    for protocol in record["protocols"]:
+        if protocol["status"] != "supported":
+            color = Fore.YELLOW if protocol["status"] == "unavailable" else Fore.RED
+            print(f"  {Fore.CYAN}{protocol['protocol']}: {color}{protocol['status']}")
+            continue
+        note = protocol.get("note")
+        if protocol["preference"]:
+            note = f"{protocol['preference']} preference"
+        note = f" ({note})" if note else ""
+        print(f"  {Fore.CYAN}{protocol['protocol']}:{Style.RESET_ALL}{note}")
+        for cipher in protocol["ciphers"]:
+            if cipher_filter and cipher_filter.lower() not in cipher["name"].lower():
+                continue
+            bits = f"{cipher['bits']} bits" if cipher["bits"] else ""
+            print(
+                f"    {cipher['name']:<40} {bits:<10} "
+                f"{colors[cipher['grade']]}{cipher['grade']}"
+            )
+    print(f"  {Style.DIM}{record['handshakes']} handshakes in {record['elapsed']:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl cipher",
+        description="Enumerate the TLS versions and cipher suites a server accepts.",
+    )
+    parser.add_argument(
+        "targets", nargs="*", help="host or host:port to scan (default port 443)."
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=DEFAULT_PORT, help="Default port."
+    )
+    parser.add_argument(
+        "-f", "--file", help="Read host[:port] lines from a file ('-' for stdin)."
+    )
+    parser.add_argument(
+        "--filter", help="Only list suites whose name contains this text."
+    )
+    parser.add_argument(
+        "-c",
+        "--connections",
+        type=int,
+        default=16,
+        help="Concurrent connections across all hosts (default: 16).",
+    )
+    parser.add_argument("-t", "--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument(
+        "--format", choices=output.FORMATS, help="Output format (default: text)."
+    )
+    args = parser.parse_args(argv)
+    if args.format:
+        output.set_format(args.format)
+
+    try:
+        targets = [parse_target(target, args.port) for target in args.targets]
+    except ValueError as e:
+        parser.error(str(e))
+    invalid = []
+
+    def collect(line, error):
+        invalid.append({"host": line, "port": None, "error": str(error)})
+
+    if args.file:
+        try:
+            if args.file == "-":
+                targets.extend(read_targets(sys.stdin, args.port, collect))
+            else:
+                with open(args.file) as f:
+                    targets.extend(read_targets(f, args.port, collect))
+        except OSError as e:
+            parser.error(f"cannot read {args.file}: {e}")
+    if not targets and not invalid:
+        parser.print_usage()
+        return 1
+
+    failed = False
+    for record in invalid:
+        failed = True
+        if output.structured():
+            output.emit("cipher", record)
+        else:
+            print(f"{Fore.RED}Skipping {record['host']}: {record['error']}")
+    for record in scan(targets, args.connections, args.timeout):
+        failed = failed or "error" in record
+        if output.structured():
+            output.emit("cipher", record)
+        else:
+            print_record(record, args.filter)
+    output.finish()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
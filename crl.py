@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import os
+import ssl
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from colorama import Fore, init
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+
+import output
+import timings
+from cert_cache import cache_path
+from tls_inspect import DEFAULT_PORT, inspect_cached
+
+# Initialize Colorama
+init(autoreset=True)
+
+USER_AGENT = "ssl-utils"
+DOWNLOAD_TIMEOUT = 30
+# Re-download CRLs without a nextUpdate after this many seconds
+DEFAULT_MAX_AGE = 3600
+
+# Parsed CRLs for this process, keyed by distribution point URL
+_indexes = {}
+
+
+def crl_dir():
+    return os.path.join(os.path.dirname(cache_path()), "crl")
+
+
+def distribution_points(cert):
+    """Returns the HTTP(S) CRL distribution point URLs of a certificate."""
+    try:
+        points = cert.extensions.get_extension_for_oid(
+            x509.oid.ExtensionOID.CRL_DISTRIBUTION_POINTS
+        ).value
+    except x509.ExtensionNotFound:
+        return []
+    return [
+        name.value
+        for point in points
+        for name in point.full_name or []
+        if isinstance(name, x509.UniformResourceIdentifier)
+        and name.value.lower().startswith(("http://", "https://"))
+    ]
+
+
+def next_update(crl):
+    if hasattr(crl, "next_update_utc"):
+        return crl.next_update_utc
+    return crl.next_update.replace(tzinfo=timezone.utc) if crl.next_update else None
+
+
+def load_crl(data):
+    if data.lstrip().startswith(b"-----BEGIN"):
+        return x509.load_pem_x509_crl(data)
+    return x509.load_der_x509_crl(data)
+
+
+def download_crl(url):
+    """
+    Returns (DER bytes, source) for a CRL, from the on-disk cache while it is before its
+    nextUpdate, otherwise with a conditional GET so unchanged CRLs are not re-downloaded.
+    """
+    name = hashlib.sha256(url.encode()).hexdigest()[:32]
+    data_path = os.path.join(crl_dir(), name + ".crl")
+    meta_path = os.path.join(crl_dir(), name + ".json")
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        with open(data_path, "rb") as f:
+            cached = f.read()
+    except (OSError, ValueError):
+        meta, cached = {}, None
+
+    now = time.time()
+    if cached is not None and now < meta.get("fresh_until", 0):
+        return cached, "cached"
+
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    if cached is not None:
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+    try:
+        with timings.span("crl_fetch", url=url):
+            with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+                data = response.read()
+                headers = response.headers
+        source = "downloaded"
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or cached is None:
+            raise
+        data, headers, source = cached, e.headers, "not modified"
+
+    crl = load_crl(data)
+    update = next_update(crl)
+    meta = {
+        "url": url,
+        "etag": headers.get("ETag") or meta.get("etag"),
+        "last_modified": headers.get("Last-Modified") or meta.get("last_modified"),
+        "fresh_until": update.timestamp() if update else now + DEFAULT_MAX_AGE,
+    }
+    os.makedirs(crl_dir(), exist_ok=True)
+    if data is not cached:
+        write_atomic(data_path, data)
+    write_atomic(meta_path, json.dumps(meta).encode())
+    return data, source
+
+
+def write_atomic(path, data):
+    """Writes `data` to a temporary file next to `path`, then renames it over `path`."""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def crl_index(url):
+    """
+    Returns (crl, revoked serial set, source) for a distribution point. The CRL is parsed
+    once per process and every membership check afterwards is a set lookup.
+    """
+    index = _indexes.get(url)
+    if index:
+        update = next_update(index[0])
+        if update is None or update > datetime.now(timezone.utc):
+            return index[0], index[1], "memory"
+
+    data, source = download_crl(url)
+    with timings.span("crl_parse", url=url, size=len(data)):
+        crl = load_crl(data)
+        serials = frozenset(revoked.serial_number for revoked in crl)
+    _indexes[url] = (crl, serials)
+    return crl, serials, source
+
+
+def check_certificates(certificates, issuers=None, workers=8):
+    """
+    Checks many certificates against their CRLs. Each distinct CRL is fetched and
+    parsed once, in parallel across distribution points. `issuers` maps an issuer
+    name to its certificate so CRL signatures can be verified.
+
+    Returns one record per certificate with a status of "good", "revoked" or "unknown".
+    A CRL that cannot be verified against the issuer of the certificate, or that is
+    past its nextUpdate, says nothing, so the status is then "unknown".
+    """
+    issuers = issuers or {}
+    urls = {url for cert in certificates for url in distribution_points(cert)[:1]}
+    indexes = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {url: executor.submit(crl_index, url) for url in urls}
+        for url, future in futures.items():
+            try:
+                indexes[url] = future.result()
+            except (OSError, ValueError) as e:
+                indexes[url] = e
+
+    records = []
+    for cert in certificates:
+        record = {
+            "serial": f"{cert.serial_number:X}",
+            "subject": cert.subject.rfc4514_string(),
+        }
+        points = distribution_points(cert)
+        if not points:
+            record.update(
+                status="unknown",
+                error="No CRL distribution point found in the certificate.",
+            )
+            records.append(record)
+            continue
+
+        record["url"] = points[0]
+        index = indexes[points[0]]
+        if isinstance(index, Exception):
+            record.update(
+                status="unknown",
+                error=f"Failed to download CRL from {points[0]}: {index}",
+            )
+            records.append(record)
+            continue
+
+        crl, serials, source = index
+        record["source"] = source
+        issuer = issuers.get(cert.issuer)
+        if issuer is None or crl.issuer != issuer.subject:
+            record.update(
+                status="unknown",
+                signature_valid=None,
+                error="The issuer certificate is not available to verify the CRL.",
+            )
+            records.append(record)
+            continue
+        try:
+            record["signature_valid"] = crl.is_signature_valid(issuer.public_key())
+        except (TypeError, InvalidSignature):
+            record["signature_valid"] = False
+        if not record["signature_valid"]:
+            record.update(
+                status="unknown",
+                error=f"The CRL signature does not verify against {issuer.subject.rfc4514_string()}.",
+            )
+            records.append(record)
+            continue
+        update = next_update(crl)
+        if update is not None and update < datetime.now(timezone.utc):
+            record.update(
+                status="unknown",
+                error=f"The CRL expired at {update:%Y-%m-%d %H:%M:%S} UTC and no newer one is published.",
+            )
+            records.append(record)
+            continue
+
+        if cert.serial_number in serials:
+            revoked = crl.get_revoked_certificate_by_serial_number(cert.serial_number)
+            record.update(status="revoked", revocation_date=revocation_date(revoked))
+        else:
+            record["status"] = "good"
+        records.append(record)
+    return records
+
+
+def revocation_date(revoked):
+    if hasattr(revoked, "revocation_date_utc"):
+        return revoked.revocation_date_utc
+    return revoked.revocation_date.replace(tzinfo=timezone.utc)
+
+
+def load_certificates(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"-----BEGIN" in data:
+        return x509.load_pem_x509_certificates(data)
+    return [x509.load_der_x509_certificate(data)]
+
+
+def print_record(label, record):
+    serial = record["serial"]
+    if record["status"] == "unknown":
+        print(f"{Fore.YELLOW}{label}: {record['error']}")
+        return
+    print(f"CRL distribution point for {label}: {record['url']} ({record['source']})")
+    if record["status"] == "revoked":
+        print(
+            f"{Fore.RED}Certificate with serial {serial} is REVOKED according to CRL "
+            f"(revoked {record['revocation_date']:%Y-%m-%d %H:%M:%S} UTC)."
+        )
+    else:
+        print(
+            f"{Fore.GREEN}Certificate with serial {serial} is NOT revoked according to CRL."
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl crl", description="CRL revocation status check."
+    )
+    parser.add_argument(
+        "domains", nargs="*", help="Domains to check the served certificate of."
+    )
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "-c",
+        "--cert",
+        action="append",
+        default=[],
+        help="PEM/DER certificate file or bundle to check. Repeatable.",
+    )
+    parser.add_argument(
+        "--issuer", help="Issuer certificate for --cert files without a chain."
+    )
+    args = parser.parse_intermixed_args(argv)
+
+    if not args.domains and not args.cert:
+        print(f"{Fore.RED}Usage: ssl crl <domain> [domain ...] [--cert file.pem ...]")
+        return 1
+
+    targets = []
+    issuers = {}
+    failures = []
+    for domain in args.domains:
+        if not output.structured():
+            print(f"{Fore.GREEN}Verifying CRL revocation status for {domain}...")
+        try:
+            result = inspect_cached(domain, args.port)
+        except (OSError, ssl.SSLError) as e:
+            failures.append((domain, f"Failed to retrieve the certificate: {e}"))
+            continue
+        chain = result["certificates"]
+        targets.append((domain, chain[0]))
+        for cert in chain[1:]:
+            issuers[cert.subject] = cert
+    if args.issuer:
+        try:
+            for cert in load_certificates(args.issuer):
+                issuers[cert.subject] = cert
+        except (OSError, ValueError) as e:
+            failures.append(
+                (args.issuer, f"Failed to read the issuer certificate: {e}")
+            )
+    for path in args.cert:
+        try:
+            certificates = load_certificates(path)
+        except (OSError, ValueError) as e:
+            failures.append((path, f"Failed to read the certificate: {e}"))
+            continue
+        for number, cert in enumerate(certificates):
+            targets.append(
+                (path if len(certificates) == 1 else f"{path}[{number}]", cert)
+            )
+            issuers[cert.subject] = cert
+
+    for label, error in failures:
+        if output.structured():
+            output.emit("crl", {"target": label, "status": "unknown", "error": error})
+        else:
+            print(f"{Fore.RED}{label}: {error}")
+    # Issuers missing from the chains come from their caIssuers AIA URL, like `ssl ocsp`
+    from chain_builder import fetch_issuer
+
+    for label, cert in targets:
+        if cert.issuer not in issuers and cert.issuer != cert.subject:
+            try:
+                issuer = fetch_issuer(cert)
+            except (OSError, ValueError):
+                issuer = None
+            if issuer is not None:
+                issuers[issuer.subject] = issuer
+    records = check_certificates([cert for _, cert in targets], issuers)
+    for (label, _), record in zip(targets, records):
+        if output.structured():
+            output.emit("crl", {"target": label, **record})
+        else:
+            print_record(label, record)
+    output.finish()
+    if any(record["status"] == "revoked" for record in records):
+        return 2
+    if not targets or failures:
+        return 1
+    return 0 if all(record["status"] == "good" for record in records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
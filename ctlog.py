@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Local mirror of Certificate Transparency entries with a SAN index.
+
+Entries come from a log's RFC 6962 get-entries API (`ssl ctlog sync <log url>`),
+resuming from the tree size stored for that log, or from local dumps: saved
+get-entries responses (JSON, or one entry per line) and PEM/DER certificates.
+Every DNS name is stored reversed by label (www.example.com becomes
+com.example.www), so a name and everything below it is one index range scan.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from colorama import Fore, Style, init
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+
+import output
+from cert_cache import cache_path
+from crl import USER_AGENT
+from tls_inspect import get_name_value, not_after, not_before, subject_alt_names
+
+# Initialize Colorama
+init(autoreset=True)
+
+REQUEST_TIMEOUT = 30
+DEFAULT_BATCH = 256
+DEFAULT_WORKERS = 4
+# RFC 6962 precertificate poison extension
+POISON_OID = x509.ObjectIdentifier("1.3.6.1.4.1.11129.2.4.3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    url TEXT PRIMARY KEY,
+    tree_size INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS certs (
+    id INTEGER PRIMARY KEY,
+    sha256 BLOB NOT NULL UNIQUE,
+    common_name TEXT,
+    issuer TEXT NOT NULL,
+    serial TEXT NOT NULL,
+    not_before REAL NOT NULL,
+    not_after REAL NOT NULL,
+    precert INTEGER NOT NULL,
+    log TEXT,
+    entry_index INTEGER,
+    logged_at REAL,
+    der BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    rname TEXT NOT NULL,
+    cert_id INTEGER NOT NULL,
+    PRIMARY KEY (rname, cert_id)
+) WITHOUT ROWID;
+"""
+
+
+def db_path():
+    return os.path.join(os.path.dirname(cache_path()), "ctlog.sqlite")
+
+
+def connect(path=None):
+    path = path or db_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    db = sqlite3.connect(path, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    return db
+
+
+def reverse_name(name):
+    return ".".join(reversed(name.strip().lower().rstrip(".").split(".")))
+
+
+def forward_name(rname):
+    return ".".join(reversed(rname.split(".")))
+
+
+def query_condition(query):
+    """
+    SQL condition and parameters on names.rname for a query. "example.com" is an exact
+    name; "*" (or "%") stands for any labels, so "*.example.com" is everything below
+    example.com and "api.*.example.com" the api hosts in it. The labels before the
+    first wildcard, counted from the right, bound the index range that is scanned.
+    """
+    pattern = reverse_name(query.replace("%", "*"))
+    prefix = pattern.split("*", 1)[0]
+    if prefix == pattern:
+        return "n.rname = ?", [pattern]
+    if not prefix:
+        return "n.rname GLOB ?", [pattern]
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return "(n.rname >= ? AND n.rname < ? AND n.rname GLOB ?)", [prefix, upper, pattern]
+
+
+def in_zones(rnames, zones):
+    """True if any reversed name is one of the reversed zones or below one."""
+    if not zones:
+        return True
+    for rname in rnames:
+        labels = rname.split(".")
+        for end in range(1, len(labels) + 1):
+            if ".".join(labels[:end]) in zones:
+                return True
+    return False
+
+
+def parse_entry(leaf_input, extra_data):
+    """
+    Returns (DER certificate, timestamp in ms) of a get-entries entry. X.509 entries
+    carry the certificate in the MerkleTreeLeaf; for precertificates the signed
+    precertificate is the first certificate of extra_data.
+    """
+    if len(leaf_input) < 15 or leaf_input[:2] != b"\x00\x00":
+        raise ValueError("not a v1 timestamped entry")
+    timestamp, entry_type = struct.unpack_from("!QH", leaf_input, 2)
+    if entry_type == 0:
+        data, offset = leaf_input, 12
+    elif entry_type == 1:
+        data, offset = extra_data, 0
+    else:
+        raise ValueError(f"unknown entry type {entry_type}")
+    length = int.from_bytes(data[offset : offset + 3], "big")
+    der = data[offset + 3 : offset + 3 + length]
+    if not length or len(der) != length:
+        raise ValueError("truncated certificate")
+    return bytes(der), timestamp
+
+
+def cert_record(der, log=None, index=None, timestamp=None):
+    cert = x509.load_der_x509_certificate(der)
+    common_name = get_name_value(cert.subject, x509.NameOID.COMMON_NAME)
+    names = set(subject_alt_names(cert))
+    if common_name and "." in common_name and " " not in common_name:
+        names.add(common_name)
+    try:
+        cert.extensions.get_extension_for_oid(POISON_OID)
+        precert = True
+    except x509.ExtensionNotFound:
+        precert = False
+    return {
+        "sha256": hashlib.sha256(der).digest(),
+        "common_name": common_name,
+        "issuer": cert.issuer.rfc4514_string(),
+        "serial": f"{cert.serial_number:X}",
+        "not_before": not_before(cert).timestamp(),
+        "not_after": not_after(cert).timestamp(),
+        "precert": precert,
+        "log": log,
+        "entry_index": index,
+        "logged_at": timestamp / 1000 if timestamp else None,
+        "der": der,
+        "rnames": sorted({reverse_name(name) for name in names if name.strip()}),
+    }
+
+
+def store(db, records, zones=None):
+    """Inserts new certificates and their names; returns how many were new."""
+    stored = 0
+    for record in records:
+        if not in_zones(record["rnames"], zones):
+            continue
+        cursor = db.execute(
+            "INSERT OR IGNORE INTO certs (sha256, common_name, issuer, serial, "
+            "not_before, not_after, precert, log, entry_index, logged_at, der) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record["sha256"],
+                record["common_name"],
+                record["issuer"],
+                record["serial"],
+                record["not_before"],
+                record["not_after"],
+                record["precert"],
+                record["log"],
+                record["entry_index"],
+                record["logged_at"],
+                record["der"],
+            ),
+        )
+        if not cursor.rowcount:
+            continue
+        db.executemany(
+            "INSERT OR IGNORE INTO names VALUES (?, ?)",
+            [(rname, cursor.lastrowid) for rname in record["rnames"]],
+        )
+        stored += 1
+    return stored
+
+
+def parse_entries(entries, log, first_index):
+    """Certificate records of get-entries entries; unparsable entries are counted."""
+    records, errors = [], 0
+    for offset, entry in enumerate(entries):
+        try:
+            der, timestamp = parse_entry(
+                base64.b64decode(entry["leaf_input"]),
+                base64.b64decode(entry.get("extra_data", "")),
+            )
+            index = entry.get(
+                "index", None if first_index is None else first_index + offset
+            )
+            records.append(cert_record(der, log, index, timestamp))
+        except (KeyError, TypeError, ValueError) as e:
+            errors += 1
+            print(
+                f"{Fore.YELLOW}Skipping entry {offset} of {log}: {e}", file=sys.stderr
+            )
+    return records, errors
+
+
+def get_json(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        return json.load(response)
+
+
+def fetch_range(log, first, last):
+    """Entries first..last inclusive; logs may return fewer per request than asked."""
+    entries = []
+    while first + len(entries) <= last:
+        batch = get_json(
+            f"{log}/ct/v1/get-entries?start={first + len(entries)}&end={last}"
+        )["entries"]
+        if not batch:
+            raise ValueError(f"the log returned no entries at {first + len(entries)}")
+        entries.extend(batch)
+    return entries[: last - first + 1]
+
+
+def stored_tree_size(db, log):
+    row = db.execute("SELECT tree_size FROM logs WHERE url = ?", (log,)).fetchone()
+    return row[0] if row else None
+
+
+def sync(
+    db, log, start=None, limit=None, batch=DEFAULT_BATCH, workers=None, zones=None
+):
+    """
+    Mirrors a log from its stored tree size (or `start`, negative counts back from the
+    head) up to the current signed tree head. Ranges download concurrently but are
+    stored in order, and the tree size is committed with each range, so an interrupted
+    sync resumes where it stopped. Returns (first, end, entries, stored, errors).
+    """
+    log = log.rstrip("/")
+    tree_size = get_json(f"{log}/ct/v1/get-sth")["tree_size"]
+    first = stored_tree_size(db, log)
+    if first is None:
+        first = start or 0
+        first = max(tree_size + first, 0) if first < 0 else first
+    end = tree_size if limit is None else min(tree_size, first + limit)
+    ranges = [
+        (position, min(position + batch, end) - 1)
+        for position in range(first, end, batch)
+    ]
+
+    workers = workers or DEFAULT_WORKERS
+    entries = stored = errors = 0
+    with ThreadPoolExecutor(workers) as pool:
+        # A few windows ahead keeps the downloads busy without buffering the whole log
+        window = workers * 4
+        for offset in range(0, len(ranges), window):
+            chunk = ranges[offset : offset + window]
+            fetched = pool.map(lambda bounds: fetch_range(log, *bounds), chunk)
+            for (low, high), batch_entries in zip(chunk, fetched):
+                records, failed = parse_entries(batch_entries, log, low)
+                with db:
+                    stored += store(db, records, zones)
+                    db.execute(
+                        "INSERT OR REPLACE INTO logs VALUES (?, ?, ?)",
+                        (log, high + 1, time.time()),
+                    )
+                entries += len(batch_entries)
+                errors += failed
+            if sys.stderr.isatty():
+                print(
+                    f"\r{log}: {low + len(batch_entries)}/{end}",
+                    end="",
+                    file=sys.stderr,
+                )
+    if ranges and sys.stderr.isatty():
+        print(file=sys.stderr)
+    if not ranges:
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO logs VALUES (?, ?, ?)", (log, end, time.time())
+            )
+    return first, end, entries, stored, errors
+
+
+def read_dump(path):
+    """
+    Certificate records of a local dump: a get-entries response or a list of its
+    entries (JSON), one entry per line, or PEM/DER certificates.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.lstrip().startswith(b"-----BEGIN"):
+        return [
+            cert_record(cert.public_bytes(serialization.Encoding.DER), path)
+            for cert in x509.load_pem_x509_certificates(data)
+        ], 0
+    if data.lstrip()[:1] in (b"{", b"["):
+        try:
+            entries = json.loads(data)
+        except ValueError:
+            entries = [json.loads(line) for line in data.splitlines() if line.strip()]
+        if isinstance(entries, dict):
+            entries = entries.get("entries", [entries])
+        return parse_entries(entries, path, None)
+    return [cert_record(data, path)], 0
+
+
+def search(db, queries, valid=False, limit=None):
+    conditions, parameters = [], []
+    for query in queries:
+        condition, values = query_condition(query)
+        conditions.append(condition)
+        parameters.extend(values)
+    sql = (
+        "SELECT c.id, c.sha256, c.common_name, c.issuer, c.serial, c.not_before, "
+        "c.not_after, c.precert, c.log, c.entry_index, c.logged_at, "
+        "(SELECT group_concat(rname, ' ') FROM names WHERE cert_id = c.id) "
+        "FROM certs c WHERE c.id IN (SELECT n.cert_id FROM names n WHERE "
+        + " OR ".join(conditions)
+        + ")"
+    )
+    if valid:
+        now = time.time()
+        sql += " AND c.not_before <= ? AND c.not_after > ?"
+        parameters.extend([now, now])
+    sql += " ORDER BY c.not_before DESC, c.id DESC"
+    if limit:
+        sql += " LIMIT ?"
+        parameters.append(limit)
+
+    for row in db.execute(sql, parameters):
+        yield {
+            "sha256": row[1].hex(),
+            "common_name": row[2],
+            "names": sorted(forward_name(rname) for rname in row[11].split()),
+            "issuer": row[3],
+            "serial": row[4],
+            "not_before": datetime.fromtimestamp(row[5], timezone.utc),
+            "not_after": datetime.fromtimestamp(row[6], timezone.utc),
+            "precert": bool(row[7]),
+            "log": row[8],
+            "entry_index": row[9],
+            "logged_at": (
+                datetime.fromtimestamp(row[10], timezone.utc) if row[10] else None
+            ),
+        }
+
+
+def print_record(record, now):
+    color = Fore.RED if record["not_after"] < now else Fore.GREEN
+    kind = f" {Fore.MAGENTA}precert" if record["precert"] else ""
+    print(
+        f"{color}{record['not_before']:%Y-%m-%d} - {record['not_after']:%Y-%m-%d}"
+        f"{kind} {Fore.CYAN}{record['common_name'] or '-'} {Style.RESET_ALL}"
+        f"{' '.join(record['names'])} {Fore.YELLOW}{record['issuer']}"
+    )
+
+
+def read_zones(values, path):
+    zones = list(values)
+    if path:
+        with open(path) as f:
+            zones.extend(line.split("#", 1)[0].strip() for line in f)
+    return {reverse_name(zone.lstrip("*.")) for zone in zones if zone}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    actions = ["sync", "ingest", "search", "status"]
+    # `ssl ctlog example.com` searches, as the crt.sh lookup it replaces did
+    position = 2 if argv[:1] == ["--db"] else 0
+    if len(argv) > position and argv[position] not in actions + ["-h", "--help"]:
+        argv.insert(position, "search")
+
+    parser = argparse.ArgumentParser(
+        prog="ssl ctlog",
+        description="Mirror Certificate Transparency entries locally and search them "
+        "by name.",
+    )
+    parser.add_argument("--db", help=f"Index file (default {db_path()}).")
+    actions_parser = parser.add_subparsers(dest="action", required=True)
+
+    sync_parser = actions_parser.add_parser(
+        "sync", help="Fetch new entries from CT logs (RFC 6962 get-entries)."
+    )
+    sync_parser.add_argument(
+        "logs", nargs="+", help="Log URLs, e.g. https://ct.example/2025h1"
+    )
+    sync_parser.add_argument(
+        "--start",
+        type=int,
+        help="First entry for a log not synced before; negative counts back from the "
+        "tree head (default 0).",
+    )
+    sync_parser.add_argument(
+        "--limit", type=int, help="At most this many entries per log."
+    )
+    sync_parser.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    sync_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Concurrent requests.",
+    )
+
+    ingest_parser = actions_parser.add_parser(
+        "ingest", help="Load saved get-entries responses or PEM/DER certificates."
+    )
+    ingest_parser.add_argument("files", nargs="+")
+    for action_parser in (sync_parser, ingest_parser):
+        action_parser.add_argument(
+            "-z",
+            "--zone",
+            action="append",
+            default=[],
+            help="Only keep certificates for this zone and its subdomains. Repeatable.",
+        )
+        action_parser.add_argument("--zones", help="File with one zone per line.")
+
+    search_parser = actions_parser.add_parser(
+        "search",
+        help="Certificates by name: example.com, *.example.com, api.*.example.com",
+    )
+    search_parser.add_argument("queries", nargs="+")
+    search_parser.add_argument(
+        "--valid", action="store_true", help="Only currently valid certificates."
+    )
+    search_parser.add_argument("--limit", type=int)
+
+    actions_parser.add_parser("status", help="Synced logs and index size.")
+    args = parser.parse_args(argv)
+
+    try:
+        db = connect(args.db)
+    except (OSError, sqlite3.Error) as e:
+        print(f"{Fore.RED}Cannot open the CT index: {e}", file=sys.stderr)
+        return 1
+
+    if args.action == "search":
+        now = datetime.now(timezone.utc)
+        count = 0
+        for record in search(db, args.queries, args.valid, args.limit):
+            count += 1
+            if output.structured():
+                output.emit("ctlog", record)
+            else:
+                print_record(record, now)
+        output.finish()
+        if not count and not output.structured():
+            print(f"{Fore.YELLOW}No certificates in the local CT index match.")
+        return 0
+
+    if args.action == "status":
+        certs, names = db.execute(
+            "SELECT (SELECT count(*) FROM certs), (SELECT count(*) FROM names)"
+        ).fetchone()
+        for url, tree_size, synced_at in db.execute("SELECT * FROM logs ORDER BY url"):
+            synced = time.strftime("%Y-%m-%d %H:%M", time.localtime(synced_at))
+            print(
+                f"{Fore.CYAN}{url} {Fore.GREEN}{tree_size} entries {Fore.YELLOW}synced {synced}"
+            )
+        print(f"{certs} certificates, {names} names in {args.db or db_path()}")
+        return 0
+
+    try:
+        zones = read_zones(args.zone, args.zones)
+    except OSError as e:
+        parser.error(f"cannot read the zones: {e}")
+    failed = 0
+    if args.action == "ingest":
+        for path in args.files:
+            try:
+                records, errors = read_dump(path)
+                with db:
+                    stored = store(db, records, zones)
+            except (OSError, ValueError) as e:
+                print(f"{Fore.RED}FAILED {path}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            print(
+                f"{Fore.GREEN}{path}: {len(records)} certificates, {stored} new"
+                + (f", {errors} unreadable" if errors else "")
+            )
+    else:
+        for log in args.logs:
+            started = time.monotonic()
+            try:
+                first, end, entries, stored, errors = sync(
+                    db, log, args.start, args.limit, args.batch, args.workers, zones
+                )
+            except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+                print(f"{Fore.RED}FAILED {log}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            elapsed = time.monotonic() - started
+            print(
+                f"{Fore.GREEN}{log}: entries {first}-{end}, {entries} fetched, "
+                f"{stored} new"
+                + (f", {errors} unreadable" if errors else "")
+                + f" ({entries / elapsed if elapsed else 0:,.0f} entries/s)"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
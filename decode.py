@@ -1,98 +1,129 @@
 #!/usr/bin/env python3
 
+import argparse
+import re
+import sys
+
 from cryptography import x509
-from cryptography.hazmat.backends import default_backend
 from colorama import Fore, Style, init
-import sys
+
+import output
+from tls_inspect import (
+    fingerprint,
+    get_name_value,
+    not_after,
+    not_before,
+    subject_alt_names,
+)
 
 # Initialize Colorama
 init(autoreset=True)
 
-
-def decode_certificate(cert_pem):
-    try:
-        cert = x509.load_pem_x509_certificate(cert_pem.encode(), default_backend())
-
-        # Extract Common Name
-        subject_cn = next(
-            (
-                item.value
-                for item in cert.subject
-                if item.oid == x509.NameOID.COMMON_NAME
-            ),
-            None,
+PEM_BLOCK = re.compile(
+    rb"-----BEGIN (CERTIFICATE|CERTIFICATE REQUEST|NEW CERTIFICATE REQUEST)-----"
+    rb".+?-----END \1-----",
+    re.DOTALL,
+)
+
+
+def certificate_record(cert):
+    return {
+        "type": "certificate",
+        "common_name": get_name_value(cert.subject, x509.NameOID.COMMON_NAME),
+        "sans": subject_alt_names(cert),
+        "issuer": cert.issuer.rfc4514_string(),
+        "not_before": not_before(cert),
+        "not_after": not_after(cert),
+        "serial": f"{cert.serial_number:X}",
+        "fingerprint_sha256": fingerprint(cert),
+    }
+
+
+def csr_record(csr):
+    return {
+        "type": "csr",
+        "common_name": get_name_value(csr.subject, x509.NameOID.COMMON_NAME),
+        "sans": subject_alt_names(csr),
+        "signature_valid": csr.is_signature_valid,
+    }
+
+
+def decode_pem(data):
+    """Returns one record per certificate or CSR found in PEM data."""
+    records = []
+    for match in PEM_BLOCK.finditer(data):
+        try:
+            if match.group(1) == b"CERTIFICATE":
+                records.append(
+                    certificate_record(x509.load_pem_x509_certificate(match.group()))
+                )
+            else:
+                records.append(csr_record(x509.load_pem_x509_csr(match.group())))
+        except ValueError as e:
+            records.append({"type": match.group(1).decode().lower(), "error": str(e)})
+    return records
+
+
+def print_certificate(record):
+    print(Fore.MAGENTA + "Common Name:" + Fore.GREEN + f" {record['common_name']}")
+    if record["sans"]:
+        print(
+            Fore.MAGENTA
+            + "Subject Alternative Names:"
+            + Fore.GREEN
+            + f" {', '.join(record['sans'])}"
+        )
+    else:
+        print(Fore.YELLOW + "No Subject Alternative Names found.")
+    print(Fore.MAGENTA + "Issuer:" + Fore.GREEN + f" {record['issuer']}")
+    print(Fore.YELLOW + "Validity Period:")
+    print(
+        Fore.MAGENTA
+        + "Not Before:"
+        + Fore.GREEN
+        + f" {record['not_before']:%Y-%m-%d %H:%M:%S}"
+    )
+    print(
+        Fore.MAGENTA
+        + "Not After:"
+        + Fore.GREEN
+        + f" {record['not_after']:%Y-%m-%d %H:%M:%S}"
+    )
+
+
+def print_csr(record):
+    print(Fore.MAGENTA + "Common Name:" + Fore.GREEN + f" {record['common_name']}")
+    if record["sans"]:
+        print(
+            Fore.MAGENTA
+            + "Subject Alternative Names:"
+            + Fore.GREEN
+            + f" {', '.join(record['sans'])}"
         )
-        print(Fore.MAGENTA + "Common Name:" + Fore.GREEN + f" {subject_cn}")
+    else:
+        print(Fore.YELLOW + "No Subject Alternative Names found.")
 
-        # Extract SAN (Subject Alternative Names)
-        try:
-            san = cert.extensions.get_extension_for_oid(
-                x509.oid.ExtensionOID.SUBJECT_ALTERNATIVE_NAME
-            )
-            alt_names = san.value.get_values_for_type(x509.DNSName)
-            print(
-                Fore.MAGENTA
-                + "Subject Alternative Names:"
-                + Fore.GREEN
-                + f" {', '.join(alt_names)}"
-            )
-        except x509.ExtensionNotFound:
-            print(Fore.YELLOW + "No Subject Alternative Names found.")
-
-        # Extract Issuer Information
-        issuer = cert.issuer.rfc4514_string().replace("\n", ", ").strip(" /")
-        print(Fore.MAGENTA + "Issuer:" + Fore.GREEN + f" {issuer}")
-
-        # Extract Validity Period
-        print(Fore.YELLOW + "Validity Period:")
-        print(Fore.MAGENTA + "Not Before:" + Fore.GREEN + f" {cert.not_valid_before}")
-        print(Fore.MAGENTA + "Not After:" + Fore.GREEN + f" {cert.not_valid_after}")
-
-    except Exception as e:
-        print(Fore.RED + f"An error occurred: {e}")
+
+def print_record(record):
+    if "error" in record:
+        print(Fore.RED + f"An error occurred: {record['error']}")
+    elif record["type"] == "certificate":
+        print_certificate(record)
+    else:
+        print_csr(record)
+
+
+def decode_certificate(cert_pem):
+    for record in decode_pem(cert_pem.encode()) or [{"error": "no certificate found"}]:
+        print_record(record)
 
 
 def decode_csr(csr_pem):
-    try:
-        csr = x509.load_pem_x509_csr(csr_pem.encode(), default_backend())
-
-        # Extract requested Common Name
-        subject_cn = next(
-            (
-                item.value
-                for item in csr.subject
-                if item.oid == x509.NameOID.COMMON_NAME
-            ),
-            None,
-        )
-        print(Fore.MAGENTA + "Common Name:" + Fore.GREEN + f" {subject_cn}")
+    for record in decode_pem(csr_pem.encode()) or [{"error": "no CSR found"}]:
+        print_record(record)
 
-        # Extract SAN (Subject Alternative Names)
-        try:
-            san = csr.extensions.get_extension_for_oid(
-                x509.oid.ExtensionOID.SUBJECT_ALTERNATIVE_NAME
-            )
-            alt_names = san.value.get_values_for_type(x509.DNSName)
-            print(
-                Fore.MAGENTA
-                + "Subject Alternative Names:"
-                + Fore.GREEN
-                + f" {', '.join(alt_names)}"
-            )
-        except x509.ExtensionNotFound:
-            print(Fore.YELLOW + "No Subject Alternative Names found.")
-        except Exception as e:
-            print(Fore.RED + f"An error occurred extracting SAN: {e}")
-
-        # Extract CSR properties # Commented out cause of issues (!!)
-        # print(Fore.YELLOW + "CSR Properties:")
-        # print(Fore.MAGENTA + "Version:" + Fore.GREEN + f" {csr.version}")
-
-    except Exception as e:
-        print(Fore.RED + f"An error occurred: {e}")
-
-
-def main():
+
+def interactive():
     choice = input(
         f"{Fore.CYAN}Do you want to decode (1) certificate or (2) CSR? {Style.RESET_ALL}"
     ).upper()
@@ -129,5 +160,44 @@ def main():
         )
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl decode", description="Decode PEM certificates and CSRs."
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="PEM files to decode ('-' for stdin). Interactive without files.",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.files:
+        if not output.structured():
+            interactive()
+            return 0
+        args.files = ["-"]
+
+    failed = False
+    for path in args.files:
+        try:
+            if path == "-":
+                data = sys.stdin.buffer.read()
+            else:
+                with open(path, "rb") as f:
+                    data = f.read()
+        except OSError as e:
+            records = [{"error": str(e)}]
+        else:
+            records = decode_pem(data) or [{"error": "no certificate or CSR found"}]
+        for record in records:
+            failed = failed or "error" in record
+            if output.structured():
+                output.emit("decode", {"source": path, **record})
+            else:
+                print_record(record)
+    output.finish()
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
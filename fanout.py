@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+`ssl fetch` across every backend behind a name.
+
+Each backend gets one unverified handshake with the domain as SNI; its chain is
+then verified in Python against the shared trust store index, so a broken node
+costs no second connection. Backends are grouped by leaf and chain fingerprint,
+and every group that differs from the majority (or from --expect) is divergent.
+"""
+
+import hashlib
+import ipaddress
+import socket
+import ssl
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from colorama import Fore, Style, init
+from cryptography import x509
+
+import output
+from chain_builder import ChainBuilder, find_leaf
+from tls_common import DEFAULT_TIMEOUT, create_context
+from tls_inspect import (
+    days_left,
+    fingerprint,
+    format_date,
+    handshake,
+    not_after,
+    openssl_name,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+DEFAULT_WORKERS = 32
+# Largest backend list a fan-out accepts, a /20 in IPv4
+MAX_ADDRESSES = 4096
+
+
+def expand_addresses(values):
+    """
+    Addresses from comma-separated lists and CIDR ranges, in order, without repeats.
+    Raises ValueError past MAX_ADDRESSES, before a large range is expanded.
+    """
+    addresses = {}
+    for value in values:
+        for part in value.split(","):
+            part = part.strip()
+            if "/" in part:
+                network = ipaddress.ip_network(part, strict=False)
+                if network.num_addresses > MAX_ADDRESSES:
+                    raise ValueError(
+                        f"{part} has {network.num_addresses} addresses, "
+                        f"a fan-out checks at most {MAX_ADDRESSES}"
+                    )
+                hosts = list(network.hosts()) or [network.network_address]
+                addresses.update(dict.fromkeys(str(host) for host in hosts))
+            elif part:
+                addresses[part] = None
+            if len(addresses) > MAX_ADDRESSES:
+                raise ValueError(f"more than {MAX_ADDRESSES} backend addresses")
+    return list(addresses)
+
+
+def resolve(domain, port):
+    """Every A and AAAA address of a name."""
+    infos = socket.getaddrinfo(domain, port, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+def normalize_fingerprint(value):
+    return value.replace(":", "").upper()
+
+
+def check_backend(builder, domain, address, port, timeout=DEFAULT_TIMEOUT):
+    record = {"domain": domain, "address": address, "port": port}
+    started = time.perf_counter()
+    try:
+        result = handshake(address, port, domain, create_context(verify=False), timeout)
+    except (OSError, ssl.SSLError) as e:
+        record.update(status="error", error=str(e))
+        return record
+    record["handshake_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if not result["chain"]:
+        record.update(status="error", error="no certificate presented")
+        return record
+
+    try:
+        chain = [x509.load_der_x509_certificate(der) for der in result["chain"]]
+    except ValueError as e:
+        record.update(status="error", error=f"Cannot parse the certificate: {e}")
+        return record
+    leaf = find_leaf(chain)
+    check = builder.check(chain, hostname=domain)
+    record.update(
+        status=check["status"],
+        issues=check["issues"],
+        protocol=result["protocol"],
+        fingerprint=normalize_fingerprint(fingerprint(leaf)),
+        chain_fingerprint=hashlib.sha256(b"".join(result["chain"])).hexdigest(),
+        chain_length=len(chain),
+        not_after=not_after(leaf),
+        days_left=int(days_left(leaf)),
+        issuer=openssl_name(leaf.issuer),
+    )
+    return record
+
+
+def diff(records, expect=None):
+    """
+    Groups backends by leaf and chain fingerprint, largest group first, and marks
+    what sets every backend apart from the reference group: the one serving the
+    expected leaf fingerprint, otherwise the majority.
+    """
+    groups = {}
+    for record in records:
+        if "fingerprint" in record:
+            key = (record["fingerprint"], record["chain_fingerprint"])
+            groups.setdefault(key, []).append(record)
+    ordered = sorted(groups.items(), key=lambda item: -len(item[1]))
+
+    reference = ordered[0][1][0] if ordered else None
+    if expect:
+        expect = normalize_fingerprint(expect)
+        reference = next((group[0] for key, group in ordered if key[0] == expect), None)
+    for number, (_, group) in enumerate(ordered, 1):
+        for record in group:
+            record["group"] = number
+            divergent = []
+            if reference is None:
+                divergent.append("certificate")
+            else:
+                if record["fingerprint"] != reference["fingerprint"]:
+                    divergent.append("certificate")
+                if record["not_after"] != reference["not_after"]:
+                    divergent.append("expiry")
+                if record["chain_fingerprint"] != reference["chain_fingerprint"]:
+                    divergent.append("chain")
+            record["divergent"] = divergent
+    return [group for _, group in ordered]
+
+
+def print_groups(groups):
+    for number, group in enumerate(groups, 1):
+        first = group[0]
+        label = (
+            f"{Fore.RED}DIVERGENT: {', '.join(first['divergent'])}"
+            if first["divergent"]
+            else f"{Fore.GREEN}reference"
+        )
+        print(
+            f"{Fore.CYAN}Group {number}: {len(group)} backend(s) {Style.RESET_ALL}"
+            f"SHA256 {first['fingerprint'][:16]}... chain of {first['chain_length']}, "
+            f"expires {format_date(first['not_after'])}, {first['issuer']}  {label}"
+        )
+    print()
+
+
+def print_backend(record):
+    target = f"{record['address']}:{record['port']}"
+    if record["status"] == "error":
+        print(f"{Fore.RED}{target:<40} error  {record['error']}")
+        return
+    color = (
+        Fore.GREEN if record["status"] == "ok" and not record["divergent"] else Fore.RED
+    )
+    details = f"group {record['group']}, {record['days_left']} days left, "
+    details += f"{record['protocol']}, {record['handshake_ms']:.0f} ms"
+    print(f"{color}{target:<40} {record['status']:<18}{Style.RESET_ALL} {details}")
+    for issue in record["issues"]:
+        print(f"{Fore.YELLOW}{'':<41}! {issue}")
+
+
+def fetch_backends(domain, addresses, port, workers=DEFAULT_WORKERS, expect=None):
+    """Checks `domain` on every address concurrently and reports the differences."""
+    if not output.structured():
+        print(
+            f"{Fore.YELLOW}\nChecking SSL certificate for {domain} on {len(addresses)} "
+            f"backend(s), port {port}:\n"
+        )
+    builder = ChainBuilder()
+    started = time.monotonic()
+    with ThreadPoolExecutor(workers) as pool:
+        records = list(
+            pool.map(
+                lambda address: check_backend(builder, domain, address, port),
+                addresses,
+            )
+        )
+    groups = diff(records, expect)
+    elapsed = time.monotonic() - started
+
+    errors = sum(record["status"] == "error" for record in records)
+    divergent = sum(bool(record.get("divergent")) for record in records)
+    failing = sum(record["status"] not in ("ok", "error") for record in records)
+    if output.structured():
+        for record in records:
+            output.emit("fetch", record)
+        output.finish()
+    else:
+        print_groups(groups)
+        for record in records:
+            print_backend(record)
+    print(
+        f"{Fore.CYAN}\n{len(records)} backends in {elapsed:.1f}s: {len(groups)} distinct "
+        f"certificate chain(s), {divergent} divergent, {failing} failing checks, "
+        f"{errors} unreachable",
+        file=sys.stderr,
+    )
+    return 1 if errors or divergent or failing else 0
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+
+import argparse
+import http.client
+import ssl
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from colorama import Fore, init
+
+import output
+import timings
+from tls_common import (
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    create_context,
+    open_tls,
+    parse_target,
+    read_targets,
+    remember_session,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+USER_AGENT = "ssl-utils"
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST = 4
+# http.client only speaks HTTP/1.1, so hosts that pick h2 are re-connected with this
+HTTP1_ONLY = ("http/1.1",)
+# A year, the minimum the HSTS preload list accepts
+HSTS_MIN_AGE = 31536000
+
+SECURITY_HEADERS = [
+    "Strict-Transport-Security",
+    "Content-Security-Policy",
+    "X-Frame-Options",
+    "X-Content-Type-Options",
+    "Referrer-Policy",
+    "Permissions-Policy",
+]
+
+# Errors of a kept-alive connection the server closed in the meantime
+STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+def parse_hsts(value):
+    directives = {}
+    for part in value.split(";"):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives.setdefault(name.strip().lower(), argument.strip().strip('"'))
+    try:
+        max_age = int(directives["max-age"])
+    except (KeyError, ValueError):
+        max_age = None
+    result = {
+        "max_age": max_age,
+        "include_subdomains": "includesubdomains" in directives,
+        "preload": "preload" in directives,
+        "issues": [],
+    }
+    issues = result["issues"]
+    if max_age is None:
+        issues.append("HSTS has no valid max-age")
+    elif max_age == 0:
+        issues.append("HSTS max-age=0 removes the policy")
+    elif max_age < HSTS_MIN_AGE:
+        issues.append(f"HSTS max-age={max_age} is below one year")
+    if result["preload"] and (
+        not result["include_subdomains"] or (max_age or 0) < HSTS_MIN_AGE
+    ):
+        issues.append(
+            "HSTS preload needs includeSubDomains and a max-age of at least a year"
+        )
+    return result
+
+
+def parse_csp(value):
+    directives = {}
+    for part in value.split(";"):
+        tokens = part.split()
+        if tokens:
+            # Browsers ignore repeated directives, the first one applies
+            directives.setdefault(tokens[0].lower(), tokens[1:])
+    issues = []
+    scripts = directives.get("script-src", directives.get("default-src"))
+    if scripts is None:
+        issues.append("CSP has no script-src or default-src, any script may load")
+    else:
+        lowered = [source.lower() for source in scripts]
+        nonces = any(source.startswith(("'nonce-", "'sha")) for source in lowered)
+        if "'unsafe-inline'" in lowered and not nonces:
+            issues.append("CSP allows inline scripts ('unsafe-inline')")
+        if "'unsafe-eval'" in lowered:
+            issues.append("CSP allows eval() ('unsafe-eval')")
+        for source in ("*", "http:", "https:", "data:"):
+            if source in lowered:
+                issues.append(f"CSP script sources include {source}")
+    objects = directives.get("object-src", directives.get("default-src"))
+    if objects != ["'none'"]:
+        issues.append("CSP object-src is not 'none'")
+    if "base-uri" not in directives:
+        issues.append("CSP does not restrict base-uri")
+    return {"directives": directives, "issues": issues}
+
+
+def evaluate(headers):
+    """Parses the security headers once into a structured evaluation with its issues."""
+    evaluation = {"issues": []}
+    issues = evaluation["issues"]
+    if headers["Strict-Transport-Security"] is not None:
+        evaluation["hsts"] = parse_hsts(headers["Strict-Transport-Security"])
+        issues.extend(evaluation["hsts"]["issues"])
+    csp = headers["Content-Security-Policy"]
+    if csp is not None:
+        evaluation["csp"] = parse_csp(csp)
+        issues.extend(evaluation["csp"]["issues"])
+    frame_options = headers["X-Frame-Options"]
+    if frame_options is not None and frame_options.strip().upper() not in (
+        "DENY",
+        "SAMEORIGIN",
+    ):
+        issues.append(f"X-Frame-Options {frame_options!r} is not DENY or SAMEORIGIN")
+    framing = frame_options is not None or (
+        csp is not None and "frame-ancestors" in evaluation["csp"]["directives"]
+    )
+    if not framing:
+        issues.append("No X-Frame-Options or CSP frame-ancestors, framing is allowed")
+    content_type = headers["X-Content-Type-Options"]
+    if content_type is not None and content_type.strip().lower() != "nosniff":
+        issues.append(f"X-Content-Type-Options {content_type!r} is not nosniff")
+    referrer = headers["Referrer-Policy"]
+    if referrer is not None and referrer.strip().lower() in (
+        "unsafe-url",
+        "no-referrer-when-downgrade",
+    ):
+        issues.append(f"Referrer-Policy {referrer} leaks full URLs")
+    return evaluation
+
+
+class Connection(http.client.HTTPSConnection):
+    """HTTPS connection that resumes the last TLS session with the same server."""
+
+    def __init__(self, host, port, context, timeout):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self.tls_context = context
+        self.resumed = False
+
+    def connect(self):
+        self.sock = open_tls(
+            self.host, self.port, self.host, self.tls_context, self.timeout
+        )
+        self.resumed = self.sock.session_reused
+
+    def remember(self):
+        if self.sock is not None:
+            remember_session(self.sock, self.host, self.port)
+
+
+class ConnectionPool:
+    """
+    Idle keep-alive connections per host and port, with at most `per_host` in use at
+    once. Connections first offer h2 on the shared context, so a session from an
+    earlier certificate check can resume; hosts that select h2 get HTTP/1.1 only.
+    """
+
+    def __init__(self, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.slots = {}
+        self.warmed = {}
+        self.http2 = set()
+        self.opened = 0
+        self.resumed = 0
+
+    def context(self, key):
+        return (
+            create_context(alpn=HTTP1_ONLY) if key in self.http2 else create_context()
+        )
+
+    def acquire(self, host, port):
+        key = (host, port)
+        with self.lock:
+            slots = self.slots.setdefault(key, threading.Semaphore(self.per_host))
+            warmed = self.warmed.get(key)
+            first = warmed is None
+            if first:
+                warmed = self.warmed[key] = threading.Event()
+        # The first request to a host runs alone, so the others can take over its
+        # connection or resume its TLS session instead of all handshaking at once
+        if not first:
+            warmed.wait(self.timeout)
+        slots.acquire()
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop()
+        return Connection(host, port, self.context(key), self.timeout)
+
+    def connect(self, connection):
+        key = (connection.host, connection.port)
+        connection.connect()
+        if connection.sock.selected_alpn_protocol() == "h2":
+            connection.close()
+            with self.lock:
+                self.http2.add(key)
+            connection.tls_context = self.context(key)
+            connection.connect()
+        with self.lock:
+            self.opened += 1
+            self.resumed += connection.resumed
+
+    def release(self, connection, reusable):
+        key = (connection.host, connection.port)
+        if reusable:
+            connection.remember()
+            with self.lock:
+                self.idle.setdefault(key, []).append(connection)
+        else:
+            connection.close()
+        self.slots[key].release()
+        self.warmed[key].set()
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+
+def request(pool, connection, method, path):
+    """One request on a pooled connection, re-connecting once if it went stale."""
+    for attempt in range(2):
+        kept_alive = connection.sock is not None
+        if not kept_alive:
+            pool.connect(connection)
+        try:
+            with timings.span("http_request", host=connection.host, path=path):
+                connection.request(method, path, headers={"User-Agent": USER_AGENT})
+                response = connection.getresponse()
+                response.read()
+            return response, kept_alive
+        except STALE_ERRORS:
+            connection.close()
+            if not kept_alive or attempt:
+                raise
+
+
+def headers_record(pool, host, port=DEFAULT_PORT, path="/", method="HEAD"):
+    """The security headers of https://host:port/path, None for each one that is missing."""
+    record = {"host": host, "port": port, "path": path}
+    connection = pool.acquire(host, port)
+    reusable = False
+    try:
+        response, kept_alive = request(pool, connection, method, path)
+        reusable = not response.will_close
+    except (OSError, ssl.SSLError, http.client.HTTPException) as e:
+        record["error"] = str(e)
+        return record
+    finally:
+        pool.release(connection, reusable)
+    record["status"] = response.status
+    record["headers"] = {name: response.getheader(name) for name in SECURITY_HEADERS}
+    record["missing"] = [
+        name for name, value in record["headers"].items() if value is None
+    ]
+    record["evaluation"] = evaluate(record["headers"])
+    record.update(
+        http2=(host, port) in pool.http2,
+        connection_reused=kept_alive,
+        tls_resumed=connection.resumed and not kept_alive,
+    )
+    return record
+
+
+def certificate_check(target):
+    # Imported here so plain header checks do not load cryptography
+    from batch import leaf_facts, summarize
+    from tls_inspect import inspect_host
+
+    host, port = target
+    try:
+        result = inspect_host(host, port)
+    except (OSError, ssl.SSLError) as e:
+        return {"status": "error", "error": str(e)}
+    record = summarize(host, port, result, leaf_facts(result), 30)
+    return {key: record[key] for key in ("status", "not_after", "days_left")}
+
+
+def print_record(record):
+    path = "" if record["path"] == "/" else record["path"]
+    print(
+        f"{Fore.GREEN}\nAnalyzing HTTP security headers for {record['host']}:{record['port']}{path}...\n"
+    )
+    if "certificate" in record:
+        certificate = record["certificate"]
+        if certificate["status"] == "error":
+            print(f"{Fore.RED}Certificate check failed: {certificate['error']}")
+        else:
+            color = Fore.GREEN if certificate["status"] == "ok" else Fore.RED
+            print(
+                f"{color}Certificate {certificate['status']}, "
+                f"{certificate['days_left']} days left\n"
+            )
+    if "error" in record:
+        print(f"{Fore.RED}Failed to fetch the headers: {record['error']}\n")
+        return
+    for name, value in record["headers"].items():
+        if value is None:
+            print(f"{name}: {Fore.RED}Not Found\n")
+        else:
+            print(f"{name}: {value}")
+    for issue in record["evaluation"]["issues"]:
+        print(f"{Fore.YELLOW}  ! {issue}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl headers",
+        description="Check HTTP security headers of many hosts and paths over pooled "
+        "keep-alive connections.",
+    )
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="host or host:port, a trailing port number applies to all hosts.",
+    )
+    parser.add_argument("-f", "--file", help="File with one host[:port] per line.")
+    parser.add_argument(
+        "-P",
+        "--path",
+        action="append",
+        help="Path to check on every host (default /). Repeatable.",
+    )
+    parser.add_argument(
+        "-m", "--method", choices=["HEAD", "GET"], default="HEAD", type=str.upper
+    )
+    parser.add_argument(
+        "--cert",
+        action="store_true",
+        help="Check each certificate first; the header requests resume its TLS session.",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=DEFAULT_PER_HOST,
+        help="Connections kept open per host.",
+    )
+    parser.add_argument("-t", "--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_intermixed_args(argv)
+
+    port = DEFAULT_PORT
+    if len(args.targets) > 1 and args.targets[-1].isdigit():
+        port = int(args.targets.pop())
+    try:
+        targets = [parse_target(target, port) for target in args.targets]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.file:
+        try:
+            with open(args.file) as f:
+                targets.extend(read_targets(f, port))
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read {args.file}: {e}")
+    if not targets:
+        print(f"{Fore.RED}Usage: ssl headers <domain> [port]")
+        print(f"{Fore.YELLOW}Port defaults to 443 if not specified.")
+        return 1
+
+    paths = args.path or ["/"]
+    jobs = [(host, port, path) for host, port in targets for path in paths]
+    pool = ConnectionPool(args.per_host, args.timeout)
+    started = time.monotonic()
+    failed = False
+    with ThreadPoolExecutor(args.workers) as executor:
+        certificates = {}
+        if args.cert:
+            unique = list(dict.fromkeys(targets))
+            certificates = dict(zip(unique, executor.map(certificate_check, unique)))
+        records = executor.map(
+            lambda job: headers_record(pool, *job, method=args.method), jobs
+        )
+        for record in records:
+            failed = failed or "error" in record
+            if args.cert:
+                record["certificate"] = certificates[(record["host"], record["port"])]
+            if output.structured():
+                output.emit("headers", record)
+            else:
+                print_record(record)
+    pool.close()
+    output.finish()
+    if len(jobs) > 1:
+        elapsed = time.monotonic() - started
+        print(
+            f"{Fore.CYAN}\n{len(jobs)} requests on {pool.opened} connections "
+            f"({pool.resumed} TLS resumptions) in {elapsed:.1f}s",
+            file=sys.stderr,
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
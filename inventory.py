@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+import argparse
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from colorama import Fore, init
+from cryptography import x509
+from cryptography.exceptions import UnsupportedAlgorithm
+from cryptography.hazmat.primitives import serialization
+
+import output
+from tls_inspect import (
+    describe_key,
+    fingerprint,
+    format_date,
+    not_after,
+    openssl_name,
+    spki_sha256,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+PEM_BLOCK = re.compile(
+    rb"-----BEGIN ((?:RSA |EC |DSA |ENCRYPTED )?PRIVATE KEY|CERTIFICATE"
+    rb"|(?:NEW )?CERTIFICATE REQUEST)-----.+?-----END \1-----",
+    re.DOTALL,
+)
+# Files without PEM blocks are only tried as DER when they have one of these
+DER_EXTENSIONS = {".der", ".cer", ".crt", ".csr", ".key", ".p8"}
+# Files per pool task, and the file count below which the pool is not worth starting
+CHUNK_SIZE = 64
+POOL_THRESHOLD = 256
+
+GROUP_LISTS = {"key": "keys", "certificate": "certificates", "csr": "csrs"}
+STATUS_LABELS = {
+    "matched": f"{Fore.GREEN}MATCHED    ",
+    "no_certificate": f"{Fore.YELLOW}NO CERT    ",
+    "no_key": f"{Fore.RED}NO KEY     ",
+}
+
+
+def parse_object(kind, data, pem=True):
+    """The index facts of one certificate, CSR or private key."""
+    if kind == "certificate":
+        load = x509.load_pem_x509_certificate if pem else x509.load_der_x509_certificate
+        cert = load(data)
+        facts = {
+            "subject": openssl_name(cert.subject),
+            "issuer": openssl_name(cert.issuer),
+            "serial": f"{cert.serial_number:X}",
+            "not_after": not_after(cert),
+            "fingerprint_sha256": fingerprint(cert),
+        }
+        public_key = cert.public_key()
+    elif kind == "csr":
+        load = x509.load_pem_x509_csr if pem else x509.load_der_x509_csr
+        csr = load(data)
+        facts = {
+            "subject": openssl_name(csr.subject),
+            "signature_valid": csr.is_signature_valid,
+        }
+        public_key = csr.public_key()
+    else:
+        if pem:
+            load = serialization.load_pem_private_key
+        else:
+            load = serialization.load_der_private_key
+        # Encrypted keys raise TypeError and are reported as unreadable
+        public_key = load(data, password=None).public_key()
+        facts = {}
+    key_type, key_size = describe_key(public_key)
+    facts.update(
+        spki_sha256=spki_sha256(public_key), key_type=key_type, key_size=key_size
+    )
+    return facts
+
+
+def block_kind(label):
+    if label.endswith(b"PRIVATE KEY"):
+        return "key"
+    return "certificate" if label == b"CERTIFICATE" else "csr"
+
+
+def scan_der(data):
+    for kind in ("certificate", "csr", "key"):
+        try:
+            return kind, parse_object(kind, data, pem=False)
+        except (ValueError, TypeError, UnsupportedAlgorithm):
+            continue
+    return None
+
+
+def scan_file(path):
+    """One entry per certificate, CSR or key in a file, read through mmap."""
+    entries = []
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return entries
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b"-----BEGIN ") != -1:
+                    for block in PEM_BLOCK.finditer(data):
+                        entry = {"path": path, "type": block_kind(block.group(1))}
+                        try:
+                            entry.update(parse_object(entry["type"], block.group()))
+                        except (ValueError, TypeError, UnsupportedAlgorithm) as e:
+                            entry["error"] = str(e)
+                        entries.append(entry)
+                elif os.path.splitext(path)[1].lower() in DER_EXTENSIONS:
+                    found = scan_der(data[:])
+                    if found:
+                        entries.append({"path": path, "type": found[0], **found[1]})
+    except (OSError, ValueError) as e:
+        return [{"path": path, "source": path, "type": "file", "error": str(e)}]
+    for number, entry in enumerate(entries):
+        entry["source"] = f"{path}[{number}]" if len(entries) > 1 else path
+    return entries
+
+
+def scan_files(paths):
+    return [entry for path in paths for entry in scan_file(path)]
+
+
+def walk(paths):
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(files):
+                yield os.path.join(directory, name)
+
+
+def scan(paths, workers=None):
+    """
+    Parses every file under `paths` once and returns (file count, entries).
+    Large trees are split into chunks of files across a process pool.
+    """
+    files = list(walk(paths))
+    if workers == 1 or len(files) < POOL_THRESHOLD:
+        return len(files), scan_files(files)
+    chunks = [files[i : i + CHUNK_SIZE] for i in range(0, len(files), CHUNK_SIZE)]
+    with ProcessPoolExecutor(workers) as pool:
+        entries = [entry for part in pool.map(scan_files, chunks) for entry in part]
+    return len(files), entries
+
+
+def match(entries):
+    """
+    Groups entries by SPKI SHA-256 so keys, certificates and CSRs that share a
+    public key meet in one dictionary lookup. Returns (groups, unreadable entries).
+    """
+    groups = {}
+    errors = []
+    for entry in entries:
+        if "error" in entry:
+            errors.append(entry)
+            continue
+        group = groups.get(entry["spki_sha256"])
+        if group is None:
+            group = groups[entry["spki_sha256"]] = {
+                "spki_sha256": entry["spki_sha256"],
+                "key_type": entry["key_type"],
+                "key_size": entry["key_size"],
+                "keys": [],
+                "certificates": [],
+                "csrs": [],
+            }
+        facts = {
+            name: value
+            for name, value in entry.items()
+            if name not in ("path", "type", "spki_sha256", "key_type", "key_size")
+        }
+        group[GROUP_LISTS[entry["type"]]].append(facts)
+    for group in groups.values():
+        if not group["keys"]:
+            group["status"] = "no_key"
+        elif group["certificates"]:
+            group["status"] = "matched"
+        else:
+            group["status"] = "no_certificate"
+    return list(groups.values()), errors
+
+
+def print_group(group):
+    size = f" {group['key_size']}" if group["key_size"] else ""
+    print(
+        f"{STATUS_LABELS[group['status']]}{Fore.MAGENTA}{group['key_type']}{size} "
+        f"{Fore.CYAN}{group['spki_sha256']}"
+    )
+    for key in group["keys"]:
+        print(f"    key  {key['source']}")
+    for cert in group["certificates"]:
+        print(
+            f"    cert {cert['source']} {Fore.YELLOW}{cert['subject']}, "
+            f"expires {format_date(cert['not_after'])}"
+        )
+    for csr in group["csrs"]:
+        print(f"    csr  {csr['source']} {Fore.YELLOW}{csr['subject']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl inventory",
+        description="Decode every certificate, CSR and private key under the given "
+        "files or directories and match them by public key.",
+    )
+    parser.add_argument("paths", nargs="+", help="Files, bundles or directories.")
+    parser.add_argument(
+        "-u",
+        "--unmatched",
+        action="store_true",
+        help="Only list keys without a certificate and certificates or CSRs without a key.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Parser processes (default one per CPU, 1 parses in this process).",
+    )
+    args = parser.parse_args(argv)
+
+    files, entries = scan(args.paths, args.workers)
+    groups, errors = match(entries)
+    order = {"no_key": 0, "no_certificate": 1, "matched": 2}
+    groups.sort(key=lambda group: (order[group["status"]], group["spki_sha256"]))
+    shown = [g for g in groups if not (args.unmatched and g["status"] == "matched")]
+
+    for group in shown:
+        if output.structured():
+            output.emit("inventory", group)
+        else:
+            print_group(group)
+    for entry in errors:
+        if output.structured():
+            output.emit("inventory", {"status": "error", **entry})
+        else:
+            print(f"{Fore.RED}UNREADABLE {entry['source']}: {entry['error']}")
+    output.finish()
+
+    counts = {}
+    for group in groups:
+        counts[group["status"]] = counts.get(group["status"], 0) + 1
+    print(
+        f"{Fore.CYAN}\nScanned {files} files, {len(entries)} objects: "
+        f"{counts.get('matched', 0)} matched, "
+        f"{counts.get('no_certificate', 0)} keys without a certificate, "
+        f"{counts.get('no_key', 0)} without a key, {len(errors)} unreadable",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import os
+import sys
+from datetime import datetime, timezone
+
+from colorama import Fore, init
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import output
+from chain_builder import CertificateIndex, ChainBuilder
+from tls_inspect import not_after, not_before
+
+# Initialize Colorama
+init(autoreset=True)
+
+
+def read_input(value):
+    """Accepts a file path or pasted PEM content, like the old shell script."""
+    if os.path.isfile(value):
+        with open(value, "rb") as f:
+            return f.read()
+    return value.encode()
+
+
+def public_key_of(data):
+    """Public key of a PEM CSR, certificate or private key."""
+    if b"PRIVATE KEY-----" in data:
+        return serialization.load_pem_private_key(data, password=None).public_key()
+    if b"CERTIFICATE REQUEST-----" in data:
+        return x509.load_pem_x509_csr(data).public_key()
+    return x509.load_pem_x509_certificate(data).public_key()
+
+
+def key_md5(public_key):
+    """
+    MD5 of the key, matching `openssl rsa -noout -modulus | openssl md5` for RSA keys.
+    Other key types have no modulus, so their DER public key is hashed instead.
+    """
+    if isinstance(public_key, rsa.RSAPublicKey):
+        data = f"Modulus={public_key.public_numbers().n:X}\n".encode()
+    else:
+        data = public_key.public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+    return hashlib.md5(data).hexdigest()
+
+
+def match_record(csr, key):
+    """Compares the key of a CSR (or certificate) with a private key."""
+    try:
+        csr_md5 = key_md5(public_key_of(read_input(csr)))
+        key_md5_value = key_md5(public_key_of(read_input(key)))
+    except (ValueError, TypeError) as e:
+        return {"check": "key", "error": str(e)}
+    return {
+        "check": "key",
+        "csr_md5": csr_md5,
+        "key_md5": key_md5_value,
+        "match": csr_md5 == key_md5_value,
+    }
+
+
+def verify_record(certificate, ca_certificate):
+    """
+    Verifies a certificate against a CA file the way `openssl verify -CAfile` does:
+    the path must end at a self-signed root in the file, and every certificate on it
+    must be currently valid. Other certificates in the file serve as intermediates.
+    """
+    record = {"check": "ca", "verified": False, "chain": []}
+    try:
+        cert = x509.load_pem_x509_certificate(read_input(certificate))
+        authorities = x509.load_pem_x509_certificates(read_input(ca_certificate))
+    except ValueError as e:
+        record["error"] = str(e)
+        return record
+
+    builder = ChainBuilder(
+        roots=CertificateIndex(c for c in authorities if c.subject == c.issuer),
+        intermediates=CertificateIndex(authorities),
+        fetch=False,
+    )
+    now = datetime.now(timezone.utc)
+    path, trusted = builder.build(cert, now=now)
+    record["chain"] = [issuer.subject.rfc4514_string() for issuer, _ in path]
+    expired = [c for c, _ in path if not not_before(c) <= now <= not_after(c)]
+    if expired:
+        record["error"] = (
+            "certificate has expired or is not yet valid: "
+            + expired[0].subject.rfc4514_string()
+        )
+    elif not trusted:
+        record["error"] = "unable to get issuer certificate"
+    else:
+        record["verified"] = True
+    return record
+
+
+def print_record(record):
+    if record["check"] == "key":
+        if "error" in record:
+            print(f"{Fore.RED}Could not read the input: {record['error']}\n")
+        elif record["match"]:
+            print(f"{Fore.GREEN}The CSR and Private Key match.\n")
+        else:
+            print(f"{Fore.RED}The CSR and Private Key do not match.\n")
+    elif record["verified"]:
+        print(f"{Fore.GREEN}The certificate is valid and verified against the CA.\n")
+    else:
+        print(
+            f"{Fore.RED}The certificate is not valid or cannot be verified against the CA.\n"
+        )
+
+
+def record_ok(record):
+    return record.get("match", record.get("verified", False))
+
+
+def ask(prompt):
+    print(prompt)
+    return input().strip()
+
+
+def paste(prompt):
+    print(prompt)
+    return sys.stdin.read()
+
+
+def interactive():
+    print("")
+    print(f"{Fore.YELLOW}Verify MD5 checksums: (Press 1 or 2):\n")
+    print(f"{Fore.CYAN}1 - Verify CSR and Private Key.")
+    print(f"{Fore.BLUE}2 - Verify certificate against CA.")
+    action = input().strip().lower()
+    if action not in ("1", "2"):
+        print(f"{Fore.RED}Invalid choice again. Exiting.")
+        return 1
+    labels = (
+        ("CSR", "Private Key") if action == "1" else ("Certificate", "CA Certificate")
+    )
+
+    print("")
+    while True:
+        print(f"{Fore.YELLOW}Paste the content or import files? (Press 1 or 2):\n")
+        print(f"{Fore.CYAN}1 - Paste content.")
+        print(f"{Fore.BLUE}2 - Import files.")
+        method = input().strip().lower()
+        print("")
+        if method == "2":
+            first = ask(f"{Fore.MAGENTA}Enter the path to your {labels[0]} file:")
+            second = ask(f"{Fore.MAGENTA}Enter the path to your {labels[1]} file:")
+            break
+        if method == "1":
+            first = paste(f"{Fore.CYAN}Paste the {labels[0]} content and press Ctrl-D:")
+            second = paste(
+                f"{Fore.CYAN}Paste the {labels[1]} content and press Ctrl-D:"
+            )
+            break
+        print(f"{Fore.RED}Invalid input, try again.")
+
+    if not first and not second:
+        print(f"{Fore.YELLOW}Nothing to process...\n")
+        return 0
+    record = (
+        match_record(first, second) if action == "1" else verify_record(first, second)
+    )
+    print_record(record)
+    return 0 if record_ok(record) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl md5",
+        description="Check that a CSR matches its private key, or a certificate its CA.",
+    )
+    parser.add_argument("--csr", help="CSR or certificate (file or PEM content).")
+    parser.add_argument("--key", help="Private key (file or PEM content).")
+    parser.add_argument("--cert", help="Certificate to verify against --ca.")
+    parser.add_argument("--ca", help="CA certificate or bundle.")
+    args = parser.parse_args(argv)
+
+    records = []
+    if args.csr or args.key:
+        if not (args.csr and args.key):
+            parser.error("--csr and --key go together")
+        records.append(match_record(args.csr, args.key))
+    if args.cert or args.ca:
+        if not (args.cert and args.ca):
+            parser.error("--cert and --ca go together")
+        records.append(verify_record(args.cert, args.ca))
+    if not records:
+        if output.structured():
+            parser.error("--format needs --csr/--key or --cert/--ca")
+        return interactive()
+
+    for record in records:
+        if output.structured():
+            output.emit("md5", record)
+        else:
+            print_record(record)
+    output.finish()
+    return 0 if all(record_ok(record) for record in records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
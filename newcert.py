@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+import argparse
+import getpass
+import os
+import sys
+import time
+
+from colorama import Fore, Style, init
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+import output
+from pfx_pack import read_manifest, resolve, run_batch, write_private
+
+# Initialize Colorama
+init(autoreset=True)
+
+# Key types by name: (generator, CSR signature hash); Ed25519 signs without one
+KEY_TYPES = {
+    "rsa2048": (lambda: rsa.generate_private_key(65537, 2048), hashes.SHA256),
+    "rsa3072": (lambda: rsa.generate_private_key(65537, 3072), hashes.SHA256),
+    "rsa4096": (lambda: rsa.generate_private_key(65537, 4096), hashes.SHA256),
+    "p256": (lambda: ec.generate_private_key(ec.SECP256R1()), hashes.SHA256),
+    "p384": (lambda: ec.generate_private_key(ec.SECP384R1()), hashes.SHA384),
+    "ed25519": (ed25519.Ed25519PrivateKey.generate, None),
+}
+DEFAULT_KEY_TYPE = "rsa2048"
+
+# Optional subject fields, in the order `openssl req` asks for them
+NAME_FIELDS = [
+    ("country", x509.NameOID.COUNTRY_NAME, "Country Name (2 letter code)"),
+    ("state", x509.NameOID.STATE_OR_PROVINCE_NAME, "State or Province Name"),
+    ("locality", x509.NameOID.LOCALITY_NAME, "Locality Name (eg, city)"),
+    ("organization", x509.NameOID.ORGANIZATION_NAME, "Organization Name"),
+    ("unit", x509.NameOID.ORGANIZATIONAL_UNIT_NAME, "Organizational Unit Name"),
+]
+
+
+def generate_key(key_type):
+    return KEY_TYPES[key_type][0]()
+
+
+def build_csr(key, key_type, common_name, sans=(), fields=None):
+    """A CSR for `common_name`; the CN is always repeated as the first SAN."""
+    attributes = [
+        x509.NameAttribute(oid, fields[name])
+        for name, oid, _ in NAME_FIELDS
+        if fields and fields.get(name)
+    ]
+    attributes.append(x509.NameAttribute(x509.NameOID.COMMON_NAME, common_name))
+    names = [common_name] + [san for san in sans if san != common_name]
+    builder = (
+        x509.CertificateSigningRequestBuilder()
+        .subject_name(x509.Name(attributes))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName(name) for name in names]),
+            critical=False,
+        )
+    )
+    algorithm = KEY_TYPES[key_type][1]
+    return builder.sign(key, algorithm() if algorithm else None)
+
+
+def key_pem(key, passphrase=None):
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        (
+            serialization.BestAvailableEncryption(passphrase.encode())
+            if passphrase
+            else serialization.NoEncryption()
+        ),
+    )
+
+
+def file_name(common_name):
+    return common_name.replace("*", "wildcard")
+
+
+def generate_job(job):
+    """Generates one key and CSR. Runs in a pool worker, so it only returns a record."""
+    base = os.path.join(job["out"], job["name"])
+    record = {
+        "common_name": job["common_name"],
+        "sans": job["sans"],
+        "key_type": job["key_type"],
+        "key": base + ".key",
+        "csr": base + ".csr",
+    }
+    started = time.perf_counter()
+    try:
+        key = generate_key(job["key_type"])
+        record["keygen_seconds"] = time.perf_counter() - started
+        csr = build_csr(
+            key, job["key_type"], job["common_name"], job["sans"], job["fields"]
+        )
+        write_private(record["key"], key_pem(key, job["passphrase"]))
+        with open(record["csr"], "wb") as f:
+            f.write(csr.public_bytes(serialization.Encoding.PEM))
+    except (OSError, ValueError) as e:
+        record.update(status="error", error=str(e))
+        return record
+    record["status"] = "ok"
+    return record
+
+
+def subject_jobs(args):
+    """
+    Jobs from --subject values ("cn[,san,...]") and --file, which is a CSV or JSON
+    manifest (cn, sans separated by ";" or spaces, and optionally name, key_type
+    and the subject fields) or a text file with "cn [san ...]" per line.
+    """
+    defaults = {name: getattr(args, name) for name, _, _ in NAME_FIELDS}
+    rows, base = [], None
+    for value in args.subject:
+        cn, *sans = [part.strip() for part in value.split(",") if part.strip()]
+        rows.append({"cn": cn, "sans": sans})
+    if args.file and args.file.lower().endswith((".csv", ".json")):
+        manifest, base = read_manifest(args.file)
+        rows.extend(manifest)
+    elif args.file:
+        with open(args.file) as f:
+            for line in f:
+                parts = line.split("#", 1)[0].split()
+                if parts:
+                    rows.append({"cn": parts[0], "sans": parts[1:]})
+
+    jobs = []
+    for row in rows:
+        sans = row.get("sans") or []
+        if isinstance(sans, str):
+            sans = sans.replace(";", " ").split()
+        key_type = row.get("key_type") or args.key_type
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"unknown key type {key_type!r} for {row['cn']}")
+        out = resolve(base, row["out"]) if base and row.get("out") else args.out
+        jobs.append(
+            {
+                "common_name": row["cn"],
+                "sans": sans,
+                "name": row.get("name") or file_name(row["cn"]),
+                "key_type": key_type,
+                "fields": {name: row.get(name) or defaults[name] for name in defaults},
+                "out": out,
+                "passphrase": args.passphrase,
+            }
+        )
+    return jobs
+
+
+def print_record(record):
+    if record["status"] == "error":
+        print(f"{Fore.RED}FAILED {record['common_name']}: {record['error']}")
+        return
+    print(
+        f"{Fore.GREEN}OK     {record['common_name']} {Fore.MAGENTA}{record['key_type']} "
+        f"{Style.RESET_ALL}{record['key']} {record['csr']}"
+    )
+
+
+def ask(prompt):
+    return input(f"{prompt}: ").strip()
+
+
+def ask_passphrase():
+    while True:
+        passphrase = getpass.getpass("Enter PEM pass phrase: ")
+        if len(passphrase) < 4:
+            print(f"{Fore.RED}The pass phrase must be at least 4 characters.")
+            continue
+        if passphrase == getpass.getpass("Verifying - Enter PEM pass phrase: "):
+            return passphrase
+        print(f"{Fore.RED}Verify failure, the pass phrases do not match.")
+
+
+def interactive(name=None):
+    if name is None:
+        print(
+            f"{Fore.YELLOW}Enter a name for your .csr and .key files (ex:domain_no) or "
+            "leave blank for default 'certificate' name:"
+        )
+        name = input().strip()
+    name = os.path.splitext(name)[0] or "certificate"
+
+    while True:
+        print(
+            f"{Fore.YELLOW}Do you want to set a PEM passphrase for the Private Key? (Y/N)"
+        )
+        option = input().strip().upper()
+        if option in ("Y", "N"):
+            break
+        print(f"{Fore.RED}Invalid input. Please press Y or N.")
+    passphrase = None
+    if option == "Y":
+        print(
+            f"{Fore.YELLOW}You will be prompted to create a PEM passphrase for the Private Key."
+        )
+        print(f"{Fore.RED}Use a strong password and store it somewhere safe!")
+        passphrase = ask_passphrase()
+
+    key = generate_key(DEFAULT_KEY_TYPE)
+    try:
+        write_private(f"{name}.key", key_pem(key, passphrase))
+    except OSError as e:
+        print(f"{Fore.RED}Failed to create Private Key: {e}", file=sys.stderr)
+        return 1
+    protection = "with a passphrase" if passphrase else "without a passphrase"
+    print(f"{Fore.GREEN}Private Key created as {name}.key {protection}")
+
+    print()
+    print(f"{Fore.CYAN}{Style.BRIGHT}* THINGS TO REMEMBER IN THE NEXT STEPS *")
+    print()
+    print(
+        f"{Fore.YELLOW}Proceed to enter information for CSR: This is mostly optional."
+    )
+    print(
+        f"{Fore.MAGENTA}You can leave all steps blank (Enter) "
+        f"{Fore.RED}{Style.BRIGHT}EXCEPT STEP 6: FQDN/CN!"
+    )
+    print()
+    print(
+        f"{Fore.RED}{Style.BRIGHT}IMPORTANT:{Style.RESET_ALL} {Fore.YELLOW}If this is to "
+        f"be used with {Fore.GREEN}Organization Validated cert {Fore.CYAN}all info must "
+        "be filled correctly."
+    )
+    print()
+
+    fields = {name: ask(prompt) for name, _, prompt in NAME_FIELDS}
+    common_name = ""
+    while not common_name:
+        common_name = ask("Common Name (e.g. server FQDN or YOUR name)")
+    sans = ask("Subject Alternative Names, space separated (optional)").split()
+    try:
+        csr = build_csr(key, DEFAULT_KEY_TYPE, common_name, sans, fields)
+        with open(f"{name}.csr", "wb") as f:
+            f.write(csr.public_bytes(serialization.Encoding.PEM))
+    except (OSError, ValueError) as e:
+        print(f"{Fore.RED}Failed to create CSR: {e}", file=sys.stderr)
+        return 1
+    print()
+    print(f"{Fore.GREEN}CSR created as {name}.csr")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl new",
+        description="Create private keys and CSRs. With only a file name (or "
+        "nothing) the prompts guide you through one CSR.",
+    )
+    parser.add_argument("name", nargs="?", help="File name for the interactive mode.")
+    parser.add_argument(
+        "-s",
+        "--subject",
+        action="append",
+        default=[],
+        help="Common name and SANs, comma separated (a.example.com,b.example.com). "
+        "Repeatable.",
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        help="Subjects: CSV/JSON manifest (cn, sans, name, key_type, ...) or a text "
+        "file with 'cn [san ...]' per line.",
+    )
+    parser.add_argument(
+        "-k", "--key-type", choices=list(KEY_TYPES), default=DEFAULT_KEY_TYPE
+    )
+    parser.add_argument("-o", "--out", default=".", help="Output folder.")
+    parser.add_argument(
+        "--passphrase-env",
+        help="Environment variable with a passphrase to encrypt the keys with.",
+    )
+    for name, _, prompt in NAME_FIELDS:
+        parser.add_argument(f"--{name}", help=f"{prompt} for every CSR.")
+    parser.add_argument(
+        "-w", "--workers", type=int, help="Worker processes (default one per CPU)."
+    )
+    args = parser.parse_intermixed_args(argv)
+
+    if not args.subject and not args.file:
+        return interactive(args.name)
+    args.passphrase = (
+        os.environ.get(args.passphrase_env) if args.passphrase_env else None
+    )
+    try:
+        jobs = subject_jobs(args)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"cannot read the subjects: {e}")
+
+    started = time.monotonic()
+    failed = 0
+    for record in run_batch(generate_job, jobs, args.workers):
+        failed += record["status"] == "error"
+        if output.structured():
+            output.emit("new", record)
+        else:
+            print_record(record)
+    output.finish()
+    elapsed = time.monotonic() - started
+    print(
+        f"{Fore.CYAN}\nCreated {len(jobs) - failed} of {len(jobs)} keys and CSRs in "
+        f"{elapsed:.1f}s ({len(jobs) / elapsed if elapsed else 0:.1f} keys/s)",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
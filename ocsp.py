@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import http.client
+import os
+import ssl
+import sys
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from colorama import Fore, init
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+from cryptography.x509 import ocsp
+from cryptography.x509.oid import SignatureAlgorithmOID
+
+import output
+import timings
+from cert_cache import cache_path
+from chain_builder import access_locations, fetch_issuer
+from crl import load_certificates, write_atomic
+from tls_inspect import DEFAULT_PORT, inspect_cached
+
+# Initialize Colorama
+init(autoreset=True)
+
+USER_AGENT = "ssl-utils"
+REQUEST_TIMEOUT = 15
+# Responses without a nextUpdate are reused for this many seconds
+DEFAULT_MAX_AGE = 3600
+# Allowed difference between our clock and the responder's
+CLOCK_SKEW = timedelta(minutes=5)
+
+
+def ocsp_dir():
+    return os.path.join(os.path.dirname(cache_path()), "ocsp")
+
+
+def responder_url(cert):
+    urls = access_locations(cert, x509.oid.AuthorityInformationAccessOID.OCSP)
+    return urls[0] if urls else None
+
+
+def signature_padding(signed, hash_algorithm):
+    """The RSA padding `signed` (a certificate, CRL or OCSP response) was made with."""
+    parameters = getattr(signed, "signature_algorithm_parameters", None)
+    if isinstance(parameters, (padding.PSS, padding.PKCS1v15)):
+        return parameters
+    if signed.signature_algorithm_oid == SignatureAlgorithmOID.RSASSA_PSS:
+        # OCSP responses do not expose the PSS parameters, the salt length is read back
+        return padding.PSS(
+            mgf=padding.MGF1(hash_algorithm), salt_length=padding.PSS.AUTO
+        )
+    return padding.PKCS1v15()
+
+
+def verify_signature(public_key, signature, data, hash_algorithm, rsa_padding=None):
+    if isinstance(public_key, rsa.RSAPublicKey):
+        public_key.verify(
+            signature, data, rsa_padding or padding.PKCS1v15(), hash_algorithm
+        )
+    elif isinstance(public_key, ec.EllipticCurvePublicKey):
+        public_key.verify(signature, data, ec.ECDSA(hash_algorithm))
+    else:
+        public_key.verify(signature, data)
+
+
+def key_hash(cert):
+    # The responder key hash is the SHA-1 of the key bit string, as in a key identifier
+    return x509.SubjectKeyIdentifier.from_public_key(cert.public_key()).digest
+
+
+def is_responder(response, cert):
+    """Whether `cert` is the responder the response names, by name or by key hash."""
+    if response.responder_name is not None:
+        return response.responder_name == cert.subject
+    return response.responder_key_hash == key_hash(cert)
+
+
+def can_sign_ocsp(cert):
+    try:
+        usage = cert.extensions.get_extension_for_class(x509.ExtendedKeyUsage)
+    except x509.ExtensionNotFound:
+        return False
+    return x509.oid.ExtendedKeyUsageOID.OCSP_SIGNING in usage.value
+
+
+def response_signer(response, issuer):
+    """
+    Returns the certificate that signed an OCSP response: the issuer, or a delegated
+    responder the issuer signed directly, with the OCSPSigning extended key usage and
+    named as the responder (RFC 6960 4.2.2.2).
+    """
+    if is_responder(response, issuer):
+        return issuer
+    for cert in response.certificates:
+        if not is_responder(response, cert) or not can_sign_ocsp(cert):
+            continue
+        try:
+            cert.verify_directly_issued_by(issuer)
+        except (ValueError, TypeError, InvalidSignature):
+            continue
+        return cert
+    return None
+
+
+def cert_id(cert, issuer, algorithm):
+    """(issuer name hash, issuer key hash) of the CertID for `cert` with `algorithm`."""
+    request = ocsp.OCSPRequestBuilder().add_certificate(cert, issuer, algorithm).build()
+    return request.issuer_name_hash, request.issuer_key_hash
+
+
+def utc(response, field):
+    """An aware datetime field of a response, from the _utc property where available."""
+    if hasattr(response, f"{field}_utc"):
+        return getattr(response, f"{field}_utc")
+    value = getattr(response, field)
+    return value and value.replace(tzinfo=timezone.utc)
+
+
+def validate_response(response, cert, issuer):
+    """
+    Raises ValueError unless the response is successful, current, and signed for and
+    about this cert.
+    """
+    if response.response_status != ocsp.OCSPResponseStatus.SUCCESSFUL:
+        raise ValueError(f"OCSP responder returned {response.response_status.name}")
+    try:
+        expected = cert_id(cert, issuer, response.hash_algorithm)
+    except (ValueError, TypeError, UnsupportedAlgorithm):
+        raise ValueError("OCSP response uses an unsupported CertID hash")
+    if response.serial_number != cert.serial_number or expected != (
+        response.issuer_name_hash,
+        response.issuer_key_hash,
+    ):
+        raise ValueError("OCSP response is for a different certificate")
+    signer = response_signer(response, issuer)
+    if signer is None:
+        raise ValueError(
+            "OCSP response is not signed by the issuer or a delegated responder"
+        )
+    try:
+        hash_algorithm = response.signature_hash_algorithm
+        verify_signature(
+            signer.public_key(),
+            response.signature,
+            response.tbs_response_bytes,
+            hash_algorithm,
+            signature_padding(response, hash_algorithm),
+        )
+    except InvalidSignature:
+        raise ValueError("OCSP response signature is invalid")
+    except (TypeError, UnsupportedAlgorithm):
+        raise ValueError("OCSP response uses an unsupported signature algorithm")
+    now = datetime.now(timezone.utc)
+    if utc(response, "this_update") > now + CLOCK_SKEW:
+        raise ValueError("OCSP response is not valid yet")
+    next_update = utc(response, "next_update")
+    if next_update is not None and next_update < now - CLOCK_SKEW:
+        raise ValueError("OCSP response is stale, its nextUpdate has passed")
+
+
+def response_is_fresh(response, fetched_at):
+    update = utc(response, "next_update")
+    if update is None:
+        return time.time() - fetched_at < DEFAULT_MAX_AGE
+    return datetime.now(timezone.utc) < update
+
+
+class ResponderPool:
+    """
+    Keep-alive HTTP connections to OCSP responders, one per (scheme, host, port).
+    Every request to a responder after the first reuses its open connection.
+    """
+
+    def __init__(self):
+        self.connections = {}
+
+    def post(self, url, body):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        headers = {
+            "Content-Type": "application/ocsp-request",
+            "Accept": "application/ocsp-response",
+            "User-Agent": USER_AGENT,
+            "Host": parts.netloc,
+        }
+        path = parts.path or "/"
+        # A keep-alive connection may have been closed by the responder; retry once on a new one
+        for attempt in range(2):
+            connection = self.connections.get(key)
+            if connection is None:
+                connection_class = (
+                    http.client.HTTPSConnection
+                    if parts.scheme == "https"
+                    else http.client.HTTPConnection
+                )
+                connection = connection_class(
+                    parts.hostname, parts.port, timeout=REQUEST_TIMEOUT
+                )
+                self.connections[key] = connection
+            try:
+                connection.request("POST", path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                del self.connections[key]
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise OSError(f"OCSP responder {url} answered HTTP {response.status}")
+            return data
+
+    def close(self):
+        for connection in self.connections.values():
+            connection.close()
+        self.connections.clear()
+
+
+def cache_file(cert, issuer):
+    # Serials are not bounded to 20 bytes in practice, so they are hashed as hex
+    key = hashlib.sha256(
+        key_hash(issuer) + f"{cert.serial_number:x}".encode()
+    ).hexdigest()[:32]
+    return os.path.join(ocsp_dir(), key + ".der")
+
+
+def cached_response(cert, issuer):
+    path = cache_file(cert, issuer)
+    try:
+        with open(path, "rb") as f:
+            response = ocsp.load_der_ocsp_response(f.read())
+        fetched_at = os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None
+    return response if response_is_fresh(response, fetched_at) else None
+
+
+def check_certificate(cert, issuer, pool, stapled=None):
+    """
+    Returns a status record for one certificate. A stapled response (DER bytes) from
+    the handshake is preferred, then a cached response before its nextUpdate, and only
+    then the responder is asked.
+    """
+    url = responder_url(cert)
+    record = {"serial": f"{cert.serial_number:X}", "url": url}
+    response = None
+    if stapled:
+        try:
+            response = ocsp.load_der_ocsp_response(stapled)
+            validate_response(response, cert, issuer)
+            record["source"] = "stapled"
+        except ValueError:
+            response = None
+    if response is None:
+        response = cached_response(cert, issuer)
+        record["source"] = "cached"
+    if response is None:
+        if not url:
+            record.update(
+                status="unknown", error="OCSP URL not found in the certificate."
+            )
+            return record
+        request = (
+            ocsp.OCSPRequestBuilder()
+            .add_certificate(cert, issuer, hashes.SHA1())
+            .build()
+            .public_bytes(serialization.Encoding.DER)
+        )
+        try:
+            with timings.span("ocsp_fetch", url=url):
+                data = pool.post(url, request)
+            with timings.span("ocsp_parse", size=len(data)):
+                response = ocsp.load_der_ocsp_response(data)
+                validate_response(response, cert, issuer)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            record.update(status="unknown", error=str(e))
+            return record
+        os.makedirs(ocsp_dir(), exist_ok=True)
+        write_atomic(cache_file(cert, issuer), data)
+        record["source"] = "responder"
+
+    record["status"] = response.certificate_status.name.lower()
+    record["this_update"] = (
+        getattr(response, "this_update_utc", None) or response.this_update
+    )
+    record["next_update"] = (
+        getattr(response, "next_update_utc", None) or response.next_update
+    )
+    if response.certificate_status == ocsp.OCSPCertStatus.REVOKED:
+        record["revocation_time"] = (
+            getattr(response, "revocation_time_utc", None) or response.revocation_time
+        )
+        reason = response.revocation_reason
+        record["revocation_reason"] = reason.name if reason else None
+    return record
+
+
+def check_certificates(pairs, stapled=None, workers=8):
+    """
+    Checks (certificate, issuer) pairs. Certificates are grouped by responder: each
+    responder gets one keep-alive connection used for all of its certificates, and
+    responders are queried in parallel.
+    """
+    stapled = stapled or {}
+    groups = {}
+    for index, (cert, issuer) in enumerate(pairs):
+        groups.setdefault(responder_url(cert), []).append(index)
+
+    records = [None] * len(pairs)
+
+    def run_group(indexes):
+        pool = ResponderPool()
+        try:
+            for index in indexes:
+                cert, issuer = pairs[index]
+                records[index] = check_certificate(
+                    cert, issuer, pool, stapled.get(index)
+                )
+        finally:
+            pool.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run_group, groups.values()))
+    return records
+
+
+def print_record(label, record):
+    if record["status"] == "unknown" and record.get("error"):
+        print(f"{Fore.RED}{label}: {record['error']}")
+        return
+    print(f"OCSP URL for {label}: {record['url']} ({record['source']})")
+    update = f"this update {record['this_update']:%Y-%m-%d %H:%M:%S}"
+    if record["next_update"]:
+        update += f", next update {record['next_update']:%Y-%m-%d %H:%M:%S}"
+    if record["status"] == "good":
+        print(
+            f"{Fore.GREEN}Certificate with serial {record['serial']} is GOOD ({update})."
+        )
+    elif record["status"] == "revoked":
+        reason = record["revocation_reason"] or "unspecified"
+        print(
+            f"{Fore.RED}Certificate with serial {record['serial']} is REVOKED "
+            f"({record['revocation_time']:%Y-%m-%d %H:%M:%S}, reason: {reason})."
+        )
+    else:
+        print(
+            f"{Fore.YELLOW}The responder does not know certificate {record['serial']} ({update})."
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl ocsp", description="OCSP revocation status check."
+    )
+    parser.add_argument(
+        "domains", nargs="*", help="Domains to check the served certificate of."
+    )
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "-c",
+        "--cert",
+        action="append",
+        default=[],
+        help="PEM certificate file, optionally followed by its chain. Repeatable.",
+    )
+    parser.add_argument(
+        "--issuer", help="Issuer certificate for --cert files without a chain."
+    )
+    args = parser.parse_intermixed_args(argv)
+
+    if not args.domains and not args.cert:
+        print(f"{Fore.RED}Usage: ssl ocsp <domain> [domain ...] [--cert file.pem ...]")
+        return 1
+
+    labels, chains, failures = [], [], []
+    for domain in args.domains:
+        if not output.structured():
+            print(f"{Fore.GREEN}Checking OCSP revocation status for {domain}...")
+        try:
+            chains.append(inspect_cached(domain, args.port)["certificates"])
+            labels.append(domain)
+        except (OSError, ssl.SSLError) as e:
+            failures.append((domain, f"Failed to retrieve the certificate: {e}"))
+    extra_issuer = None
+    if args.issuer:
+        try:
+            issuers = load_certificates(args.issuer)
+            if not issuers:
+                raise ValueError("no certificate found")
+            extra_issuer = issuers[0]
+        except (OSError, ValueError) as e:
+            failures.append(
+                (args.issuer, f"Failed to read the issuer certificate: {e}")
+            )
+    for path in args.cert:
+        try:
+            chains.append(
+                load_certificates(path) + ([extra_issuer] if extra_issuer else [])
+            )
+            labels.append(path)
+        except (OSError, ValueError) as e:
+            failures.append((path, f"Failed to read the certificate: {e}"))
+
+    pairs, checked = [], []
+    for label, chain in zip(labels, chains):
+        # The issuer is the next certificate in the served chain, never the whole CA bundle
+        issuer = next((c for c in chain[1:] if c.subject == chain[0].issuer), None)
+        if issuer is None:
+            try:
+                issuer = fetch_issuer(chain[0])
+            except (OSError, ValueError) as e:
+                failures.append((label, f"Failed to download the issuer: {e}"))
+                continue
+        if issuer is None:
+            failures.append((label, "The issuer certificate is not in the chain."))
+            continue
+        pairs.append((chain[0], issuer))
+        checked.append(label)
+
+    for label, error in failures:
+        if output.structured():
+            output.emit("ocsp", {"target": label, "status": "unknown", "error": error})
+        else:
+            print(f"{Fore.RED}{label}: {error}")
+    records = check_certificates(pairs)
+    for label, record in zip(checked, records):
+        if output.structured():
+            output.emit("ocsp", {"target": label, **record})
+        else:
+            print_record(label, record)
+    output.finish()
+    if any(record["status"] == "revoked" for record in records):
+        return 2
+    return 0 if records and not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Machine-readable output shared by every command.
+
+`ssl --format json|ndjson <command>` sets SSL_UTILS_FORMAT, and commands then
+write records instead of colored text: one JSON object per target, each with
+a "command" key. "ndjson" writes every record on its own line as soon as it is
+ready; "json" streams the same records as a single JSON array. Dates are ISO
+8601 strings and binary values are hex.
+"""
+
+import atexit
+import json
+import os
+import sys
+from datetime import date, datetime
+
+import colorama
+
+FORMATS = ["text", "json", "ndjson"]
+
+# Whether the opening bracket of the JSON array has been written
+_array_open = False
+
+
+def output_format():
+    value = os.environ.get("SSL_UTILS_FORMAT", "text").lower()
+    return value if value in FORMATS else "text"
+
+
+def structured():
+    return output_format() != "text"
+
+
+def set_format(value):
+    os.environ["SSL_UTILS_FORMAT"] = value
+
+
+def jsonable(value):
+    """json.dumps `default` hook for the types records carry."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+
+def dumps(record):
+    return json.dumps(record, default=jsonable)
+
+
+def emit(command, record):
+    """Writes one record for `command` in the current structured format."""
+    global _array_open
+    # Autoreset would append escape codes on a terminal; records never carry any
+    colorama.deinit()
+    record = {"command": command, **record}
+    if output_format() == "ndjson":
+        sys.stdout.write(dumps(record) + "\n")
+    else:
+        if not _array_open:
+            _array_open = True
+            sys.stdout.write("[\n")
+            atexit.register(finish)
+        else:
+            sys.stdout.write(",\n")
+        sys.stdout.write(dumps(record))
+    sys.stdout.flush()
+
+
+def finish():
+    """Closes the JSON array; a run without records still prints a valid document."""
+    global _array_open
+    if output_format() != "json":
+        return
+    sys.stdout.write("\n]\n" if _array_open else "[]\n")
+    sys.stdout.flush()
+    if _array_open:
+        atexit.unregister(finish)
+    _array_open = False
+
+
+def close():
+    """Closes an array a command left open, e.g. because it exited early."""
+    if _array_open:
+        finish()
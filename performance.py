@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import socket
+import ssl
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from colorama import Fore, Style, init
+
+import output
+from timings import percentile
+from tls_common import DEFAULT_PORT, DEFAULT_TIMEOUT, create_context
+
+# Initialize Colorama
+init(autoreset=True)
+
+PHASES = ["connect", "handshake", "ttfb", "total"]
+PERCENTILES = [50, 90, 99]
+VERSIONS = {"1.2": ssl.TLSVersion.TLSv1_2, "1.3": ssl.TLSVersion.TLSv1_3}
+
+
+def connect_once(host, port, context, session, request, timeout):
+    """
+    Makes one connection and returns (sample, session). The sample holds the TCP
+    connect, TLS handshake and time-to-first-byte durations in seconds.
+    """
+    start = time.perf_counter()
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        connected = time.perf_counter()
+        tls = context.wrap_socket(sock, server_hostname=host, session=session)
+        handshaken = time.perf_counter()
+        sample = {
+            "connect": connected - start,
+            "handshake": handshaken - connected,
+            "resumed": tls.session_reused,
+            "protocol": tls.version(),
+        }
+        if request:
+            tls.sendall(request)
+            tls.recv(1)
+            sample["ttfb"] = time.perf_counter() - handshaken
+            # Drain the response so TLS 1.3 session tickets sent after it are processed
+            while tls.recv(65536):
+                pass
+        sample["total"] = time.perf_counter() - start
+        new_session = tls.session
+        tls.close()
+    except Exception:
+        sock.close()
+        raise
+    return sample, new_session
+
+
+def worker(host, port, mode, count, deadline, verify, version, path, timeout):
+    """
+    Runs connections back to back until `count` are made or the deadline passes.
+    In "resumed" mode the first connection is a full handshake that is not recorded
+    and every later one offers the most recent session.
+    """
+    # The request below is HTTP/1.1, so that is the only protocol offered
+    context = create_context(
+        verify, alpn=("http/1.1",), version=VERSIONS[version] if version else None
+    )
+    request = None
+    if path:
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+            "User-Agent: ssl-utils\r\n\r\n"
+        ).encode()
+    samples, errors = [], {}
+    session = None
+    if mode == "resumed":
+        try:
+            _, session = connect_once(host, port, context, None, request, timeout)
+        except (OSError, ssl.SSLError) as e:
+            errors[str(e)] = 1
+            return samples, errors, None
+
+    started = time.time()
+    made = 0
+    while made < count and time.time() < deadline:
+        made += 1
+        try:
+            sample, new_session = connect_once(
+                host, port, context, session, request, timeout
+            )
+        except (OSError, ssl.SSLError) as e:
+            message = str(e) or type(e).__name__
+            errors[message] = errors.get(message, 0) + 1
+            continue
+        samples.append(sample)
+        if mode == "resumed" and new_session is not None:
+            session = new_session
+    return samples, errors, (started, time.time())
+
+
+def summarize(samples, errors, elapsed):
+    summary = {
+        "connections": len(samples),
+        "errors": sum(errors.values()),
+        "error_messages": errors,
+        "resumed": sum(1 for sample in samples if sample["resumed"]),
+        "protocols": sorted({sample["protocol"] for sample in samples}),
+        "handshakes_per_second": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "elapsed": round(elapsed, 3),
+        "phases": {},
+    }
+    for phase in PHASES:
+        values = sorted(sample[phase] for sample in samples if phase in sample)
+        if not values:
+            continue
+        stats = {f"p{p}": round(percentile(values, p) * 1000, 3) for p in PERCENTILES}
+        stats["max"] = round(values[-1] * 1000, 3)
+        summary["phases"][phase] = stats
+    return summary
+
+
+def run_mode(args, mode):
+    """Runs one mode with args.workers worker processes and returns its summary."""
+    deadline = time.time() + args.time if args.time else float("inf")
+    if args.time:
+        counts = [sys.maxsize] * args.workers
+    else:
+        share, extra = divmod(args.connections, args.workers)
+        counts = [share + (1 if n < extra else 0) for n in range(args.workers)]
+    path = None if args.no_request else args.path
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                worker,
+                args.host,
+                args.port,
+                mode,
+                count,
+                deadline,
+                args.verify,
+                args.tls,
+                path,
+                args.timeout,
+            )
+            for count in counts
+            if count
+        ]
+        results = [future.result() for future in futures]
+
+    # Throughput is measured over the window the workers were connecting, without
+    # process startup
+    samples, errors, windows = [], {}, []
+    for worker_samples, worker_errors, window in results:
+        samples.extend(worker_samples)
+        for message, number in worker_errors.items():
+            errors[message] = errors.get(message, 0) + number
+        if window:
+            windows.append(window)
+    elapsed = 0.0
+    if windows:
+        elapsed = max(end for _, end in windows) - min(start for start, _ in windows)
+    return summarize(samples, errors, elapsed)
+
+
+def print_table(host, port, workers, results):
+    print(f"{Fore.GREEN}Handshake performance for {host}:{port} with {workers} workers")
+    header = f"{'phase (ms)':<12}" + "".join(
+        f"{name:>10}" for name in [f"p{p}" for p in PERCENTILES] + ["max"]
+    )
+    for mode, summary in results.items():
+        protocols = ", ".join(summary["protocols"]) or "-"
+        print()
+        print(
+            f"{Fore.CYAN}{mode}{Style.RESET_ALL}: {summary['connections']} connections "
+            f"({protocols}), {summary['resumed']} resumed, "
+            f"{Fore.YELLOW}{summary['handshakes_per_second']:.1f} handshakes/s"
+        )
+        if summary["phases"]:
+            print(f"{Style.BRIGHT}{header}")
+        for phase, stats in summary["phases"].items():
+            print(
+                f"{phase:<12}"
+                + "".join(
+                    f"{stats[key]:>10.2f}"
+                    for key in [f"p{p}" for p in PERCENTILES] + ["max"]
+                )
+            )
+        for message, number in summary["error_messages"].items():
+            print(f"{Fore.RED}{number} x {message}")
+    if "full" in results and "resumed" in results:
+        full = results["full"]["phases"].get("handshake")
+        resumed = results["resumed"]["phases"].get("handshake")
+        if full and resumed and resumed["p50"]:
+            print()
+            print(
+                f"Resumption makes the median handshake "
+                f"{Fore.GREEN}{full['p50'] / resumed['p50']:.1f}x{Style.RESET_ALL} faster."
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl performance",
+        description="Measure TCP connect, TLS handshake and time to first byte.",
+        epilog="TLS 1.3 0-RTT is not measured: the Python ssl module cannot send early data.",
+    )
+    parser.add_argument("host")
+    parser.add_argument("port", type=int, nargs="?", default=DEFAULT_PORT)
+    parser.add_argument(
+        "-n",
+        "--connections",
+        type=int,
+        default=200,
+        help="Connections per mode (default: 200).",
+    )
+    parser.add_argument(
+        "-t",
+        "--time",
+        type=float,
+        help="Run each mode for this many seconds instead of a fixed count.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Concurrent worker processes (default: CPU count).",
+    )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=["full", "resumed", "both"],
+        default="both",
+        help="Full handshakes, session resumption, or both (default).",
+    )
+    parser.add_argument("--tls", choices=sorted(VERSIONS), help="Pin the TLS version.")
+    parser.add_argument(
+        "--path", default="/", help="Path requested to measure time to first byte."
+    )
+    parser.add_argument(
+        "--no-request",
+        action="store_true",
+        help="Only connect and handshake, without an HTTP request.",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Verify the certificate, like a real client (off by default, like s_time).",
+    )
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument(
+        "--format", choices=output.FORMATS, help="Output format (default: text)."
+    )
+    args = parser.parse_args(argv)
+    if args.format:
+        output.set_format(args.format)
+
+    modes = ["full", "resumed"] if args.mode == "both" else [args.mode]
+    if not output.structured():
+        print(
+            f"{Fore.GREEN}Measuring SSL/TLS handshake performance for {args.host}:{args.port}..."
+        )
+    results = {mode: run_mode(args, mode) for mode in modes}
+
+    if output.structured():
+        output.emit(
+            "performance",
+            {
+                "host": args.host,
+                "port": args.port,
+                "workers": args.workers,
+                "modes": results,
+            },
+        )
+        output.finish()
+    else:
+        print_table(args.host, args.port, args.workers, results)
+    if not any(summary["connections"] for summary in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import argparse
+import getpass
+import os
+import sys
+import time
+
+from colorama import Fore, init
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.serialization import pkcs12
+
+from pfx_pack import (
+    load_file,
+    read_manifest,
+    report,
+    resolve,
+    row_password,
+    run_batch,
+    write_private,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+
+def output_paths(pfx_path, out_dir=None):
+    """<name>/<name>.key, .crt and .ca next to the current directory, like before."""
+    name = os.path.splitext(os.path.basename(pfx_path))[0]
+    folder = out_dir or name
+    return {
+        extension: os.path.join(folder, f"{name}.{extension}")
+        for extension in ("key", "crt", "ca")
+    }
+
+
+def extract_pfx(data, password):
+    """
+    Parses a PFX once and returns the PEM private key (unencrypted, PKCS#8), the
+    certificate and every CA certificate in the bag.
+    """
+    key, cert, cas = pkcs12.load_key_and_certificates(
+        data, password.encode() if password else None
+    )
+    if key is None or cert is None:
+        raise ValueError("the PFX has no private key or no certificate")
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM)
+    ca_pem = b"".join(ca.public_bytes(serialization.Encoding.PEM) for ca in cas)
+    return key_pem, cert_pem, ca_pem, len(cas)
+
+
+def extract_job(job):
+    """Extracts one PFX. Runs in a pool worker, so it only returns a record."""
+    paths = output_paths(job["pfx"], job["out"])
+    record = {"source": job["pfx"], "output": os.path.dirname(paths["key"])}
+    try:
+        key_pem, cert_pem, ca_pem, ca_count = extract_pfx(
+            load_file(job["pfx"]), job["password"]
+        )
+        write_private(paths["key"], key_pem)
+        with open(paths["crt"], "wb") as f:
+            f.write(cert_pem)
+        with open(paths["ca"], "wb") as f:
+            f.write(ca_pem)
+    except (OSError, ValueError, TypeError) as e:
+        record.update(status="error", error=str(e))
+        return record
+    record.update(status="ok", files=paths, ca_certificates=ca_count)
+    return record
+
+
+def interactive():
+    while True:
+        yn = input("Are you in the correct directory? (Y/N): ").strip().lower()
+        if yn in ("y", "yes"):
+            break
+        if yn in ("n", "no"):
+            print(
+                f"{Fore.MAGENTA}Please change to the correct directory and rerun this script."
+            )
+            return 0
+        print(f"{Fore.RED}Please answer yes or no.")
+
+    pfx_path = input("Enter the path to your PFX file:").strip()
+    if not os.path.isfile(pfx_path):
+        print(f"{Fore.RED}The file '{pfx_path}' does not exist.")
+        return 1
+    password = getpass.getpass("Enter the PFX password: ")
+
+    record = extract_job({"pfx": pfx_path, "out": None, "password": password})
+    if record["status"] == "error":
+        print(f"{Fore.RED}Failed to extract the PFX: {record['error']}")
+        return 1
+    print(f"{Fore.GREEN}Private key extracted to {record['files']['key']}")
+    print(f"{Fore.GREEN}Certificate extracted to {record['files']['crt']}")
+    print(f"{Fore.GREEN}CA certificates extracted to {record['files']['ca']}")
+    print(f"{Fore.CYAN}Extraction complete!")
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return interactive()
+
+    parser = argparse.ArgumentParser(
+        prog="ssl extract",
+        description="Extract .key, .crt and .ca from PFX files; interactive without "
+        "arguments.",
+    )
+    parser.add_argument("pfx", nargs="*", help="PFX files to extract.")
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        help="CSV or JSON manifest with pfx and optional out, password or "
+        "password_env per file.",
+    )
+    parser.add_argument(
+        "--password-env",
+        help="Environment variable with the password for files that set none.",
+    )
+    parser.add_argument(
+        "-o", "--out", help="Folder for all outputs (default: one folder per PFX)."
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, help="Worker processes (default one per CPU)."
+    )
+    args = parser.parse_intermixed_args(argv)
+
+    password = row_password({}, args.password_env)
+    jobs = [{"pfx": path, "out": args.out, "password": password} for path in args.pfx]
+    if args.manifest:
+        try:
+            rows, base = read_manifest(args.manifest)
+            for row in rows:
+                jobs.append(
+                    {
+                        "pfx": resolve(base, row["pfx"]),
+                        "out": resolve(base, row.get("out")) or args.out,
+                        "password": row_password(row, args.password_env),
+                    }
+                )
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"cannot read the manifest: {e}")
+    if not jobs:
+        parser.error("give PFX files or --manifest")
+    started = time.monotonic()
+    return report("extract", list(run_batch(extract_job, jobs, args.workers)), started)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,22 @@
 from cryptography import x509
-from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.serialization import pkcs12
 from cryptography.hazmat.backends import default_backend
+import argparse
+import csv
+import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import colorama  # Importing the Colorama package
 from colorama import (
     Fore,
     Style,
 )  # Importing Fore and Style for color and style settings
 
+import output
+
 colorama.init(
     autoreset=True
 )  # Initializes Colorama to auto-reset the style after each print statement
@@ -23,31 +31,46 @@ def load_pem_file(file_path):
         sys.exit(1)
 
 
-def create_pfx(cert_pem, key_pem, ca_pem, password, pfx_file):
-    try:
-        cert = x509.load_pem_x509_certificate(cert_pem, default_backend())
-        key = serialization.load_pem_private_key(
-            key_pem, password=None, backend=default_backend()
-        )
-        ca_certs = (
-            [x509.load_pem_x509_certificate(ca, default_backend()) for ca in ca_pem]
-            if ca_pem
-            else []
+def encryption(password, legacy=False):
+    if not password:
+        return serialization.NoEncryption()
+    if legacy:
+        # 3DES/SHA-1 with OpenSSL's default iteration count, for Windows Server 2016
+        # and older Java keystores
+        return (
+            serialization.PrivateFormat.PKCS12.encryption_builder()
+            .kdf_rounds(2048)
+            .key_cert_algorithm(pkcs12.PBES.PBESv1SHA1And3KeyTripleDESCBC)
+            .hmac_hash(hashes.SHA1())
+            .build(password.encode())
         )
+    return serialization.BestAvailableEncryption(password.encode())
 
-        encryption_algo = (
-            serialization.BestAvailableEncryption(password.encode())
-            if password
-            else serialization.NoEncryption()
-        )
 
-        pfx = pkcs12.serialize_key_and_certificates(
-            name=b"",
-            key=key,
-            cert=cert,
-            cas=ca_certs,
-            encryption_algorithm=encryption_algo,
-        )
+def build_pfx(cert_pem, key_pem, ca_pem, password, legacy=False):
+    """
+    PKCS#12 bytes for a certificate and its key. Every entry of `ca_pem` may hold
+    several certificates, so a full intermediate bundle in one file works.
+    """
+    cert = x509.load_pem_x509_certificate(cert_pem, default_backend())
+    key = serialization.load_pem_private_key(
+        key_pem, password=None, backend=default_backend()
+    )
+    if key.public_key() != cert.public_key():
+        raise ValueError("the private key does not belong to the certificate")
+    ca_certs = [c for ca in ca_pem for c in x509.load_pem_x509_certificates(ca)]
+    return pkcs12.serialize_key_and_certificates(
+        name=b"",
+        key=key,
+        cert=cert,
+        cas=ca_certs,
+        encryption_algorithm=encryption(password, legacy),
+    )
+
+
+def create_pfx(cert_pem, key_pem, ca_pem, password, pfx_file):
+    try:
+        pfx = build_pfx(cert_pem, key_pem, ca_pem, password)
 
         with open(pfx_file, "wb") as f:
             f.write(pfx)
@@ -59,7 +82,164 @@ def create_pfx(cert_pem, key_pem, ca_pem, password, pfx_file):
         print(f"{Fore.RED}An error occurred: {e}{Style.RESET_ALL}")
 
 
-def main():
+def read_manifest(path):
+    """
+    Rows of a CSV manifest (with a header line) or a JSON one (a list of objects).
+    Relative paths in the rows are relative to the manifest itself.
+    """
+    with open(path, newline="") as f:
+        if path.lower().endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    return rows, os.path.dirname(os.path.abspath(path))
+
+
+def resolve(base, value):
+    return os.path.join(base, os.path.expanduser(value)) if value else value
+
+
+def row_password(row, password_env=None):
+    """The literal password of a row, else the variable it or --password-env names."""
+    if row.get("password"):
+        return row["password"]
+    name = row.get("password_env") or password_env
+    return os.environ.get(name, "") if name else ""
+
+
+def write_private(path, data):
+    # Key material is created owner-only, never briefly world-readable
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+
+
+def run_batch(function, jobs, workers=None):
+    """
+    Yields function(job) for every job, in order. PKCS#12 key derivation is CPU
+    bound, so jobs run in a process pool unless there is one job or one worker.
+    """
+    if workers == 1 or len(jobs) < 2:
+        yield from map(function, jobs)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(function, jobs, chunksize=4)
+
+
+def report(command, records, started):
+    """Prints or emits every record, then a summary; returns the exit status."""
+    failed = 0
+    for record in records:
+        failed += record["status"] == "error"
+        if output.structured():
+            output.emit(command, record)
+        elif record["status"] == "error":
+            print(f"{Fore.RED}FAILED {record['source']}: {record['error']}")
+        else:
+            print(f"{Fore.GREEN}OK     {record['source']} -> {record['output']}")
+    output.finish()
+    total = len(records)
+    elapsed = time.monotonic() - started
+    print(
+        f"{Fore.CYAN}\n{command.capitalize()}ed {total - failed} of {total} PFX files "
+        f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f}/s)",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def pack_job(job):
+    """Packs one manifest row. Runs in a pool worker, so it only returns a record."""
+    record = {"source": job["cert"], "output": job["out"]}
+    try:
+        cert_pem = load_file(job["cert"])
+        data = build_pfx(
+            cert_pem,
+            load_file(job["key"]),
+            [load_file(path) for path in job["ca"]],
+            job["password"],
+            job["legacy"],
+        )
+        write_private(job["out"], data)
+    except (OSError, ValueError, TypeError) as e:
+        record.update(status="error", error=str(e))
+        return record
+    record["status"] = "ok"
+    return record
+
+
+def load_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def pack_jobs(manifest, password_env=None, legacy=False):
+    """
+    Jobs from a pack manifest with the columns cert, key, out and optionally ca
+    (several files separated by ";"), password or password_env.
+    """
+    rows, base = read_manifest(manifest)
+    jobs = []
+    for row in rows:
+        ca = row.get("ca") or []
+        if isinstance(ca, str):
+            ca = [path.strip() for path in ca.split(";") if path.strip()]
+        out = row.get("out") or os.path.splitext(row["cert"])[0] + ".pfx"
+        jobs.append(
+            {
+                "cert": resolve(base, row["cert"]),
+                "key": resolve(base, row["key"]),
+                "ca": [resolve(base, path) for path in ca],
+                "out": resolve(base, out),
+                "password": row_password(row, password_env),
+                "legacy": legacy,
+            }
+        )
+    return jobs
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return main_batch(argv)
+    interactive()
+    return 0
+
+
+def main_batch(argv):
+    parser = argparse.ArgumentParser(
+        prog="ssl pack",
+        description="Pack PFX files from a manifest; interactive without arguments.",
+    )
+    parser.add_argument(
+        "manifest",
+        help="CSV or JSON manifest with cert, key, out and optional ca, password "
+        "or password_env per PFX.",
+    )
+    parser.add_argument(
+        "--password-env",
+        help="Environment variable with the password for rows that set none.",
+    )
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="Encrypt with 3DES/SHA-1 for old Windows and Java clients.",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, help="Worker processes (default one per CPU)."
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = pack_jobs(args.manifest, args.password_env, args.legacy)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"cannot read the manifest: {e}")
+    started = time.monotonic()
+    return report("pack", list(run_batch(pack_job, jobs, args.workers)), started)
+
+
+def interactive():
     yn = input(
         f"{Fore.MAGENTA}Are you in the correct directory with all necessary files? (Y/N): {Style.RESET_ALL}"
     ).lower()
@@ -137,4 +317,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import re
+import ssl
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from colorama import Fore, Style, init
+
+import output
+from tls_common import parse_target
+from tls_inspect import (
+    DEFAULT_PORT,
+    fingerprint,
+    inspect_cached,
+    openssl_name,
+    spki_sha256,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+DEFAULT_WORKERS = 32
+# pin-sha256="base64" as in HPKP headers; the quotes are optional in the store
+PIN = re.compile(r'pin-sha256\s*=\s*"?([A-Za-z0-9+/]{43}=)"?')
+POSITIONS = ["leaf", "intermediate"]
+
+
+def normalize(value):
+    return value.replace(":", "").strip().upper()
+
+
+def pin_matches(record, expected):
+    """An expected value matches either the fingerprint or the pin, colons optional."""
+    return (
+        normalize(expected) == normalize(record["fingerprint_sha256"])
+        or expected.strip() == record["spki_sha256"]
+    )
+
+
+def pinning_record(domain, port=DEFAULT_PORT, expected=None):
+    """The SHA-256 fingerprint and SPKI pin of the served leaf, compared to `expected`."""
+    record = {"host": domain, "port": port}
+    try:
+        leaf = inspect_cached(domain, port)["certificates"][0]
+    except (OSError, ssl.SSLError) as e:
+        record["error"] = str(e)
+        return record
+    record["fingerprint_sha256"] = fingerprint(leaf)
+    record["spki_sha256"] = spki_sha256(leaf.public_key())
+    record["expected"] = expected
+    record["match"] = pin_matches(record, expected) if expected else None
+    return record
+
+
+def load_pin_store(path):
+    """
+    Reads a pin store into {(host, port): frozenset of pins}. Either text, one
+    `host[:port] pin-sha256="..."; pin-sha256="..."` line per host (a host may
+    repeat over several lines), or JSON mapping "host[:port]" to a list of pins.
+    """
+    with open(path) as f:
+        text = f.read()
+    pins = {}
+    if text.lstrip().startswith("{"):
+        for target, values in json.loads(text).items():
+            values = [values] if isinstance(values, str) else values
+            found = [match for value in values for match in PIN.findall(value)]
+            found += [value for value in values if not PIN.search(value)]
+            pins.setdefault(parse_target(target), set()).update(found)
+    else:
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            target, _, rest = line.partition(" ")
+            found = PIN.findall(rest)
+            if not found:
+                raise ValueError(f"line {number}: no pin-sha256 values for {target}")
+            pins.setdefault(parse_target(target), set()).update(found)
+    return {target: frozenset(values) for target, values in pins.items()}
+
+
+def chain_pins(chain):
+    """(position, subject, pin) for every certificate the server sent."""
+    return [
+        (
+            POSITIONS[min(number, 1)],
+            openssl_name(cert.subject),
+            spki_sha256(cert.public_key()),
+        )
+        for number, cert in enumerate(chain)
+    ]
+
+
+def untrusted(result):
+    return f"The chain does not verify: {result['verify_code']} ({result['verify_message']})"
+
+
+def check_pins(host, port, pins):
+    """
+    Passes if any certificate in the served chain has one of the pinned keys. The
+    chain must verify first: an attacker can serve their own leaf next to the real
+    pinned intermediate, so pins are only matched on a chain to a trusted root.
+    """
+    record = {"host": host, "port": port, "pins": sorted(pins)}
+    try:
+        result = inspect_cached(host, port)
+    except (OSError, ssl.SSLError) as e:
+        record.update(status="error", error=str(e))
+        return record
+    if not result["verified"]:
+        record.update(status="error", error=untrusted(result))
+        return record
+    served = chain_pins(result["certificates"])
+    record["served"] = [
+        {"position": position, "subject": subject, "pin": pin}
+        for position, subject, pin in served
+    ]
+    record["matched"] = [entry for entry in record["served"] if entry["pin"] in pins]
+    record["status"] = "pinned" if record["matched"] else "mismatch"
+    return record
+
+
+def print_store_record(record):
+    target = f"{record['host']}:{record['port']}"
+    if record["status"] == "error":
+        print(f"{Fore.RED}ERROR    {target} {record['error']}")
+    elif record["status"] == "pinned":
+        matched = record["matched"][0]
+        print(
+            f"{Fore.GREEN}PINNED   {target} {Style.RESET_ALL}{matched['pin']} "
+            f"({matched['position']} {matched['subject']})"
+        )
+    else:
+        print(f"{Fore.RED}MISMATCH {target} none of {len(record['pins'])} pins served:")
+        for entry in record["served"]:
+            print(
+                f"{Fore.YELLOW}         {entry['position']:<12} {entry['pin']} {entry['subject']}"
+            )
+
+
+def check_store(path, workers=DEFAULT_WORKERS):
+    try:
+        store = load_pin_store(path)
+    except (OSError, ValueError) as e:
+        print(f"{Fore.RED}Cannot read the pin store {path}: {e}", file=sys.stderr)
+        return 1
+    started = time.monotonic()
+    counts = {"pinned": 0, "mismatch": 0, "error": 0}
+    with ThreadPoolExecutor(workers) as pool:
+        records = pool.map(lambda item: check_pins(*item[0], item[1]), store.items())
+        for record in records:
+            counts[record["status"]] += 1
+            if output.structured():
+                output.emit("pinning", record)
+            else:
+                print_store_record(record)
+    output.finish()
+    print(
+        f"{Fore.CYAN}\n{len(store)} hosts checked in {time.monotonic() - started:.1f}s: "
+        f"{counts['pinned']} pinned, {counts['mismatch']} mismatched, "
+        f"{counts['error']} errors",
+        file=sys.stderr,
+    )
+    return 1 if counts["mismatch"] or counts["error"] else 0
+
+
+def generate_store(targets, workers=DEFAULT_WORKERS):
+    """Prints a pin store line with the pins of every certificate each host serves."""
+    failed = False
+
+    def served(target):
+        try:
+            result = inspect_cached(*target)
+        except (OSError, ssl.SSLError) as e:
+            return e
+        if not result["verified"]:
+            return ValueError(untrusted(result))
+        return chain_pins(result["certificates"])
+
+    with ThreadPoolExecutor(workers) as pool:
+        for (host, port), result in zip(targets, pool.map(served, targets)):
+            target = host if port == DEFAULT_PORT else f"{host}:{port}"
+            if isinstance(result, Exception):
+                print(f"# {target}: {result}")
+                failed = True
+                continue
+            pins = "; ".join(f'pin-sha256="{pin}"' for _, _, pin in result)
+            print(f"{target} {pins}")
+    return 1 if failed else 0
+
+
+def print_fingerprints(record):
+    if "error" in record:
+        print(f"{Fore.RED}\nFailed to retrieve the certificate: {record['error']}\n")
+        return
+    print(
+        f"{Fore.GREEN}\nCurrent certificate fingerprint for {Fore.CYAN}{record['host']}: "
+        f"{Fore.MAGENTA}{record['fingerprint_sha256']}"
+    )
+    print(
+        f"{Fore.GREEN}Current SPKI pin (pin-sha256): {Fore.MAGENTA}{record['spki_sha256']}\n"
+    )
+
+
+def print_match(record):
+    if record["match"]:
+        print(
+            f"{Fore.GREEN}\nCertificate fingerprint matches the expected value. Pinning test passed!\n"
+        )
+    else:
+        print(
+            f"{Fore.RED}\nCertificate fingerprint does not match the expected value. Pinning test failed.\n"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl pinning",
+        description="Verify certificate fingerprints, or a whole pin store at once.",
+    )
+    parser.add_argument("domain", nargs="?")
+    parser.add_argument(
+        "expected",
+        nargs="?",
+        help="Expected SHA-256 fingerprint or pin-sha256 value (prompted if omitted).",
+    )
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "-s",
+        "--store",
+        help="Pin store to check, every host against any certificate it serves.",
+    )
+    parser.add_argument(
+        "--generate",
+        nargs="+",
+        metavar="HOST",
+        help="Print pin store lines for these hosts from what they serve now.",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_intermixed_args(argv)
+
+    if args.store:
+        return check_store(args.store, args.workers)
+    if args.generate:
+        targets = [parse_target(target, args.port) for target in args.generate]
+        return generate_store(targets, args.workers)
+    if not args.domain:
+        print(
+            f"{Fore.YELLOW}\nUsage: {Fore.CYAN}ssl pinning <domain> [fingerprint] "
+            "| ssl pinning --store pins.txt\n"
+        )
+        print(f"{Fore.YELLOW}Verify certificate fingerptint\n")
+        print(f"{Fore.MAGENTA}You only have to define the domain.\n")
+        return 1
+
+    record = pinning_record(args.domain, args.port, args.expected)
+    if output.structured():
+        output.emit("pinning", record)
+        output.finish()
+        return 1 if "error" in record or record["match"] is False else 0
+
+    print(
+        f"{Fore.YELLOW}\nTesting certificate pinning implementation for {Fore.CYAN}{args.domain}..."
+    )
+    print_fingerprints(record)
+    if "error" in record:
+        return 1
+    if record["match"] is None:
+        expected = input("Enter the expected certificate fingerprint for comparison: ")
+        record.update(expected=expected, match=pin_matches(record, expected))
+    print_match(record)
+    return 0 if record["match"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
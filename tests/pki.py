@@ -0,0 +1,65 @@
+"""
+Throwaway certificates for the tests.
+"""
+
+import datetime
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+def certificate(
+    name,
+    issuer=None,
+    ca=False,
+    path_length=None,
+    cert_sign=True,
+    usages=(),
+    serial=None,
+    crl_url=None,
+):
+    """A certificate and key for `name`, signed by `issuer` (cert, key) or itself."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, name)])
+    issuer_cert, issuer_key = issuer or (None, key)
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(issuer_cert.subject if issuer_cert else subject)
+        .public_key(key.public_key())
+        .serial_number(serial or x509.random_serial_number())
+        .not_valid_before(NOW - datetime.timedelta(days=1))
+        .not_valid_after(NOW + datetime.timedelta(days=30))
+        .add_extension(
+            x509.BasicConstraints(ca=ca, path_length=path_length if ca else None),
+            critical=True,
+        )
+        .add_extension(
+            x509.KeyUsage(
+                digital_signature=True,
+                content_commitment=False,
+                key_encipherment=False,
+                data_encipherment=False,
+                key_agreement=False,
+                key_cert_sign=ca and cert_sign,
+                crl_sign=ca,
+                encipher_only=False,
+                decipher_only=False,
+            ),
+            critical=True,
+        )
+    )
+    if crl_url:
+        point = x509.DistributionPoint(
+            [x509.UniformResourceIdentifier(crl_url)], None, None, None
+        )
+        builder = builder.add_extension(
+            x509.CRLDistributionPoints([point]), critical=False
+        )
+    if usages:
+        builder = builder.add_extension(x509.ExtendedKeyUsage(usages), critical=False)
+    return builder.sign(issuer_key, hashes.SHA256()), key
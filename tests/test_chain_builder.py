@@ -0,0 +1,112 @@
+"""
+Path building must only accept CA certificates as issuers, like `openssl verify`.
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chain_builder  # noqa: E402
+from chain_builder import CertificateIndex, ChainBuilder  # noqa: E402
+from modulus import verify_record  # noqa: E402
+from pki import certificate  # noqa: E402
+
+
+def build(leaf, presented, root):
+    builder = ChainBuilder(
+        roots=CertificateIndex([root]), intermediates=CertificateIndex(), fetch=False
+    )
+    return builder.build(leaf, presented)
+
+
+@pytest.fixture(scope="module")
+def root():
+    return certificate("Test Root", ca=True)
+
+
+def test_intermediate_ca_is_trusted(root):
+    inter = certificate("Test Intermediate", root, ca=True)
+    leaf, _ = certificate("leaf.test", inter)
+    path, trusted = build(leaf, [inter[0]], root[0])
+    assert trusted
+    assert [cert for cert, _ in path] == [leaf, inter[0], root[0]]
+
+
+def test_chain_forged_from_end_entity_is_untrusted(root):
+    end_entity = certificate("victim.test", root)
+    forged, _ = certificate("bank.test", end_entity)
+    _, trusted = build(forged, [end_entity[0]], root[0])
+    assert not trusted
+
+
+def test_ca_without_key_cert_sign_is_untrusted(root):
+    inter = certificate("No keyCertSign", root, ca=True, cert_sign=False)
+    leaf, _ = certificate("leaf.test", inter)
+    _, trusted = build(leaf, [inter[0]], root[0])
+    assert not trusted
+
+
+def test_path_length_constraint(root):
+    limited = certificate("Limited Root", ca=True, path_length=0)
+    inter = certificate("Test Intermediate", limited, ca=True)
+    leaf, _ = certificate("leaf.test", inter)
+    _, trusted = build(leaf, [inter[0]], limited[0])
+    assert not trusted
+    direct, _ = certificate("direct.test", limited)
+    _, trusted = build(direct, [], limited[0])
+    assert trusted
+
+
+def write_pem(path, *certificates):
+    with open(path, "wb") as f:
+        for cert in certificates:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+    return str(path)
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl not installed")
+@pytest.mark.parametrize("forged", [False, True])
+def test_md5_verify_matches_openssl(root, tmp_path, forged):
+    inter = certificate("Test Intermediate", root, ca=not forged)
+    leaf, _ = certificate("leaf.test", inter)
+    cert_file = write_pem(tmp_path / "leaf.pem", leaf)
+    ca_file = write_pem(tmp_path / "ca.pem", inter[0], root[0])
+
+    record = verify_record(cert_file, ca_file)
+    openssl = subprocess.run(
+        ["openssl", "verify", "-CAfile", ca_file, cert_file], capture_output=True
+    )
+    assert record["verified"] == (openssl.returncode == 0)
+    assert record["verified"] is not forged
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl not installed")
+def test_fetch_issuer_skips_empty_bundles(root, tmp_path, monkeypatch):
+    monkeypatch.setenv("SSL_UTILS_CACHE", str(tmp_path / "certs.sqlite"))
+    leaf, _ = certificate("leaf.test", root)
+    empty = subprocess.run(
+        ["openssl", "crl2pkcs7", "-nocrl", "-outform", "DER"], capture_output=True
+    ).stdout
+    served = {
+        "http://a.test/empty.p7c": empty,
+        "http://b.test/root.cer": root[0].public_bytes(serialization.Encoding.DER),
+    }
+    monkeypatch.setattr(
+        chain_builder, "access_locations", lambda cert, oid: list(served)
+    )
+    monkeypatch.setattr(
+        chain_builder.urllib.request,
+        "urlopen",
+        lambda request, timeout: io.BytesIO(served[request.full_url]),
+    )
+    assert chain_builder.fetch_issuer(leaf) == root[0]
+    del served["http://b.test/root.cer"]
+    monkeypatch.setenv("SSL_UTILS_CACHE", str(tmp_path / "other" / "certs.sqlite"))
+    assert chain_builder.fetch_issuer(leaf) is None
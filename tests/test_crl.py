@@ -0,0 +1,124 @@
+"""
+A CRL only vouches for a certificate when it verifies against the certificate's issuer.
+"""
+
+import datetime
+import email.message
+import io
+import os
+import sys
+import urllib.error
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crl  # noqa: E402
+from pki import NOW, certificate  # noqa: E402
+
+URL = "http://crl.test/ca.crl"
+
+
+def sign_crl(root, revoked=(), last_update=NOW):
+    builder = (
+        x509.CertificateRevocationListBuilder()
+        .issuer_name(root[0].subject)
+        .last_update(last_update)
+        .next_update(last_update + datetime.timedelta(days=1))
+    )
+    for serial in revoked:
+        builder = builder.add_revoked_certificate(
+            x509.RevokedCertificateBuilder()
+            .serial_number(serial)
+            .revocation_date(last_update)
+            .build()
+        )
+    return builder.sign(root[1], hashes.SHA256())
+
+
+def serve(monkeypatch, revocations):
+    serials = frozenset(revoked.serial_number for revoked in revocations)
+    monkeypatch.setattr(crl, "crl_index", lambda url: (revocations, serials, "memory"))
+
+
+@pytest.fixture
+def pki(monkeypatch):
+    root = certificate("Test Root", ca=True)
+    leaf, _ = certificate("leaf.test", root, crl_url=URL)
+    serve(monkeypatch, sign_crl(root))
+    return root, leaf
+
+
+def test_verified_crl(pki):
+    root, leaf = pki
+    (record,) = crl.check_certificates([leaf], {root[0].subject: root[0]})
+    assert record["status"] == "good"
+    assert record["signature_valid"] is True
+
+
+def test_crl_signed_by_another_key_is_unknown(pki):
+    _, leaf = pki
+    impostor = certificate("Test Root", ca=True)[0]
+    (record,) = crl.check_certificates([leaf], {impostor.subject: impostor})
+    assert record["status"] == "unknown"
+    assert record["signature_valid"] is False
+
+
+def test_crl_without_issuer_is_unknown(pki):
+    _, leaf = pki
+    (record,) = crl.check_certificates([leaf])
+    assert record["status"] == "unknown"
+
+
+def test_revoked_serial(pki, monkeypatch):
+    root, leaf = pki
+    serve(monkeypatch, sign_crl(root, revoked=[leaf.serial_number]))
+    (record,) = crl.check_certificates([leaf], {root[0].subject: root[0]})
+    assert record["status"] == "revoked"
+    assert record["revocation_date"] == NOW.replace(microsecond=0)
+
+
+def test_expired_crl_is_unknown(pki, monkeypatch):
+    root, leaf = pki
+    serve(monkeypatch, sign_crl(root, last_update=NOW - datetime.timedelta(days=2)))
+    (record,) = crl.check_certificates([leaf], {root[0].subject: root[0]})
+    assert record["status"] == "unknown"
+    assert "expired" in record["error"]
+
+
+class Response(io.BytesIO):
+    def __init__(self, data, headers):
+        super().__init__(data)
+        self.headers = headers
+
+
+def test_download_revalidates_with_conditional_get(tmp_path, monkeypatch):
+    monkeypatch.setenv("SSL_UTILS_CACHE", str(tmp_path / "certs.sqlite"))
+    root = certificate("Test Root", ca=True)
+    # Published two days ago, so it is past its nextUpdate and revalidated every time
+    published = {"v1": sign_crl(root, last_update=NOW - datetime.timedelta(days=2))}
+    requests = []
+
+    def urlopen(request, timeout):
+        requests.append(request.get_header("If-none-match"))
+        etag = max(published)
+        headers = email.message.Message()
+        headers["ETag"] = etag
+        if request.get_header("If-none-match") == etag:
+            raise urllib.error.HTTPError(URL, 304, "Not Modified", headers, None)
+        return Response(
+            published[etag].public_bytes(serialization.Encoding.DER), headers
+        )
+
+    monkeypatch.setattr(crl.urllib.request, "urlopen", urlopen)
+    v1 = published["v1"].public_bytes(serialization.Encoding.DER)
+    assert crl.download_crl(URL) == (v1, "downloaded")
+    assert crl.download_crl(URL) == (v1, "not modified")
+
+    published["v2"] = sign_crl(root)
+    v2 = published["v2"].public_bytes(serialization.Encoding.DER)
+    assert crl.download_crl(URL) == (v2, "downloaded")
+    assert crl.download_crl(URL) == (v2, "cached")
+    assert requests == [None, "v1", "v1"]
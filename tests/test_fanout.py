@@ -0,0 +1,29 @@
+"""
+One broken backend or an oversized range must not take the whole fan-out down.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fanout  # noqa: E402
+
+
+def test_unparseable_certificate_is_an_error_record(monkeypatch):
+    monkeypatch.setattr(
+        fanout,
+        "handshake",
+        lambda *args: {"chain": [b"not DER"], "protocol": "TLSv1.3"},
+    )
+    record = fanout.check_backend(None, "a.test", "192.0.2.1", 443)
+    assert record["status"] == "error"
+    assert "Cannot parse the certificate" in record["error"]
+
+
+def test_large_ranges_are_refused():
+    assert len(fanout.expand_addresses(["192.0.2.0/24,192.0.2.1"])) == 254
+    with pytest.raises(ValueError, match="at most"):
+        fanout.expand_addresses(["10.0.0.0/8"])
@@ -0,0 +1,114 @@
+"""
+OCSP responses are only trusted from the issuer or a proper delegated responder,
+and only for the CertID of the certificate that was asked about.
+"""
+
+import datetime
+import os
+import sys
+
+import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509 import ocsp as x509_ocsp
+from cryptography.x509.oid import ExtendedKeyUsageOID, SignatureAlgorithmOID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocsp import (  # noqa: E402
+    signature_padding,
+    validate_response,
+    verify_signature,
+)
+from pki import NOW, certificate  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def root():
+    return certificate("Test Root", ca=True)
+
+
+def respond(
+    cert, issuer, signer, this_update=NOW, lifetime=datetime.timedelta(hours=1)
+):
+    """A GOOD response for `cert`, signed by `signer` (cert, key) and naming it."""
+    return (
+        x509_ocsp.OCSPResponseBuilder()
+        .add_response(
+            cert,
+            issuer,
+            hashes.SHA1(),
+            x509_ocsp.OCSPCertStatus.GOOD,
+            this_update,
+            this_update + lifetime,
+            None,
+            None,
+        )
+        .responder_id(x509_ocsp.OCSPResponderEncoding.HASH, signer[0])
+        .certificates([signer[0]])
+        .sign(signer[1], hashes.SHA256())
+    )
+
+
+def test_issuer_signed_response(root):
+    leaf, _ = certificate("leaf.test", root)
+    validate_response(respond(leaf, root[0], root), leaf, root[0])
+
+
+def test_delegated_responder_needs_ocsp_signing(root):
+    leaf, _ = certificate("leaf.test", root)
+    responder = certificate(
+        "Responder", root, usages=[ExtendedKeyUsageOID.OCSP_SIGNING]
+    )
+    validate_response(respond(leaf, root[0], responder), leaf, root[0])
+
+    impostor = certificate("Web server", root, usages=[ExtendedKeyUsageOID.SERVER_AUTH])
+    with pytest.raises(ValueError, match="delegated responder"):
+        validate_response(respond(leaf, root[0], impostor), leaf, root[0])
+
+
+def test_response_for_another_issuer_is_rejected(root):
+    leaf, _ = certificate("leaf.test", root)
+    other = certificate("Other Root", ca=True)
+    twin, _ = certificate("twin.test", other, serial=leaf.serial_number)
+    # A CertID for the same serial under another CA, even if signed by our issuer
+    response = (
+        x509_ocsp.OCSPResponseBuilder()
+        .add_response(
+            twin,
+            other[0],
+            hashes.SHA1(),
+            x509_ocsp.OCSPCertStatus.GOOD,
+            NOW,
+            None,
+            None,
+            None,
+        )
+        .responder_id(x509_ocsp.OCSPResponderEncoding.HASH, root[0])
+        .sign(root[1], hashes.SHA256())
+    )
+    with pytest.raises(ValueError, match="different certificate"):
+        validate_response(response, leaf, root[0])
+
+
+def test_stale_response_is_rejected(root):
+    leaf, _ = certificate("leaf.test", root)
+    day = datetime.timedelta(days=1)
+    with pytest.raises(ValueError, match="stale"):
+        validate_response(
+            respond(leaf, root[0], root, NOW - 2 * day, day), leaf, root[0]
+        )
+    with pytest.raises(ValueError, match="not valid yet"):
+        validate_response(respond(leaf, root[0], root, NOW + day), leaf, root[0])
+
+
+def test_rsa_pss_signature():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pss = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=32)
+    signature = key.sign(b"tbs", pss, hashes.SHA256())
+
+    class Signed:
+        signature_algorithm_oid = SignatureAlgorithmOID.RSASSA_PSS
+
+    rsa_padding = signature_padding(Signed(), hashes.SHA256())
+    verify_signature(key.public_key(), signature, b"tbs", hashes.SHA256(), rsa_padding)
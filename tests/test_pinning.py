@@ -0,0 +1,32 @@
+"""
+Pins only count on a chain that verifies to a trusted root.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pinning  # noqa: E402
+from pki import certificate  # noqa: E402
+from tls_inspect import spki_sha256  # noqa: E402
+
+
+def test_pinned_intermediate_behind_untrusted_leaf(monkeypatch):
+    root = certificate("Test Root", ca=True)
+    inter = certificate("Test Intermediate", root, ca=True)
+    leaf, _ = certificate("leaf.test", inter)
+    pins = {spki_sha256(inter[0].public_key())}
+
+    def served(verified):
+        result = {"certificates": [leaf, inter[0]], "verified": verified}
+        result.update(verify_code=0 if verified else 20, verify_message="test")
+        return result
+
+    monkeypatch.setattr(pinning, "inspect_cached", lambda host, port: served(True))
+    assert pinning.check_pins("leaf.test", 443, pins)["status"] == "pinned"
+
+    monkeypatch.setattr(pinning, "inspect_cached", lambda host, port: served(False))
+    record = pinning.check_pins("leaf.test", 443, pins)
+    assert record["status"] == "error"
+    assert "does not verify" in record["error"]
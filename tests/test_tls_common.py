@@ -0,0 +1,36 @@
+"""
+Target lists come from users: bad lines are reported, not fatal.
+"""
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tls_common import parse_target, read_targets  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "line, target",
+    [
+        ("example.com", ("example.com", 443)),
+        ("example.com:8443", ("example.com", 8443)),
+        ("::1", ("::1", 443)),
+        ("[::1]:8443", ("::1", 8443)),
+    ],
+)
+def test_parse_target(line, target):
+    assert parse_target(line) == target
+
+
+def test_invalid_lines_are_passed_on():
+    invalid = []
+    stream = io.StringIO("a.test\nhost:abc # typo\n\nb.test:70000\nc.test:8443\n")
+    targets = list(read_targets(stream, 443, lambda line, e: invalid.append(line)))
+    assert targets == [("a.test", 443), ("c.test", 8443)]
+    assert invalid == ["host:abc", "b.test:70000"]
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_targets(io.StringIO("a.test\nhost:abc\n")))
@@ -0,0 +1,29 @@
+"""
+The watch state survives crashes: it is replaced atomically and a damaged file
+starts the watcher afresh instead of stopping it.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watch import load_state, save_state  # noqa: E402
+
+
+@pytest.mark.parametrize("text", ['{"endpoints": {"a:443"', "[]", '{"endpoints": 1}'])
+def test_unreadable_state_starts_empty(tmp_path, capsys, text):
+    path = tmp_path / "state.json"
+    path.write_text(text)
+    assert load_state(str(path)) == {}
+    assert "Ignoring unreadable state file" in capsys.readouterr().err
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "state.json")
+    state = {"a.test:443": {"host": "a.test", "port": 443}}
+    save_state(path, state)
+    assert load_state(path) == state
+    assert os.listdir(tmp_path) == ["state.json"]
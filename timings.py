@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Per-phase timing shared by every command.
+
+`ssl --timings <command>` sets SSL_UTILS_TIMINGS, and the network and parsing
+steps of the commands then record spans: DNS, TCP connect, TLS handshake,
+OCSP/CRL/AIA fetches, certificate parsing, cache lookups and subprocesses.
+The wrapper prints a per-phase breakdown on stderr when the command ends, with
+latency histograms for phases seen often enough (batch runs, fan-out, stores).
+`--trace FILE` also writes the spans as Chrome trace-event JSON, which
+chrome://tracing and Perfetto open.
+
+Spans cost one environment lookup while timings are off. Kept to the standard
+library so every command can import it.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Phases with at least this many spans get a latency histogram in the report
+HISTOGRAM_MIN = 20
+HISTOGRAM_WIDTH = 40
+
+# (name, start ns, duration ns, thread or task id, args), in completion order
+_spans = []
+_started = time.perf_counter_ns()
+_NOTHING = nullcontext()
+
+
+def enabled():
+    return os.environ.get("SSL_UTILS_TIMINGS") == "1"
+
+
+def trace_path():
+    return os.environ.get("SSL_UTILS_TRACE") or None
+
+
+def start():
+    """Forgets recorded spans; the shell calls this before every command line."""
+    global _started
+    _spans.clear()
+    _started = time.perf_counter_ns()
+
+
+def _lane():
+    # Concurrent asyncio tasks share a thread, so each task gets its own trace lane
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is not None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return id(task)
+    return threading.get_ident()
+
+
+def span(name, **args):
+    """Records how long the block takes as phase `name`, with `args` in the trace."""
+    if not enabled():
+        return _NOTHING
+    return _record(name, args)
+
+
+@contextmanager
+def _record(name, args):
+    lane = _lane()
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        # list.append is atomic, worker threads need no lock
+        _spans.append((name, started, time.perf_counter_ns() - started, lane, args))
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted list."""
+    rank = max(1, -(-p * len(values) // 100))
+    return values[int(rank) - 1]
+
+
+def summary():
+    """Per-phase statistics in milliseconds, slowest total first."""
+    phases = {}
+    for name, _, duration, _, _ in _spans:
+        phases.setdefault(name, []).append(duration / 1e6)
+    stats = {}
+    for name, values in phases.items():
+        values.sort()
+        stats[name] = {
+            "count": len(values),
+            "total": sum(values),
+            "mean": sum(values) / len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+            "values": values,
+        }
+    return dict(sorted(stats.items(), key=lambda item: -item[1]["total"]))
+
+
+def histogram(values):
+    """Counts per power-of-two millisecond bucket, as [(upper bound ms, count)]."""
+    buckets = {}
+    for value in values:
+        bound = 0.125
+        while value > bound:
+            bound *= 2
+        buckets[bound] = buckets.get(bound, 0) + 1
+    return sorted(buckets.items())
+
+
+def report(file=None):
+    """Prints the per-phase breakdown, then the histograms of frequent phases."""
+    file = file or sys.stderr
+    stats = summary()
+    if not stats:
+        print("\nTimings: no spans recorded.", file=file)
+        return
+    # Phases overlap under concurrency, so totals can add up past the wall clock
+    wall = (time.perf_counter_ns() - _started) / 1e6
+    print(f"\nTimings ({wall:,.1f} ms wall clock, all values in ms):", file=file)
+    print(
+        f"  {'phase':<16}{'count':>7}{'total':>11}{'mean':>9}{'p50':>9}"
+        f"{'p90':>9}{'p99':>9}{'max':>9}",
+        file=file,
+    )
+    for name, phase in stats.items():
+        print(
+            f"  {name:<16}{phase['count']:>7}{phase['total']:>11.1f}{phase['mean']:>9.2f}"
+            f"{phase['p50']:>9.2f}{phase['p90']:>9.2f}{phase['p99']:>9.2f}"
+            f"{phase['max']:>9.2f}",
+            file=file,
+        )
+    for name, phase in stats.items():
+        if phase["count"] < HISTOGRAM_MIN:
+            continue
+        buckets = histogram(phase["values"])
+        peak = max(count for _, count in buckets)
+        print(f"\n  {name} latency:", file=file)
+        for bound, count in buckets:
+            bar = "#" * max(1, round(count * HISTOGRAM_WIDTH / peak))
+            print(
+                f"  {'<= ' + format(bound, 'g') + ' ms':>14} {count:>6} {bar}",
+                file=file,
+            )
+
+
+def write_trace(path):
+    """Writes the spans as Chrome trace-event JSON ("X" complete events, in µs)."""
+    lanes = {}
+    events = []
+    for name, started, duration, lane, args in sorted(_spans, key=lambda s: s[1]):
+        events.append(
+            {
+                "name": name,
+                "cat": "ssl-utils",
+                "ph": "X",
+                "ts": (started - _started) / 1000,
+                "dur": duration / 1000,
+                "pid": os.getpid(),
+                "tid": lanes.setdefault(lane, len(lanes) + 1),
+                "args": {key: str(value) for key, value in args.items()},
+            }
+        )
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
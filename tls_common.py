@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Connection defaults and target parsing shared by every command.
+
+Kept to the standard library so commands that only open sockets (cipher,
+headers, performance) start without importing cryptography or asyncio.
+tls_inspect and batch re-export these names.
+"""
+
+import functools
+import socket
+import ssl
+import warnings
+
+import timings
+
+DEFAULT_PORT = 443
+DEFAULT_TIMEOUT = 10
+ALPN_PROTOCOLS = ("h2", "http/1.1")
+
+# Versions probed for the "TLS VERSION SUPPORT" section of `ssl cert`
+TLS_VERSIONS = [
+    ("TLSv1.0", ssl.TLSVersion.TLSv1),
+    ("TLSv1.1", ssl.TLSVersion.TLSv1_1),
+    ("TLSv1.2", ssl.TLSVersion.TLSv1_2),
+    ("TLSv1.3", ssl.TLSVersion.TLSv1_3),
+]
+
+
+# Resumable TLS sessions of this process, by context, server name and port
+_sessions = {}
+
+
+@functools.lru_cache(maxsize=None)
+def create_context(verify=True, alpn=ALPN_PROTOCOLS, version=None):
+    # Loading the system CA store is expensive, so each variant is built once and shared
+    context = ssl.create_default_context()
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    if version is not None:
+        context.minimum_version = context.maximum_version = version
+    context.set_alpn_protocols(list(alpn))
+    return context
+
+
+def connect(address, port, timeout):
+    """socket.create_connection, with name resolution and the TCP connect timed apart."""
+    with timings.span("dns", host=address):
+        infos = socket.getaddrinfo(address, port, type=socket.SOCK_STREAM)
+    error = None
+    for family, _, _, _, sockaddr in infos:
+        try:
+            with timings.span("tcp_connect", address=sockaddr[0], port=port):
+                return socket.create_connection(sockaddr[:2], timeout=timeout)
+        except OSError as e:
+            error = e
+    raise error
+
+
+def open_tls(address, port, server_name, context, timeout, resume=True):
+    """
+    Connects and handshakes, resuming the last session with the same server on the
+    same context if there is one. Sessions only resume on the context they came from,
+    and a resumed handshake carries no certificates, so certificate checks pass
+    resume=False and only store their session for later connections.
+    """
+    sock = connect(address, port, timeout)
+    session = _sessions.get((context, server_name, port)) if resume else None
+    try:
+        with timings.span(
+            "tls_handshake", server_name=server_name, resumed=bool(session)
+        ):
+            return context.wrap_socket(
+                sock, server_hostname=server_name, session=session
+            )
+    except BaseException:
+        sock.close()
+        raise
+
+
+def remember_session(tls, server_name, port):
+    # TLS 1.3 tickets arrive after the handshake, so a session without one cannot resume
+    session = tls.session
+    if session is not None and (session.has_ticket or tls.version() != "TLSv1.3"):
+        _sessions[(tls.context, server_name, port)] = session
+
+
+def probe_context(version, ciphers=None):
+    """
+    Returns an unverified context pinned to one TLS version, optionally offering only
+    the given OpenSSL cipher string, or None if the local OpenSSL cannot do that.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        with warnings.catch_warnings():
+            # TLS 1.0/1.1 are deprecated in the ssl module, but probing them is the point
+            warnings.simplefilter("ignore", DeprecationWarning)
+            if ciphers:
+                context.set_ciphers(ciphers)
+            elif version < ssl.TLSVersion.TLSv1_2:
+                context.set_ciphers("ALL:@SECLEVEL=0")
+            context.minimum_version = version
+            context.maximum_version = version
+    except (ValueError, ssl.SSLError):
+        return None
+    # Some limits (OpenSSL config, security level) only show once a ClientHello is built
+    tls = context.wrap_bio(ssl.MemoryBIO(), ssl.MemoryBIO())
+    try:
+        tls.do_handshake()
+    except ssl.SSLWantReadError:
+        return context
+    except ssl.SSLError:
+        return None
+    return context
+
+
+def parse_target(line, default_port=DEFAULT_PORT):
+    """
+    host, host:port, [v6]:port or a bare IPv6 literal as (host, port). Raises
+    ValueError when the port is not a number from 1 to 65535.
+    """
+    line = line.strip()
+    if line.startswith("["):
+        host, _, port = line[1:].partition("]")
+        if port and not port.startswith(":"):
+            raise ValueError(f"invalid target {line!r}")
+        port = port[1:]
+    elif line.count(":") > 1:
+        # An unbracketed IPv6 literal has no room for a port
+        host, port = line, ""
+    else:
+        host, _, port = line.partition(":")
+    if not host:
+        raise ValueError(f"invalid target {line!r}")
+    if not port:
+        return host, default_port
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"invalid port {port!r} in {line!r}")
+    return host, int(port)
+
+
+def read_targets(stream, default_port=DEFAULT_PORT, invalid=None):
+    """
+    Yields (host, port) for every line of `stream`, skipping blanks and # comments.
+    A line that does not parse is passed to `invalid(line, error)` and skipped,
+    or raises ValueError naming the line when no callback is given.
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            target = parse_target(line, default_port)
+        except ValueError as e:
+            if invalid is None:
+                raise ValueError(f"line {number}: {e}") from None
+            invalid(line, e)
+            continue
+        yield target
@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+
+import argparse
+import base64
+import hashlib
+import os
+import ssl
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from colorama import Fore, Style, init
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import dsa, ec, ed448, ed25519, rsa
+
+import cert_cache
+import output
+import timings
+from check_ssl_chain_color import colorize
+from tls_common import (
+    DEFAULT_PORT,
+    DEFAULT_TIMEOUT,
+    TLS_VERSIONS,
+    connect,
+    create_context,
+    open_tls,
+    probe_context,
+    remember_session,
+)
+
+# Initialize Colorama
+init(autoreset=True)
+
+
+def peer_chain(tls):
+    """Return the DER certificates sent by the peer, leaf first."""
+    # Public on Python 3.13+, private on the _ssl object since 3.10
+    get_chain = getattr(tls, "get_unverified_chain", None)
+    if get_chain is None:
+        get_chain = getattr(getattr(tls, "_sslobj", None), "get_unverified_chain", None)
+    if get_chain is None:
+        leaf = tls.getpeercert(binary_form=True)
+        return [leaf] if leaf else []
+    return [
+        cert if isinstance(cert, bytes) else cert.public_bytes(ssl._ssl.ENCODING_DER)
+        for cert in get_chain() or []
+    ]
+
+
+def connection_details(tls):
+    """Collect the negotiated session parameters from a wrapped socket or SSLObject."""
+    cipher = tls.cipher() or (None, None, None)
+    return {
+        "protocol": tls.version(),
+        "cipher": cipher[0],
+        "cipher_bits": cipher[2],
+        "alpn": tls.selected_alpn_protocol(),
+        "chain": peer_chain(tls),
+    }
+
+
+def handshake(address, port, server_name, context, timeout):
+    with open_tls(address, port, server_name, context, timeout, resume=False) as tls:
+        details = connection_details(tls)
+        details["address"] = tls.getpeername()[0]
+        remember_session(tls, server_name, port)
+        return details
+
+
+def inspect_host(
+    host, port=DEFAULT_PORT, server_name=None, connect_to=None, timeout=DEFAULT_TIMEOUT
+):
+    """
+    Connects once to host:port, verifies the chain against the system CA store and
+    returns the negotiated session together with the parsed peer chain.
+
+    A second, unverified handshake is only made when verification fails, so the
+    chain can still be reported for broken servers.
+    """
+    server_name = server_name or host
+    address = connect_to or host
+    try:
+        result = handshake(address, port, server_name, create_context(), timeout)
+        result.update(verified=True, verify_code=0, verify_message="ok")
+    except ssl.SSLCertVerificationError as e:
+        result = handshake(
+            address, port, server_name, create_context(verify=False), timeout
+        )
+        result.update(
+            verified=False, verify_code=e.verify_code, verify_message=e.verify_message
+        )
+
+    result.update(host=host, port=port, server_name=server_name)
+    with timings.span("parse", certificates=len(result["chain"])):
+        result["certificates"] = [
+            x509.load_der_x509_certificate(der) for der in result["chain"]
+        ]
+    return result
+
+
+def inspect_cached(
+    host, port=DEFAULT_PORT, server_name=None, connect_to=None, timeout=DEFAULT_TIMEOUT
+):
+    """inspect_host, answered from the certificate cache while the entry is fresh."""
+    server_name = server_name or host
+    address = connect_to or host
+    with timings.span("cache_lookup", host=address):
+        result = cert_cache.get(address, port, server_name)
+    if result is None:
+        result = inspect_host(host, port, server_name, connect_to, timeout)
+        if result["certificates"]:
+            facts = describe_certificate(result["certificates"][0])
+            cert_cache.put(address, port, server_name, result, facts)
+        return result
+
+    result["host"] = host
+    with timings.span("parse", certificates=len(result["chain"])):
+        result["certificates"] = [
+            x509.load_der_x509_certificate(der) for der in result["chain"]
+        ]
+    return result
+
+
+def get_name_value(name, oid):
+    values = name.get_attributes_for_oid(oid)
+    return values[0].value if values else None
+
+
+def openssl_name(name):
+    # OpenSSL one-line style, most significant RDN first: "C = US, O = Org, CN = host"
+    return ", ".join(
+        f"{attribute.rfc4514_attribute_name} = {attribute.value}"
+        for rdn in name.rdns
+        for attribute in rdn
+    )
+
+
+def not_before(cert):
+    if hasattr(cert, "not_valid_before_utc"):
+        return cert.not_valid_before_utc
+    return cert.not_valid_before.replace(tzinfo=timezone.utc)
+
+
+def not_after(cert):
+    if hasattr(cert, "not_valid_after_utc"):
+        return cert.not_valid_after_utc
+    return cert.not_valid_after.replace(tzinfo=timezone.utc)
+
+
+def format_date(value):
+    # Same layout as `openssl x509 -enddate`, e.g. "Mar  1 23:59:59 2025 GMT"
+    return f"{value:%b} {value.day:2d} {value:%H:%M:%S %Y} GMT"
+
+
+def days_left(cert, now=None):
+    now = now or datetime.now(timezone.utc)
+    return (not_after(cert) - now).total_seconds() / 86400
+
+
+def subject_alt_names(cert):
+    try:
+        san = cert.extensions.get_extension_for_oid(
+            x509.oid.ExtensionOID.SUBJECT_ALTERNATIVE_NAME
+        )
+    except x509.ExtensionNotFound:
+        return []
+    return san.value.get_values_for_type(x509.DNSName)
+
+
+def hostname_matches(hostname, names):
+    """Matches a hostname against SAN entries, a wildcard covering exactly one label."""
+    hostname = hostname.lower().rstrip(".")
+    for name in names:
+        name = name.lower().rstrip(".")
+        if name == hostname:
+            return True
+        if name.startswith("*."):
+            label, _, parent = hostname.partition(".")
+            if label and parent == name[2:]:
+                return True
+    return False
+
+
+def fingerprint(cert, algorithm=None):
+    digest = cert.fingerprint(algorithm or hashes.SHA256())
+    return ":".join(f"{byte:02X}" for byte in digest)
+
+
+def spki_sha256(public_key):
+    # Base64 SHA-256 of the SubjectPublicKeyInfo, the value used in pin-sha256 pins
+    spki = public_key.public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return base64.b64encode(hashlib.sha256(spki).digest()).decode()
+
+
+def describe_key(public_key):
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "rsaEncryption", public_key.key_size
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return "id-ecPublicKey", public_key.key_size
+    if isinstance(public_key, dsa.DSAPublicKey):
+        return "dsaEncryption", public_key.key_size
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "ED25519", 253
+    if isinstance(public_key, ed448.Ed448PublicKey):
+        return "ED448", 456
+    return type(public_key).__name__, None
+
+
+def describe_certificate(cert):
+    """Derive the facts every command reports from a parsed certificate."""
+    public_key = cert.public_key()
+    key_type, key_size = describe_key(public_key)
+    return {
+        "common_name": get_name_value(cert.subject, x509.NameOID.COMMON_NAME),
+        "subject": openssl_name(cert.subject),
+        "issuer": openssl_name(cert.issuer),
+        "issuer_org": get_name_value(cert.issuer, x509.NameOID.ORGANIZATION_NAME),
+        "serial": f"{cert.serial_number:X}",
+        "not_before": not_before(cert),
+        "not_after": not_after(cert),
+        "sans": subject_alt_names(cert),
+        "fingerprint_sha256": fingerprint(cert),
+        "spki_sha256": spki_sha256(public_key),
+        "key_type": key_type,
+        "key_size": key_size,
+        "signature_algorithm": cert.signature_algorithm_oid._name,
+    }
+
+
+def probe_tls_version(host, port, version, server_name=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns "supported", "rejected" (the server refused or hung up) or "unavailable"
+    (the local OpenSSL cannot offer the version, so the server was not asked).
+    """
+    context = probe_context(version)
+    if context is None:
+        return "unavailable"
+
+    try:
+        with connect(host, port, timeout) as sock:
+            with timings.span("tls_probe", version=version.name):
+                with context.wrap_socket(sock, server_hostname=server_name or host):
+                    return "supported"
+    except OSError:
+        # SSLError included: an UNSUPPORTED_PROTOCOL alert is the server saying no
+        return "rejected"
+
+
+def probe_tls_versions(host, port, server_name=None, timeout=DEFAULT_TIMEOUT):
+    # One handshake per version, all versions at once
+    with ThreadPoolExecutor(max_workers=len(TLS_VERSIONS)) as executor:
+        futures = [
+            (
+                label,
+                executor.submit(
+                    probe_tls_version, host, port, version, server_name, timeout
+                ),
+            )
+            for label, version in TLS_VERSIONS
+        ]
+        return [(label, future.result()) for label, future in futures]
+
+
+# Session keys of an inspection result that go into every record
+SESSION_KEYS = [
+    "host",
+    "port",
+    "server_name",
+    "address",
+    "verified",
+    "verify_code",
+    "verify_message",
+    "protocol",
+    "cipher",
+    "cipher_bits",
+    "alpn",
+]
+
+
+def session_record(result):
+    record = {key: result.get(key) for key in SESSION_KEYS}
+    record["cached"] = result.get("cached", False)
+    return record
+
+
+def certificate_record(cert):
+    record = describe_certificate(cert)
+    record["days_left"] = int(days_left(cert))
+    record["pem"] = cert.public_bytes(serialization.Encoding.PEM).decode()
+    return record
+
+
+def cert_record(domain, port=DEFAULT_PORT, connect_to=None):
+    """The leaf certificate and session of domain:port as a record for `ssl --format`."""
+    try:
+        result = inspect_cached(domain, port, connect_to=connect_to)
+    except (OSError, ssl.SSLError) as e:
+        return {"host": domain, "port": port, "error": str(e)}
+    record = session_record(result)
+    leaf = certificate_record(result["certificates"][0])
+    record["certificate"] = leaf
+    record["san_match"] = hostname_matches(domain, leaf["sans"])
+    return record
+
+
+def chain_record(domain, port=DEFAULT_PORT):
+    try:
+        result = inspect_cached(domain, port)
+    except (OSError, ssl.SSLError) as e:
+        return {"host": domain, "port": port, "error": str(e)}
+    record = session_record(result)
+    record["certificates"] = [
+        certificate_record(cert) for cert in result["certificates"]
+    ]
+    return record
+
+
+def quick_record(domain):
+    try:
+        result = inspect_cached(domain)
+    except (OSError, ssl.SSLError) as e:
+        return {"host": domain, "port": DEFAULT_PORT, "error": str(e)}
+    leaf = result["certificates"][0]
+    return {
+        "host": domain,
+        "port": DEFAULT_PORT,
+        "verified": result["verified"],
+        "expired": days_left(leaf) < 0,
+        "not_after": not_after(leaf),
+        "days_left": int(days_left(leaf)),
+    }
+
+
+def emit_record(mode, record, ok):
+    output.emit(mode, record)
+    output.finish()
+    return 0 if ok and "error" not in record else 1
+
+
+def prompt_domain():
+    print(
+        f"{Fore.MAGENTA}\nYou didn't specify a domain. {Fore.GREEN}Please enter a domain name:\n"
+    )
+    return input().strip()
+
+
+def print_cert(domain, port):
+    try:
+        result = inspect_cached(domain, port)
+    except (OSError, ssl.SSLError) as e:
+        print(f"{Fore.RED}\nError with SSL connection or certificate validation: {e}")
+        print(
+            f"{Fore.MAGENTA}There is probably not a valid certificate on the server.\n"
+        )
+        return 1
+
+    if not result["verified"]:
+        print(
+            f"{Fore.RED}\nError with SSL connection or certificate validation: "
+            f"Verify return code: {result['verify_code']} ({result['verify_message']})"
+        )
+        print(
+            f"{Fore.MAGENTA}There is probably not a valid certificate on the server.\n"
+        )
+        return 1
+
+    leaf = describe_certificate(result["certificates"][0])
+    print("")
+    print(f"{Fore.YELLOW}SSL CERTIFICATE INFORMATION:\n")
+    print(f"{Fore.YELLOW}*  CONNECTED: {Fore.CYAN}{domain} on port:{port}")
+    print(f"{Fore.YELLOW}*  VALIDATION: {Fore.GREEN}Passed CA validation")
+    print(f"{Fore.YELLOW}*  COMMON NAME: {Fore.CYAN}{leaf['common_name']}")
+    print(f"{Fore.YELLOW}*  START DATE: {Fore.CYAN}{format_date(leaf['not_before'])}")
+    print(f"{Fore.YELLOW}*  EXPIRE DATE: {Fore.CYAN}{format_date(leaf['not_after'])}")
+    if hostname_matches(domain, leaf["sans"]):
+        print(
+            f"{Fore.YELLOW}*  SUBJECT ALT NAME: {Fore.CYAN}'{domain}' {Fore.GREEN}matched in SAN\n"
+        )
+    else:
+        print(
+            f"{Fore.YELLOW}*  SUBJECT ALT NAME: {Fore.CYAN}'{domain}' {Fore.RED}doesn't match SAN\n"
+        )
+
+    print(f"{Fore.YELLOW}TLS CONNECTION INFORMATION:\n")
+    print(
+        f"{Fore.BLUE}*  SSL connection using {result['protocol']} / {result['cipher']}"
+        f" / ALPN: {result['alpn'] or 'none'}"
+    )
+    print(f"{Fore.GREEN}*  CN={leaf['common_name']}")
+    print(f"{Fore.YELLOW}*  start date: {format_date(leaf['not_before'])}")
+    print(f"{Fore.YELLOW}*  expire date: {format_date(leaf['not_after'])}")
+    print(f"{Fore.MAGENTA}*  issuer: {leaf['issuer']}")
+    return 0
+
+
+def print_tls_versions(domain, port):
+    print(f"{Fore.YELLOW}TLS VERSION SUPPORT:\n")
+    for label, status in probe_tls_versions(domain, port):
+        if status == "supported":
+            print(f"{Fore.BLUE}*  {label}: {Fore.GREEN}Supported")
+        elif status == "rejected":
+            print(f"{Fore.BLUE}*  {label}: {Fore.RED}Error! (Not supported)")
+        else:
+            print(f"{Fore.BLUE}*  {label}: {Fore.MAGENTA}Unavailable in local OpenSSL")
+
+
+def print_quick(domain):
+    try:
+        result = inspect_cached(domain)
+    except (OSError, ssl.SSLError):
+        print(f"{Fore.RED}Failed to retrieve certificate for {domain}.")
+        return 1
+
+    leaf = result["certificates"][0]
+    if days_left(leaf) < 0:
+        print(f"{Fore.RED}Certificate for {domain} has expired.")
+        return 1
+    print(
+        f"{Fore.GREEN}OK! Certificate for {Fore.CYAN}{domain} {Fore.GREEN}is valid until "
+        f"{Fore.CYAN}{format_date(not_after(leaf))}."
+    )
+    return 0
+
+
+def print_fetch(server_ip, domain, port):
+    print(
+        f"{Fore.YELLOW}\nChecking SSL certificate for {domain} at {server_ip} on port {port} "
+        "with system CA bundle:"
+    )
+    try:
+        result = inspect_cached(domain, port, connect_to=server_ip)
+    except (OSError, ssl.SSLError) as e:
+        print(f"{Fore.RED}Error with SSL connection or certificate validation: {e}")
+        return 1
+
+    if not result["verified"]:
+        print(
+            f"{Fore.RED}Error with SSL connection or certificate validation: "
+            f"{result['verify_message']}"
+        )
+        return 1
+    print(
+        f"{Fore.GREEN}SSL certificate for {domain} at {server_ip} passed system CA validation."
+    )
+
+    leaf = describe_certificate(result["certificates"][0])
+    print(
+        f"{Fore.GREEN}Certificate for {domain} at {server_ip} expires on: "
+        f"{format_date(leaf['not_after'])}."
+    )
+    if hostname_matches(domain, leaf["sans"]):
+        print(
+            f"{Fore.GREEN}Domain {domain} matches one of the certificate Subject Alternative Names.\n"
+        )
+    else:
+        print(
+            f"{Fore.RED}Mismatch: Domain {domain} does not match any of the certificate "
+            "Subject Alternative Names.\n"
+        )
+    return 0
+
+
+def fetch_interactive():
+    while True:
+        server_ip = input(
+            f"\n{Fore.CYAN}Enter server IP (or 'exit' to quit):\n{Style.RESET_ALL} "
+        )
+        if server_ip == "exit":
+            break
+        domain = input(f"{Fore.CYAN}Enter domain:\n{Style.RESET_ALL} ")
+        port = input(
+            f"{Fore.CYAN}Enter port (Press Enter to use 443):\n{Style.RESET_ALL} "
+        )
+        print("")
+
+        print_fetch(server_ip, domain, int(port or DEFAULT_PORT))
+        print("")
+        answer = input(
+            f"{Fore.MAGENTA}Do you want to check another IP and domain? (y/n):{Style.RESET_ALL} "
+        )
+        if answer != "y":
+            break
+
+
+def chain_text(result):
+    """Render an inspection result in the layout of `openssl s_client -showcerts`."""
+    lines = ["CONNECTED", "---", "Certificate chain"]
+    for depth, cert in enumerate(result["certificates"]):
+        facts = describe_certificate(cert)
+        lines.append(f"{depth:2d} s:{facts['subject']}")
+        lines.append(f"   i:{facts['issuer']}")
+        lines.append(
+            f"   a:PKEY: {facts['key_type']}, {facts['key_size']} (bit); "
+            f"sigalg: {facts['signature_algorithm']}"
+        )
+        lines.append(
+            f"   v:NotBefore: {format_date(facts['not_before'])}; "
+            f"NotAfter: {format_date(facts['not_after'])}"
+        )
+        lines.append(cert.public_bytes(serialization.Encoding.PEM).decode().rstrip())
+
+    if result["certificates"]:
+        leaf = result["certificates"][0]
+        lines += [
+            "---",
+            "Server certificate",
+            f"subject={openssl_name(leaf.subject)}",
+            f"issuer={openssl_name(leaf.issuer)}",
+        ]
+    lines += [
+        "---",
+        f"New, {result['protocol']}, Cipher is {result['cipher']}",
+        f"ALPN protocol: {result['alpn']}" if result["alpn"] else "No ALPN negotiated",
+        "Verification: OK" if result["verified"] else "Verification error",
+        f"Verify return code: {result['verify_code']} ({result['verify_message']})",
+        "---",
+    ]
+    return "\n".join(lines)
+
+
+def print_chain(domain, port=DEFAULT_PORT):
+    try:
+        result = inspect_cached(domain, port)
+    except (OSError, ssl.SSLError) as e:
+        print(f"{Fore.RED}Failed to connect to {domain}: {e}")
+        return 1
+
+    for line in chain_text(result).splitlines(keepends=False):
+        sys.stdout.write(colorize(line + "\n"))
+
+    print("")
+    if result["verified"]:
+        expiry = format_date(not_after(result["certificates"][0]))
+        print(
+            f"{Fore.GREEN}Valid SSL certificate found. {Fore.CYAN}Expiry: {expiry}.\n"
+        )
+        print(f"{Fore.YELLOW}Scroll to explore the full SSL chain.\n")
+        return 0
+    print(
+        f"{Fore.RED}Invalid or no SSL certificate found. Verification: "
+        f"Verify return code: {result['verify_code']} ({result['verify_message']})\n"
+    )
+    return 1
+
+
+def print_pem(domain, port, chain=False):
+    try:
+        result = inspect_cached(domain, port)
+    except (OSError, ssl.SSLError) as e:
+        print(
+            f"{Fore.RED}Failed to retrieve certificate for {domain}: {e}",
+            file=sys.stderr,
+        )
+        return 1
+    certificates = result["certificates"] if chain else result["certificates"][:1]
+    for cert in certificates:
+        sys.stdout.write(cert.public_bytes(serialization.Encoding.PEM).decode())
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl", description="Inspect the certificate and TLS session of a server."
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Bypass the certificate cache."
+    )
+    parser.add_argument(
+        "--format", choices=output.FORMATS, help="Output format (default: text)."
+    )
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    cert_parser = subparsers.add_parser("cert", help="Certificate and TLS information.")
+    cert_parser.add_argument("domain", nargs="?")
+    cert_parser.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT)
+
+    quick_parser = subparsers.add_parser("quick", help="One-line expiry check.")
+    quick_parser.add_argument("domain", nargs="?")
+
+    fetch_parser = subparsers.add_parser(
+        "fetch",
+        help="Check a domain on a given server IP, or on every backend at once "
+        "(IPs separated by commas, CIDR ranges, --ips or --resolve).",
+    )
+    fetch_parser.add_argument("-i", "--interactive", action="store_true")
+    fetch_parser.add_argument("server_ip", nargs="?")
+    fetch_parser.add_argument("domain", nargs="?")
+    fetch_parser.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT)
+    fetch_parser.add_argument(
+        "-r",
+        "--resolve",
+        action="store_true",
+        help="Check every A/AAAA address of the domain (ssl fetch -r domain.tld).",
+    )
+    fetch_parser.add_argument("--ips", help="File with one backend address per line.")
+    fetch_parser.add_argument(
+        "--expect", help="Leaf SHA-256 fingerprint every backend should serve."
+    )
+    fetch_parser.add_argument("-w", "--workers", type=int, default=32)
+
+    chain_parser = subparsers.add_parser(
+        "chain", help="Display the full certificate chain."
+    )
+    chain_parser.add_argument("domain", nargs="?")
+    chain_parser.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT)
+
+    pem_parser = subparsers.add_parser("pem", help="Print the leaf certificate as PEM.")
+    pem_parser.add_argument("domain")
+    pem_parser.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT)
+    pem_parser.add_argument(
+        "--chain", action="store_true", help="Print the full chain."
+    )
+
+    args = parser.parse_args(argv)
+    if args.refresh:
+        os.environ["SSL_UTILS_REFRESH"] = "1"
+
+    if args.format:
+        output.set_format(args.format)
+    if args.mode == "pem":
+        return print_pem(args.domain, args.port, args.chain)
+    if args.mode == "fetch" and (
+        args.resolve
+        or args.ips
+        or "," in (args.server_ip or "")
+        or "/" in (args.server_ip or "")
+    ):
+        return main_fanout(args)
+    if output.structured():
+        return main_structured(args)
+    if args.mode == "fetch":
+        if args.interactive:
+            fetch_interactive()
+            return 0
+        if not args.server_ip or not args.domain:
+            print(
+                f"{Fore.YELLOW}\nFetch SSL/TLS information using IP and domain as arguments.\n"
+            )
+            print(f"{Fore.GREEN}Usage: ssl fetch 192.168.0.1 domain.tld [-i]\n")
+            print(
+                f"{Fore.MAGENTA}Use -i for interactive mode or provide server IP and domain as arguments.\n"
+            )
+            return 0
+        return print_fetch(args.server_ip, args.domain, args.port)
+
+    domain = args.domain or prompt_domain()
+    if not domain:
+        print(f"{Fore.RED}No domain provided, exiting...")
+        return 1
+
+    if args.mode == "quick":
+        return print_quick(domain)
+    if args.mode == "chain":
+        return print_chain(domain, args.port)
+
+    status = print_cert(domain, args.port)
+    print("")
+    print_tls_versions(domain, args.port)
+    return status
+
+
+def main_fanout(args):
+    # Imported here so single-host commands do not load the chain builder
+    from fanout import expand_addresses, fetch_backends, resolve
+
+    values = [args.server_ip] if args.server_ip else []
+    if (args.resolve or args.ips) and (not args.domain or args.domain.isdigit()):
+        # `ssl fetch -r|--ips file domain.tld [port]`: the positionals are shifted by one
+        if args.domain:
+            args.port = int(args.domain)
+        values, args.domain = [], args.server_ip
+    if not args.domain:
+        print(
+            f"{Fore.GREEN}Usage: ssl fetch 10.0.0.1,10.0.0.2 domain.tld | ssl fetch -r domain.tld"
+        )
+        return 1
+    try:
+        if args.ips:
+            with open(args.ips) as f:
+                values.extend(line.split("#", 1)[0] for line in f)
+        addresses = expand_addresses(values)
+        if args.resolve:
+            addresses = list(dict.fromkeys(addresses + resolve(args.domain, args.port)))
+    except (OSError, ValueError) as e:
+        print(f"{Fore.RED}Cannot list the backends: {e}", file=sys.stderr)
+        return 1
+    if not addresses:
+        print(f"{Fore.RED}No backend addresses for {args.domain}", file=sys.stderr)
+        return 1
+    return fetch_backends(args.domain, addresses, args.port, args.workers, args.expect)
+
+
+def main_structured(args):
+    """Emits the record of one subcommand instead of printing it."""
+    if args.mode == "fetch":
+        if args.interactive or not args.server_ip or not args.domain:
+            print(
+                "Usage: ssl --format json fetch <server IP> <domain> [port]",
+                file=sys.stderr,
+            )
+            return 1
+        record = cert_record(args.domain, args.port, connect_to=args.server_ip)
+        return emit_record("fetch", record, record.get("verified"))
+    if not args.domain:
+        print(f"Usage: ssl --format json {args.mode} <domain>", file=sys.stderr)
+        return 1
+    if args.mode == "quick":
+        record = quick_record(args.domain)
+        return emit_record("quick", record, not record.get("expired"))
+    if args.mode == "chain":
+        record = chain_record(args.domain, args.port)
+        return emit_record("chain", record, record.get("verified"))
+
+    record = cert_record(args.domain, args.port)
+    record["tls_versions"] = dict(probe_tls_versions(args.domain, args.port))
+    return emit_record("cert", record, record.get("verified"))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Long-running certificate expiry monitor.
+
+Endpoints live in a heap ordered by their next check time. How soon a host is
+checked again depends on how close its certificate is to expiry (hourly in the
+last week, weekly with months left), so a large fleet costs few handshakes while
+renewals and breakages are still noticed quickly. The schedule and the last
+seen certificate of every endpoint are kept in a JSON state file, so restarts
+pick up where the previous run stopped.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import signal
+import socket
+import ssl
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from colorama import Fore, init
+
+import output
+from batch import DEFAULT_WARN_DAYS, leaf_facts, summarize
+from cert_cache import cache_path
+from crl import write_atomic
+from tls_common import DEFAULT_PORT, DEFAULT_TIMEOUT, parse_target, read_targets
+from tls_inspect import inspect_host
+
+# Initialize Colorama
+init(autoreset=True)
+
+DEFAULT_WORKERS = 20
+# (days left below, seconds between checks): the closer to expiry, the more often
+INTERVALS = [(7, 3600), (30, 6 * 3600), (90, 86400)]
+MAX_INTERVAL = 7 * 86400
+# Failed checks are retried after 5 minutes, doubling up to an hour
+RETRY_INTERVAL = 300
+MAX_RETRY_INTERVAL = 3600
+# The state file is rewritten at most this often while checks complete
+SAVE_INTERVAL = 5
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+STATUS_COLORS = {
+    "ok": Fore.GREEN,
+    "expiring": Fore.YELLOW,
+    "expired": Fore.RED,
+    "invalid": Fore.RED,
+    "error": Fore.RED,
+}
+
+
+def state_path():
+    return os.path.join(os.path.dirname(cache_path()), "watch.json")
+
+
+def load_state(path):
+    """The stored endpoints, or none when the file is missing or cannot be parsed."""
+    try:
+        with open(path) as f:
+            state = json.load(f)["endpoints"]
+        if not isinstance(state, dict):
+            raise ValueError("endpoints is not an object")
+    except FileNotFoundError:
+        return {}
+    except (ValueError, KeyError, TypeError) as e:
+        print(
+            f"{Fore.YELLOW}Ignoring unreadable state file {path}: {e}", file=sys.stderr
+        )
+        return {}
+    return state
+
+
+def save_state(path, state):
+    # write_atomic replaces the file with a complete temporary copy, so a crash mid-write
+    # leaves the previous state in place
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = json.dumps({"endpoints": state}, default=output.jsonable, indent=1)
+    write_atomic(path, data.encode())
+
+
+class Schedule:
+    """Endpoint keys in a heap by next check time; rescheduling leaves stale items behind."""
+
+    def __init__(self):
+        self.heap = []
+        self.due_at = {}
+
+    def add(self, key, when):
+        self.due_at[key] = when
+        heapq.heappush(self.heap, (when, key))
+
+    def discard_stale(self):
+        while self.heap and self.due_at.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def next_time(self):
+        self.discard_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now, limit):
+        keys = []
+        while len(keys) < limit:
+            when = self.next_time()
+            if when is None or when > now:
+                break
+            keys.append(heapq.heappop(self.heap)[1])
+            del self.due_at[keys[-1]]
+        return keys
+
+    def __len__(self):
+        return len(self.due_at)
+
+
+def check_interval(record, failures, now):
+    """Seconds until the next check of an endpoint, from its latest result."""
+    if record["status"] == "error":
+        return min(RETRY_INTERVAL * 2 ** (failures - 1), MAX_RETRY_INTERVAL)
+    if record["status"] in ("expired", "invalid"):
+        interval = INTERVALS[0][1]
+    else:
+        interval = MAX_INTERVAL
+        for limit, seconds in INTERVALS:
+            if record["days_left"] < limit:
+                interval = seconds
+                break
+        # Check again right after the certificate expires, whatever the interval
+        expires_in = record["not_after"].timestamp() - now
+        interval = min(interval, max(expires_in + 1, 60))
+    # Spread endpoints added together over time instead of checking them in bursts
+    return interval * random.uniform(0.9, 1.0)
+
+
+def check_endpoint(host, port, timeout, warn_days):
+    started = time.monotonic()
+    try:
+        result = inspect_host(host, port, timeout=timeout)
+        facts = leaf_facts(result)
+        record = summarize(host, port, result, facts, warn_days)
+        if facts:
+            record["fingerprint_sha256"] = facts["fingerprint_sha256"]
+    except (OSError, ssl.SSLError) as e:
+        record = {"host": host, "port": port, "status": "error", "error": str(e)}
+    except ValueError as e:
+        # A certificate cryptography cannot parse fails this check, not the daemon
+        record = {
+            "host": host,
+            "port": port,
+            "status": "error",
+            "error": f"Cannot parse the certificate: {e}",
+        }
+    record["elapsed"] = time.monotonic() - started
+    return record
+
+
+def alerts(previous, record):
+    """Alerts for a check result: status changes and renewed certificates."""
+    previous = previous or {}
+    found = []
+    old_status = previous.get("status")
+    if record["status"] != old_status and (old_status or record["status"] != "ok"):
+        found.append("status")
+    old_fingerprint = previous.get("fingerprint_sha256")
+    new_fingerprint = record.get("fingerprint_sha256")
+    if old_fingerprint and new_fingerprint and old_fingerprint != new_fingerprint:
+        found.append("renewed")
+    return [
+        {
+            "time": datetime.now(timezone.utc),
+            "event": event,
+            "host": record["host"],
+            "port": record["port"],
+            "status": record["status"],
+            "previous_status": old_status,
+            "days_left": record.get("days_left"),
+            "not_after": record.get("not_after"),
+            "previous_not_after": previous.get("not_after"),
+            "error": record.get("error"),
+            "text": alert_text(event, record, old_status),
+        }
+        for event in found
+    ]
+
+
+def alert_text(event, record, old_status):
+    target = f"{record['host']}:{record['port']}"
+    if event == "renewed":
+        return f"{target} has a new certificate, {record.get('days_left')} days left"
+    if record["status"] == "error":
+        return f"{target} check failed: {record['error']}"
+    change = f"{old_status} -> {record['status']}" if old_status else record["status"]
+    return f"{target} is {change}, {record.get('days_left')} days left"
+
+
+def print_alert(alert):
+    if output.structured():
+        output.emit("watch", alert)
+        return
+    color = Fore.CYAN if alert["event"] == "renewed" else STATUS_COLORS[alert["status"]]
+    print(f"{alert['time']:%Y-%m-%d %H:%M:%S} {color}{alert['text']}", flush=True)
+
+
+def make_sink(spec):
+    """
+    An alert sink: "-" for stdout, an http(s) URL to POST each alert as JSON (it
+    carries a "text" field for chat webhooks), "unix:PATH" for a stream socket or
+    a file path that alerts are appended to as JSON lines.
+    """
+    if spec == "-":
+        return print_alert
+    if spec.startswith(("http://", "https://")):
+
+        def post(alert):
+            request = urllib.request.Request(
+                spec,
+                data=output.dumps(alert).encode(),
+                headers={"Content-Type": "application/json", "User-Agent": "ssl-utils"},
+            )
+            with urllib.request.urlopen(request, timeout=DEFAULT_TIMEOUT) as response:
+                response.read()
+
+        return post
+    if spec.startswith("unix:"):
+
+        def send(alert):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(DEFAULT_TIMEOUT)
+                sock.connect(spec[len("unix:") :])
+                sock.sendall(output.dumps(alert).encode() + b"\n")
+
+        return send
+
+    def append(alert):
+        with open(spec, "a") as f:
+            f.write(output.dumps(alert) + "\n")
+
+    return append
+
+
+class Metrics:
+    """Counters and gauges exposed in the Prometheus text format."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checks = {}
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.overdue = 0
+        self.expiry = {}
+
+    def observe(self, key, record, entry):
+        with self.lock:
+            self.checks[record["status"]] = self.checks.get(record["status"], 0) + 1
+            for number, bound in enumerate(LATENCY_BUCKETS):
+                if record["elapsed"] <= bound:
+                    self.buckets[number] += 1
+            self.latency_sum += record["elapsed"]
+            self.latency_count += 1
+            if entry.get("not_after"):
+                self.expiry[key] = entry["not_after"].timestamp()
+
+    def set_queue(self, depth, in_flight, overdue):
+        with self.lock:
+            self.queue_depth, self.in_flight, self.overdue = depth, in_flight, overdue
+
+    def render(self):
+        with self.lock:
+            lines = [
+                "# HELP ssl_watch_checks_total Certificate checks by result.",
+                "# TYPE ssl_watch_checks_total counter",
+            ]
+            for status, count in sorted(self.checks.items()):
+                lines.append(f'ssl_watch_checks_total{{status="{status}"}} {count}')
+            lines += [
+                "# HELP ssl_watch_check_duration_seconds Time to connect, handshake and parse.",
+                "# TYPE ssl_watch_check_duration_seconds histogram",
+            ]
+            for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+                lines.append(
+                    f'ssl_watch_check_duration_seconds_bucket{{le="{bound}"}} {count}'
+                )
+            lines += [
+                f'ssl_watch_check_duration_seconds_bucket{{le="+Inf"}} {self.latency_count}',
+                f"ssl_watch_check_duration_seconds_sum {self.latency_sum:.6f}",
+                f"ssl_watch_check_duration_seconds_count {self.latency_count}",
+                "# HELP ssl_watch_queue_depth Endpoints waiting for their next check.",
+                "# TYPE ssl_watch_queue_depth gauge",
+                f"ssl_watch_queue_depth {self.queue_depth}",
+                "# HELP ssl_watch_overdue Endpoints past their check time.",
+                "# TYPE ssl_watch_overdue gauge",
+                f"ssl_watch_overdue {self.overdue}",
+                "# HELP ssl_watch_in_flight Checks running now.",
+                "# TYPE ssl_watch_in_flight gauge",
+                f"ssl_watch_in_flight {self.in_flight}",
+                "# HELP ssl_watch_certificate_expiry_timestamp_seconds notAfter of the served certificate.",
+                "# TYPE ssl_watch_certificate_expiry_timestamp_seconds gauge",
+            ]
+            for key, timestamp in sorted(self.expiry.items()):
+                lines.append(
+                    f'ssl_watch_certificate_expiry_timestamp_seconds{{endpoint="{key}"}} '
+                    f"{timestamp:.0f}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(metrics, address, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record_result(state, key, record, now):
+    """Merges a check result into the endpoint's state; returns (entry, failures)."""
+    previous = state.get(key, {})
+    failures = previous.get("failures", 0) + 1 if record["status"] == "error" else 0
+    # A failed check keeps the last known certificate, so a renewal is still noticed
+    entry = {**previous, "host": record["host"], "port": record["port"]}
+    entry.update(
+        status=record["status"],
+        error=record.get("error"),
+        failures=failures,
+        last_check=now,
+    )
+    if record["status"] != "error":
+        for name in ("not_after", "days_left", "issuer", "fingerprint_sha256"):
+            entry[name] = record.get(name)
+    state[key] = entry
+    return entry, failures
+
+
+def parse_dates(state):
+    for entry in state.values():
+        if isinstance(entry.get("not_after"), str):
+            entry["not_after"] = datetime.fromisoformat(entry["not_after"])
+
+
+def run(args, state, schedule, sinks, metrics, stop):
+    pending = {}
+    saved_at = time.monotonic()
+    dirty = False
+    # --once checks what is due when it starts, not the re-checks it schedules
+    cutoff = time.time()
+    with ThreadPoolExecutor(args.workers) as pool:
+        while not stop.is_set():
+            now = time.time()
+            due = cutoff if args.once else now
+            for key in schedule.pop_due(due, args.workers - len(pending)):
+                endpoint = state[key]
+                future = pool.submit(
+                    check_endpoint,
+                    endpoint["host"],
+                    endpoint["port"],
+                    args.timeout,
+                    args.warn_days,
+                )
+                pending[future] = key
+            overdue = sum(1 for when in schedule.due_at.values() if when <= now)
+            metrics.set_queue(len(schedule), len(pending), overdue)
+
+            if not pending:
+                if args.once:
+                    break
+                if dirty:
+                    save_state(args.state, state)
+                    dirty = False
+                next_time = schedule.next_time()
+                stop.wait(None if next_time is None else max(0, next_time - now))
+                continue
+
+            done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                record = future.result()
+                now = time.time()
+                for alert in alerts(state.get(key), record):
+                    for sink in sinks:
+                        try:
+                            sink(alert)
+                        except (OSError, ValueError) as e:
+                            print(
+                                f"{Fore.RED}Alert delivery failed: {e}", file=sys.stderr
+                            )
+                entry, failures = record_result(state, key, record, now)
+                entry["next_check"] = now + check_interval(record, failures, now)
+                schedule.add(key, entry["next_check"])
+                metrics.observe(key, record, entry)
+                dirty = True
+            if dirty and time.monotonic() - saved_at > SAVE_INTERVAL:
+                save_state(args.state, state)
+                saved_at = time.monotonic()
+                dirty = False
+        for future in pending:
+            future.cancel()
+    save_state(args.state, state)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ssl watch",
+        description="Monitor certificate expiry continuously, checking each host "
+        "more often as its certificate gets closer to expiry.",
+    )
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="host or host:port to watch (default: every endpoint in the state file).",
+    )
+    parser.add_argument("-f", "--file", help="File with one host[:port] per line.")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--state", default=state_path(), help="State file (default: %(default)s)."
+    )
+    parser.add_argument(
+        "-a",
+        "--alert",
+        action="append",
+        help="Alert sink: '-' (stdout, default), an http(s) webhook URL, "
+        "unix:/path/to/socket or a file to append JSON lines to. Repeatable.",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent checks."
+    )
+    parser.add_argument("-t", "--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument(
+        "--warn-days",
+        type=int,
+        default=DEFAULT_WARN_DAYS,
+        help="Report certificates expiring within this many days as expiring.",
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, help="Serve Prometheus metrics on /metrics."
+    )
+    parser.add_argument("--metrics-address", default="127.0.0.1")
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Check the endpoints that are due now, then exit (for cron).",
+    )
+    args = parser.parse_intermixed_args(argv)
+
+    state = load_state(args.state)
+    parse_dates(state)
+    try:
+        targets = [parse_target(target, args.port) for target in args.targets]
+    except ValueError as e:
+        parser.error(str(e))
+
+    def skip(line, error):
+        print(f"{Fore.YELLOW}Skipping {line}: {error}", file=sys.stderr)
+
+    if args.file:
+        try:
+            with open(args.file) as stream:
+                targets.extend(read_targets(stream, args.port, skip))
+        except OSError as e:
+            parser.error(f"cannot read {args.file}: {e}")
+    # New targets join the stored endpoints; only the targets given are watched
+    watched = list(state)
+    if targets:
+        watched = list(dict.fromkeys(f"{host}:{port}" for host, port in targets))
+        for host, port in targets:
+            state.setdefault(f"{host}:{port}", {"host": host, "port": port})
+    if not watched:
+        print(f"{Fore.RED}Usage: ssl watch <domain> [domain ...] [-f hosts.txt]")
+        return 1
+
+    schedule = Schedule()
+    metrics = Metrics()
+    for key in watched:
+        entry = state[key]
+        schedule.add(key, entry.get("next_check", 0))
+        if entry.get("not_after"):
+            metrics.expiry[key] = entry["not_after"].timestamp()
+    if args.metrics_port:
+        serve_metrics(metrics, args.metrics_address, args.metrics_port)
+    sinks = [make_sink(spec) for spec in args.alert or ["-"]]
+
+    stop = threading.Event()
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread():
+        previous_handler = signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    if not output.structured() and not args.once:
+        print(
+            f"{Fore.CYAN}Watching {len(watched)} endpoints, state in {args.state}",
+            file=sys.stderr,
+        )
+    try:
+        run(args, state, schedule, sinks, metrics, stop)
+    except KeyboardInterrupt:
+        save_state(args.state, state)
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGTERM, previous_handler)
+    output.finish()
+    problems = [key for key in watched if state[key].get("status") not in (None, "ok")]
+    return 1 if args.once and problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
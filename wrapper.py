@@ -1,111 +1,334 @@
 #!/usr/bin/env python3
 
+import contextlib
+import importlib
 import os
+import shlex
 import subprocess
 import sys
-from colorama import Fore, Style
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Environment variables set by the global options, restored after each shell line
+GLOBAL_VARIABLES = (
+    "SSL_UTILS_REFRESH",
+    "SSL_UTILS_FORMAT",
+    "SSL_UTILS_TIMINGS",
+    "SSL_UTILS_TRACE",
+    "SSL_UTILS_PROFILE",
+)
+
+# Command name (and aliases) -> (kind, target, leading arguments). "python" commands
+# run in this process and their module is imported only when the command runs, so
+# `ssl quick` never pays for what `ssl ocsp` needs. "bash" runs a script from this
+# folder and "exec" an external program.
+COMMANDS = {}
+
+
+def register(names, kind, target, *leading):
+    for name in names:
+        if name in COMMANDS:
+            raise ValueError(f"command name {name!r} is registered twice")
+        COMMANDS[name] = (kind, target, list(leading))
+
+
+register(["quick", "q"], "python", "tls_inspect", "quick")
+register(["fetch", "f"], "python", "tls_inspect", "fetch")
+register(["cert", "c"], "python", "tls_inspect", "cert")
+register(["chain", "x"], "python", "tls_inspect", "chain")
+register(["batch", "b"], "python", "batch")
+register(["cache"], "python", "cert_cache")
+register(["new", "n"], "python", "newcert")
+register(["decode", "d"], "python", "decode")
+register(["md5", "m"], "python", "modulus")
+register(["pack", "p"], "python", "pfx_pack")
+register(["extract", "e"], "python", "pfx_extract")
+################## N E W  T O O L S ##################
+register(["cipher", "y"], "python", "cipher")
+register(["ctlog", "ctlogs", "l"], "python", "ctlog")
+register(["ocsp", "0"], "python", "ocsp")
+register(["crl", "u"], "python", "crl")
+register(["pinning", "t"], "python", "pinning")
+register(["headers", "h"], "python", "headers")
+register(["inventory", "i"], "python", "inventory")
+register(["verify", "v"], "python", "chain_builder")
+register(["watch", "w"], "python", "watch")
+register(["performance", "perf"], "python", "performance")
+register(["scan", "s"], "exec", "sslscan")
+
+
+def exit_code(code):
+    """The status a SystemExit(code) would give the process."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def span(name, **args):
+    """timings.span, without importing timings unless --timings is on."""
+    if os.environ.get("SSL_UTILS_TIMINGS") != "1":
+        return contextlib.nullcontext()
+    import timings
+
+    return timings.span(name, **args)
+
+
+def run_python(module, args):
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    try:
+        with span("import", module=module):
+            main = importlib.import_module(module).main
+        code = main(args)
+    except SystemExit as e:
+        code = e.code
+    except KeyboardInterrupt:
+        print(file=sys.stderr)
+        code = 130
+    finally:
+        # A command that stopped early may have left a JSON array open
+        output = sys.modules.get("output")
+        if output is not None:
+            output.close()
+    return exit_code(code)
 
 
 def run_script(command, args):
     try:
-        # If command is a string, assume it's a direct executable command
-        if isinstance(command, str):
-            subprocess.run([command] + args, check=True)
-        else:
-            # command is a tuple (interpreter, script_path)
-            interpreter, script_path = command
-            subprocess.run([interpreter, script_path] + args, check=True)
+        with span("subprocess", command=command[0]):
+            return subprocess.run(command + args, check=True).returncode
+    except FileNotFoundError:
+        print(f"Error running command: {command[0]} is not installed", file=sys.stderr)
+        return 127
     except subprocess.CalledProcessError as e:
         print(f"Error running command: {e}", file=sys.stderr)
+        return e.returncode
+    except KeyboardInterrupt:
+        return 130
+
+
+def run_command(command, args):
+    """Runs one `ssl <command> <args>` and returns its exit status."""
+    spec = COMMANDS.get(command.lower())
+    if spec is None:
+        print(f"Unknown command: {command}")
+        return 2
+    kind, target, leading = spec
+    if kind == "python":
+        return run_python(target, leading + args)
+    if kind == "bash":
+        return run_script(["bash", os.path.join(SCRIPT_DIR, target)] + leading, args)
+    return run_script([target] + leading, args)
+
+
+def take_option(argv, name):
+    """
+    Removes `--name value` or `--name=value` from argv and returns the value, "" when
+    the value is missing, or None when the option is not there.
+    """
+    for index, arg in enumerate(argv):
+        if arg == name or arg.startswith(name + "="):
+            value = arg.partition("=")[2] or (
+                argv[index + 1] if index + 1 < len(argv) else ""
+            )
+            del argv[index : index + (1 if "=" in arg else 2)]
+            return value
+    return None
+
+
+def apply_global_options(argv):
+    """
+    Strips the global options from argv into the SSL_UTILS_* variables every command
+    reads: --refresh, --format, --timings, --trace and --profile. Returns False on a
+    bad value.
+    """
+    # Global option: bypass the certificate cache for this run
+    if "--refresh" in argv:
+        argv.remove("--refresh")
+        os.environ["SSL_UTILS_REFRESH"] = "1"
+    # Global option: machine-readable output instead of colored text
+    value = take_option(argv, "--format")
+    if value is not None:
+        from output import FORMATS
+
+        if value not in FORMATS:
+            print(f"--format must be one of: {', '.join(FORMATS)}", file=sys.stderr)
+            return False
+        os.environ["SSL_UTILS_FORMAT"] = value
+    # Global options: where the time goes, per phase, as a trace or as a profile
+    if "--timings" in argv:
+        argv.remove("--timings")
+        os.environ["SSL_UTILS_TIMINGS"] = "1"
+    for option, variable in (
+        ("--trace", "SSL_UTILS_TRACE"),
+        ("--profile", "SSL_UTILS_PROFILE"),
+    ):
+        value = take_option(argv, option)
+        if value == "":
+            print(f"{option} needs a file name", file=sys.stderr)
+            return False
+        if value is not None:
+            os.environ[variable] = value
+    if os.environ.get("SSL_UTILS_TRACE"):
+        os.environ["SSL_UTILS_TIMINGS"] = "1"
+    return True
+
+
+def run_measured(command, args):
+    """
+    run_command, recording spans with --timings and --trace and running under cProfile
+    with --profile. The report goes to stderr, so structured output stays parseable.
+    """
+    timed = os.environ.get("SSL_UTILS_TIMINGS") == "1"
+    profile_path = os.environ.get("SSL_UTILS_PROFILE")
+    if not timed and not profile_path:
+        return run_command(command, args)
+
+    import timings
+
+    timings.start()
+    profiler = None
+    if profile_path:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        return run_command(command, args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            if profile_path == "-":
+                import pstats
+
+                stats = pstats.Stats(profiler, stream=sys.stderr)
+                stats.sort_stats("cumulative").print_stats(30)
+            else:
+                profiler.dump_stats(profile_path)
+                print(f"Profile written to {profile_path}", file=sys.stderr)
+        if timed:
+            timings.report()
+            trace_path = timings.trace_path()
+            if trace_path:
+                timings.write_trace(trace_path)
+                print(f"Trace written to {trace_path}", file=sys.stderr)
+
+
+def shell():
+    """
+    Reads `ssl` command lines until exit or end of input. Modules stay imported
+    between commands, so only the first use of each command pays for its imports.
+    """
+    import colorama
+    from colorama import Fore, Style
+
+    try:
+        import readline  # noqa: F401  (line editing and history for input())
+    except ImportError:
+        pass
+
+    colorama.init(autoreset=True)
+    interactive = sys.stdin.isatty()
+    if interactive:
+        print(f"{Fore.CYAN}ssl shell, type help for commands and exit to leave.")
+    code = 0
+    while True:
+        try:
+            line = input(f"{Fore.GREEN}ssl> {Style.RESET_ALL}" if interactive else "")
+        except EOFError:
+            break
+        except KeyboardInterrupt:
+            print()
+            continue
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            print(f"{Fore.RED}{e}")
+            continue
+        if not argv:
+            continue
+        if argv[0] in ("exit", "quit"):
+            break
+        if argv[0] in ("help", "?"):
+            print_help()
+            continue
+
+        saved = {name: os.environ.get(name) for name in GLOBAL_VARIABLES}
+        try:
+            if not apply_global_options(argv):
+                code = 2
+            elif argv:
+                code = run_measured(argv[0], argv[1:])
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            # Structured output switches colorama off for the process, switch it back on
+            colorama.reinit()
+    return code
 
 
 def print_help():
+    from colorama import Fore, Style
+
     help_text = f"""
     {Fore.CYAN}Usage: ssl followed by one of the following commands and/or arguments:{Style.RESET_ALL}
 
     {Fore.GREEN}cert,     c     {Style.RESET_ALL} = Check a certificate to see most certificate information.
-    {Fore.GREEN}chain,    x     {Style.RESET_ALL} = Connect using OpenSSL to display the full certificate chain.
+    {Fore.GREEN}chain,    x     {Style.RESET_ALL} = Connect to the server and display the full certificate chain.
     {Fore.GREEN}quick,    q     {Style.RESET_ALL} = Query if a certificate is valid or has expired (one-line).
-    {Fore.GREEN}fetch,    f     {Style.RESET_ALL} = Connect to a server IP with the domain as an argument. [-i for interactive mode]
-    {Fore.GREEN}new,      n     {Style.RESET_ALL} = Create a new CSR and Private Key.
+    {Fore.GREEN}fetch,    f     {Style.RESET_ALL} = Connect to a server IP with the domain as an argument, or to many at once {Fore.MAGENTA}(ssl fetch -r domain.tld){Style.RESET_ALL} [-i for interactive mode]
+    {Fore.GREEN}batch,    b     {Style.RESET_ALL} = Check many domains concurrently from a file or stdin {Fore.MAGENTA}(ssl batch hosts.txt -c 100){Style.RESET_ALL}
+    {Fore.GREEN}cache           {Style.RESET_ALL} = List or clear cached certificates {Fore.MAGENTA}(ssl cache [list|clear|path]){Style.RESET_ALL}
+    {Fore.GREEN}new,      n     {Style.RESET_ALL} = Create a new CSR and Private Key, or many at once {Fore.MAGENTA}(ssl new -f hosts.txt -k p256){Style.RESET_ALL}
     {Fore.GREEN}decode,   d     {Style.RESET_ALL} = Deccode certificate or CSR to extract relevant information.
     {Fore.GREEN}md5,      m     {Style.RESET_ALL} = Check that MD5 checksums match between .csr and .key or .ca and .crt.
-    {Fore.GREEN}pack,     p     {Style.RESET_ALL} = Import files or paste content and pack a PFX file.
-    {Fore.GREEN}extract,  e     {Style.RESET_ALL} = Extract .crt, .ca and .key from a PFX file.
+    {Fore.GREEN}pack,     p     {Style.RESET_ALL} = Pack a PFX file interactively, or many from a manifest {Fore.MAGENTA}(ssl pack renewals.csv){Style.RESET_ALL}
+    {Fore.GREEN}extract,  e     {Style.RESET_ALL} = Extract .crt, .ca and .key from PFX files {Fore.MAGENTA}(ssl extract *.pfx --password-env PFX_PASSWORD){Style.RESET_ALL}
     {Fore.GREEN}scan,     s     {Style.RESET_ALL} = Perform a scan using sslscan {Fore.MAGENTA}(ssl scan domain.tld){Style.RESET_ALL}
-    
+    {Fore.GREEN}shell           {Style.RESET_ALL} = Run several commands in one session without restarting {Fore.MAGENTA}(ssl> quick example.com){Style.RESET_ALL}
+
+    {Fore.CYAN}Lookups are cached for 5 minutes, add --refresh to any command to bypass the cache.{Style.RESET_ALL}
+    {Fore.CYAN}Add --format json or --format ndjson for machine-readable records instead of colored text.{Style.RESET_ALL}
+    {Fore.CYAN}Add --timings for a per-phase breakdown (DNS, TCP, TLS, OCSP/CRL, parsing), --trace FILE for Chrome trace JSON, --profile FILE for cProfile.{Style.RESET_ALL}
+
     {Fore.BLUE}New tools that I'm currently testing. Grain of salt, people, grain of salt.{Style.RESET_ALL}
-    
-    {Fore.MAGENTA}cipher,        y     {Style.RESET_ALL} = This command will test the server for supported ciphers. Output can be verbose.
-    {Fore.MAGENTA}ctlog,         l     {Style.RESET_ALL} = Placeholder for CT log verification - this might involve using an external API or service.
-    {Fore.MAGENTA}ocsp,          0     {Style.RESET_ALL} = OCSP check command here. Requires extracting the issuer from the certificate and then querying the OCSP URI.
-    {Fore.MAGENTA}crl,           u     {Style.RESET_ALL} = CRL revocation status check.
-    {Fore.MAGENTA}pinning,       t     {Style.RESET_ALL} = Verify certificate fingerprints.
-    {Fore.MAGENTA}headers,       h     {Style.RESET_ALL} = Use curl to fetch the HTTP headers and then grep for security-related headers.
-    {Fore.MAGENTA}performance,   p     {Style.RESET_ALL} = The openssl s_time command measures the time taken for handshakes.
+
+    {Fore.MAGENTA}cipher,        y     {Style.RESET_ALL} = Enumerate supported TLS versions and cipher suites, with server preference order.
+    {Fore.MAGENTA}ctlog,         l     {Style.RESET_ALL} = Mirror CT log entries locally and search them by name {Fore.MAGENTA}(ssl ctlog '*.example.com'){Style.RESET_ALL}
+    {Fore.MAGENTA}ocsp,          0     {Style.RESET_ALL} = OCSP revocation status check for domains or certificate files (--cert).
+    {Fore.MAGENTA}crl,           u     {Style.RESET_ALL} = CRL revocation status check for domains or certificate files (--cert).
+    {Fore.MAGENTA}pinning,       t     {Style.RESET_ALL} = Verify certificate fingerprints, or every host of a pin store {Fore.MAGENTA}(ssl pinning -s pins.txt){Style.RESET_ALL}
+    {Fore.MAGENTA}headers,       h     {Style.RESET_ALL} = Audit HTTP security headers (HSTS, CSP, ...) of many hosts and paths {Fore.MAGENTA}(ssl headers -f vhosts.txt -P / -P /login){Style.RESET_ALL}
+    {Fore.MAGENTA}watch,         w     {Style.RESET_ALL} = Monitor expiry continuously, re-checking hosts more often as expiry nears (alerts, metrics).
+    {Fore.MAGENTA}inventory,     i     {Style.RESET_ALL} = Decode every cert, CSR and key in files or directories and match them by public key.
+    {Fore.MAGENTA}verify,        v     {Style.RESET_ALL} = Build and audit chains against the trust store: missing or misordered intermediates.
+    {Fore.MAGENTA}performance,   perf  {Style.RESET_ALL} = Handshake latency percentiles (connect, TLS, TTFB), full vs resumed, with N workers.
     """
     print(help_text)
 
 
-def main():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-
-    if len(sys.argv) < 2:
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv:
         print_help()
-        return
-
-    command = sys.argv[
-        1
-    ].lower()  # Convert command to lowercase to make it case-insensitive
-    args = sys.argv[2:]
-
-    # Map both the full command names and their shortcuts to the same actions
-    commands = {
-        "quick": ("bash", os.path.join(script_dir, "quick.bash")),
-        "q": ("bash", os.path.join(script_dir, "quick.bash")),
-        "fetch": ("bash", os.path.join(script_dir, "fetch.bash")),
-        "f": ("bash", os.path.join(script_dir, "fetch.bash")),
-        "cert": ("bash", os.path.join(script_dir, "check_cert.bash")),
-        "c": ("bash", os.path.join(script_dir, "check_cert.bash")),
-        "chain": ("bash", os.path.join(script_dir, "check_ssl_chain.bash")),
-        "x": ("bash", os.path.join(script_dir, "check_ssl_chain.bash")),
-        "new": ("bash", os.path.join(script_dir, "newcert.bash")),
-        "n": ("bash", os.path.join(script_dir, "newcert.bash")),
-        "decode": ("python3", os.path.join(script_dir, "decode.py")),
-        "d": ("python3", os.path.join(script_dir, "decode.py")),
-        "md5": ("bash", os.path.join(script_dir, "modulus.bash")),
-        "m": ("bash", os.path.join(script_dir, "modulus.bash")),
-        "pack": ("python3", os.path.join(script_dir, "pfx_pack.py")),
-        "p": ("python3", os.path.join(script_dir, "pfx_pack.py")),
-        "extract": ("bash", os.path.join(script_dir, "pfx_extract.bash")),
-        "e": ("bash", os.path.join(script_dir, "pfx_extract.bash")),
-        ################## N E W  T O O L S ##################
-        "cipher": ("bash", os.path.join(script_dir, "cipher.bash")),
-        "y": ("bash", os.path.join(script_dir, "cipher.bash")),
-        "ctlogs": ("bash", os.path.join(script_dir, "ctlogs.bash")),
-        "l": ("bash", os.path.join(script_dir, "ctlogs.bash")),
-        "ocsp": ("bash", os.path.join(script_dir, "ocsp.bash")),
-        "0": ("bash", os.path.join(script_dir, "ocsp.bash")),
-        "crl": ("bash", os.path.join(script_dir, "crl.bash")),
-        "u": ("bash", os.path.join(script_dir, "crl.bash")),
-        "pinning": ("bash", os.path.join(script_dir, "pinning.bash")),
-        "t": ("bash", os.path.join(script_dir, "pinning.bash")),
-        "version": ("bash", os.path.join(script_dir, "version.bash")),
-        "v": ("bash", os.path.join(script_dir, "version.bash")),
-        "headers": ("bash", os.path.join(script_dir, "headers.bash")),
-        "h": ("bash", os.path.join(script_dir, "headers.bash")),
-        "performance": ("bash", os.path.join(script_dir, "performance.bash")),
-        "p": ("bash", os.path.join(script_dir, "performance.bash")),
-        "scan": "sslscan",
-        "s": "sslscan",
-    }
-
-    if command in commands:
-        command_spec = commands[command]
-        run_script(command_spec, args)
-    else:
-        print(f"Unknown command: {command}")
+        return 0
+    if not apply_global_options(argv):
+        return 2
+    if not argv:
+        print_help()
+        return 0
+
+    command = argv[0].lower()  # Commands are case-insensitive
+    if command == "shell":
+        return shell()
+    return run_measured(command, argv[1:])
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())